@@ -3,70 +3,84 @@ import re
 import sys
 import os
 
-def process_airports(csv_file_path):
-    try:
-        # Abrir y leer el archivo CSV
-        with open(csv_file_path, 'r', encoding='utf-8') as file:
-            reader = csv.reader(file, delimiter=';')  # El CSV usa ';' como delimitador
-            
-            # Saltar la cabecera
-            header = next(reader)
-            
-            # Obtener índices de las columnas de aeropuertos
-            airportid1_idx = header.index('airportid_1')
-            airportid2_idx = header.index('airportid_2')
-            airport1_idx = header.index('airport_1')
-            airport2_idx = header.index('airport_2')
-            
-            # Diccionario para almacenar aeropuertos únicos con su información
-            # Clave: airportid, Valor: airport_name
-            unique_airports = {}
-            
-            # Procesar cada fila
-            for row in reader:
-                if not row or len(row) < max(airportid1_idx, airportid2_idx, airport1_idx, airport2_idx) + 1:
-                    continue
-                    
-                # Extraer identificadores y nombres de aeropuertos
-                airportid1 = row[airportid1_idx].strip()
-                airportid2 = row[airportid2_idx].strip()
-                airport1 = row[airport1_idx].strip()
-                airport2 = row[airport2_idx].strip()
-                
-                # Agregar aeropuertos al diccionario
-                if airportid1 and airport1:
-                    unique_airports[airportid1] = airport1
-                if airportid2 and airport2:
-                    unique_airports[airportid2] = airport2
+from sharded_scan import read_header, scan_shards
+
+def airport_columns(header):
+    """Índices de las columnas de aeropuertos en la cabecera del CSV de origen"""
+    return (header.index('airportid_1'), header.index('airportid_2'),
+            header.index('airport_1'), header.index('airport_2'))
+
+def add_airports(unique_airports, row, columns):
+    """Agrega los aeropuertos de una fila al diccionario (clave: airportid, valor: airport_name)"""
+    airportid1_idx, airportid2_idx, airport1_idx, airport2_idx = columns
+    if not row or len(row) < max(columns) + 1:
+        return
+
+    # Extraer identificadores y nombres de aeropuertos
+    airportid1 = row[airportid1_idx].strip()
+    airportid2 = row[airportid2_idx].strip()
+    airport1 = row[airport1_idx].strip()
+    airport2 = row[airport2_idx].strip()
 
-        # Convertir a lista y ordenar alfabéticamente por código de aeropuerto
-        airports_list = sorted(unique_airports.items())
+    # Agregar aeropuertos al diccionario
+    if airportid1 and airport1:
+        unique_airports[airportid1] = airport1
+    if airportid2 and airport2:
+        unique_airports[airportid2] = airport2
+
+def collect_airports(rows, columns):
+    """Aeropuertos únicos de un rango de filas (se ejecuta en un proceso del recorrido)"""
+    unique_airports = {}
+    for row in rows:
+        add_airports(unique_airports, row, columns)
+    return unique_airports
+
+def write_airports(unique_airports):
+    """Escribe archive/airport.csv con los aeropuertos únicos y muestra un resumen"""
+    # Convertir a lista y ordenar alfabéticamente por código de aeropuerto
+    airports_list = sorted(unique_airports.items())
+    
+    # Crear el archivo CSV de salida en la carpeta 'archive'
+    output_path = os.path.join('archive', 'airport.csv')
+    
+    with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
         
-        # Crear el archivo CSV de salida en la carpeta 'archive'
-        output_path = os.path.join('archive', 'airport.csv')
+        # Escribir la cabecera
+        writer.writerow(['Codigo del aeropuerto', 'Nombre del aeropuerto'])
         
-        with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            
-            # Escribir la cabecera
-            writer.writerow(['Codigo del aeropuerto', 'Nombre del aeropuerto'])
-            
-            # Escribir los datos
-            for airport_id, airport_name in airports_list:
-                writer.writerow([airport_id, airport_name])
+        # Escribir los datos
+        for airport_id, airport_name in airports_list:
+            writer.writerow([airport_id, airport_name])
+
+    print(f"\nArchivo 'airport.csv' generado exitosamente en la carpeta 'archive'")
+    print(f"Ruta completa: {os.path.abspath(output_path)}")
+    print(f"Total de aeropuertos únicos procesados: {len(airports_list)}")
+    
+    # Mostrar algunos ejemplos de los datos procesados
+    print("\nEjemplos de aeropuertos procesados:")
+    print(f"{'Código':<8} {'Nombre':<50}")
+    print("-" * 58)
+    for airport_id, airport_name in airports_list[:10]:
+        print(f"{airport_id:<8} {airport_name:<50}")
+    if len(airports_list) > 10:
+        print("...")
 
-        print(f"\nArchivo 'airport.csv' generado exitosamente en la carpeta 'archive'")
-        print(f"Ruta completa: {os.path.abspath(output_path)}")
-        print(f"Total de aeropuertos únicos procesados: {len(airports_list)}")
+def process_airports(csv_file_path, workers=None):
+    try:
+        # Obtener índices de las columnas de aeropuertos (el CSV usa ';' como delimitador)
+        columns = airport_columns(read_header(csv_file_path, delimiter=';'))
+        
+        # Diccionario para almacenar aeropuertos únicos con su información
+        # Clave: airportid, Valor: airport_name
+        unique_airports = {}
         
-        # Mostrar algunos ejemplos de los datos procesados
-        print("\nEjemplos de aeropuertos procesados:")
-        print(f"{'Código':<8} {'Nombre':<50}")
-        print("-" * 58)
-        for airport_id, airport_name in airports_list[:10]:
-            print(f"{airport_id:<8} {airport_name:<50}")
-        if len(airports_list) > 10:
-            print("...")
+        # Procesar el archivo por rangos en paralelo; los parciales llegan en orden, así que
+        # update conserva el último nombre visto de cada aeropuerto
+        for partial in scan_shards(csv_file_path, collect_airports, (columns,), delimiter=';', workers=workers):
+            unique_airports.update(partial)
+
+        write_airports(unique_airports)
         
     except FileNotFoundError:
         print(f"Error: No se encontró el archivo '{csv_file_path}'")
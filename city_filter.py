@@ -1,64 +1,103 @@
 import csv
-import re
+import functools
 from collections import Counter
 import sys
 import os
 
+from name_normalization import NAME_CACHE_SIZE, strip_parenthetical
+
+# Diccionario de estados comunes y sus abreviaciones
+STATES = {
+    'AL': ['Alabama'],
+    'AK': ['Alaska'],
+    'AZ': ['Arizona', 'Phoenix', 'Tucson'],
+    'AR': ['Arkansas', 'Little Rock'],
+    'CA': ['California', 'Los Angeles', 'San Francisco', 'San Diego', 'Sacramento', 'Fresno', 'Santa Barbara', 'Palm Springs', 'Santa Rosa'],
+    'CO': ['Colorado', 'Denver', 'Colorado Springs'],
+    'CT': ['Connecticut', 'Hartford'],
+    'DE': ['Delaware'],
+    'FL': ['Florida', 'Tampa', 'Miami', 'Orlando', 'Jacksonville', 'Fort Myers', 'Pensacola', 'Panama City', 'Key West', 'Sarasota'],
+    'GA': ['Georgia', 'Atlanta', 'Savannah'],
+    'HI': ['Hawaii'],
+    'ID': ['Idaho', 'Boise'],
+    'IL': ['Illinois', 'Chicago'],
+    'IN': ['Indiana', 'Indianapolis'],
+    'IA': ['Iowa', 'Des Moines', 'Cedar Rapids'],
+    'KS': ['Kansas', 'Wichita'],
+    'KY': ['Kentucky', 'Louisville'],
+    'LA': ['Louisiana', 'New Orleans'],
+    'ME': ['Maine'],
+    'MD': ['Maryland'],
+    'MA': ['Massachusetts', 'Boston', "Martha's Vineyard", 'Nantucket'],
+    'MI': ['Michigan', 'Detroit', 'Grand Rapids', 'Traverse City'],
+    'MN': ['Minnesota', 'Minneapolis'],
+    'MS': ['Mississippi', 'Jackson'],
+    'MO': ['Missouri', 'St. Louis', 'Kansas City'],
+    'MT': ['Montana', 'Bozeman', 'Kalispell', 'Missoula'],
+    'NE': ['Nebraska', 'Omaha'],
+    'NV': ['Nevada', 'Las Vegas', 'Reno'],
+    'NH': ['New Hampshire'],
+    'NJ': ['New Jersey'],
+    'NM': ['New Mexico', 'Albuquerque'],
+    'NY': ['New York', 'New York City', 'Albany', 'Buffalo', 'Rochester', 'Syracuse'],
+    'NC': ['North Carolina', 'Charlotte', 'Raleigh', 'Asheville', 'Wilmington'],
+    'ND': ['North Dakota', 'Fargo', 'Bismarck'],
+    'OH': ['Ohio', 'Cleveland', 'Columbus', 'Cincinnati'],
+    'OK': ['Oklahoma', 'Oklahoma City', 'Tulsa'],
+    'OR': ['Oregon', 'Portland', 'Eugene', 'Medford', 'Bend'],
+    'PA': ['Pennsylvania', 'Philadelphia', 'Pittsburgh', 'Allentown'],
+    'RI': ['Rhode Island'],
+    'SC': ['South Carolina', 'Charleston', 'Myrtle Beach', 'Greenville'],
+    'SD': ['South Dakota', 'Sioux Falls'],
+    'TN': ['Tennessee', 'Nashville', 'Memphis', 'Knoxville'],
+    'TX': ['Texas', 'Dallas', 'Houston', 'Austin', 'San Antonio', 'El Paso', 'Lubbock', 'Amarillo', 'Midland', 'Harlingen', 'Mission', 'McAllen'],
+    'UT': ['Utah', 'Salt Lake City', 'Provo'],
+    'VT': ['Vermont', 'Burlington'],
+    'VA': ['Virginia', 'Norfolk', 'Richmond'],
+    'WA': ['Washington', 'Seattle', 'Spokane'],
+    'WV': ['West Virginia'],
+    'WI': ['Wisconsin', 'Milwaukee', 'Madison'],
+    'WY': ['Wyoming']
+}
+
+def _build_state_index(states):
+    """
+    Índice de búsqueda construido una sola vez por proceso. A cada nombre se le asigna su
+    posición en el recorrido de STATES (estado por estado, ciudad por ciudad), que es el
+    orden de prioridad del recorrido original:
+      - names_by_prefix: dos primeras letras -> [(nombre, posición)], para encontrar los
+        nombres contenidos en la ciudad probando solo los que empiezan en cada punto
+      - substring_order: toda subcadena de un nombre -> primera posición, para la ciudad
+        contenida en un nombre (incluye la coincidencia exacta)
+    """
+    abbrs = []
+    names_by_prefix = {}
+    substring_order = {}
+    for state_abbr, cities in states.items():
+        for city in cities:
+            position = len(abbrs)
+            abbrs.append(state_abbr)
+            name = city.lower()
+            names_by_prefix.setdefault(name[:2], []).append((name, position))
+            for start in range(len(name) + 1):
+                for end in range(start, len(name) + 1):
+                    substring_order.setdefault(name[start:end], position)
+    return abbrs, names_by_prefix, substring_order
+
+_STATE_ABBRS, _NAMES_BY_PREFIX, _SUBSTRING_ORDER = _build_state_index(STATES)
+
+def _lookup_state(city_clean):
+    """Primer estado cuyo nombre contiene a la ciudad o está contenido en ella, o None"""
+    city_lower = city_clean.lower()
+    best = _SUBSTRING_ORDER.get(city_lower)
+    for start in range(len(city_lower)):
+        for name, position in _NAMES_BY_PREFIX.get(city_lower[start:start + 2], ()):
+            if (best is None or position < best) and city_lower.startswith(name, start):
+                best = position
+    return None if best is None else _STATE_ABBRS[best]
+
+@functools.lru_cache(maxsize=NAME_CACHE_SIZE)
 def infer_state(city_name):
-    # Diccionario de estados comunes y sus abreviaciones
-    states = {
-        'AL': ['Alabama'],
-        'AK': ['Alaska'],
-        'AZ': ['Arizona', 'Phoenix', 'Tucson'],
-        'AR': ['Arkansas', 'Little Rock'],
-        'CA': ['California', 'Los Angeles', 'San Francisco', 'San Diego', 'Sacramento', 'Fresno', 'Santa Barbara', 'Palm Springs', 'Santa Rosa'],
-        'CO': ['Colorado', 'Denver', 'Colorado Springs'],
-        'CT': ['Connecticut', 'Hartford'],
-        'DE': ['Delaware'],
-        'FL': ['Florida', 'Tampa', 'Miami', 'Orlando', 'Jacksonville', 'Fort Myers', 'Pensacola', 'Panama City', 'Key West', 'Sarasota'],
-        'GA': ['Georgia', 'Atlanta', 'Savannah'],
-        'HI': ['Hawaii'],
-        'ID': ['Idaho', 'Boise'],
-        'IL': ['Illinois', 'Chicago'],
-        'IN': ['Indiana', 'Indianapolis'],
-        'IA': ['Iowa', 'Des Moines', 'Cedar Rapids'],
-        'KS': ['Kansas', 'Wichita'],
-        'KY': ['Kentucky', 'Louisville'],
-        'LA': ['Louisiana', 'New Orleans'],
-        'ME': ['Maine'],
-        'MD': ['Maryland'],
-        'MA': ['Massachusetts', 'Boston', "Martha's Vineyard", 'Nantucket'],
-        'MI': ['Michigan', 'Detroit', 'Grand Rapids', 'Traverse City'],
-        'MN': ['Minnesota', 'Minneapolis'],
-        'MS': ['Mississippi', 'Jackson'],
-        'MO': ['Missouri', 'St. Louis', 'Kansas City'],
-        'MT': ['Montana', 'Bozeman', 'Kalispell', 'Missoula'],
-        'NE': ['Nebraska', 'Omaha'],
-        'NV': ['Nevada', 'Las Vegas', 'Reno'],
-        'NH': ['New Hampshire'],
-        'NJ': ['New Jersey'],
-        'NM': ['New Mexico', 'Albuquerque'],
-        'NY': ['New York', 'New York City', 'Albany', 'Buffalo', 'Rochester', 'Syracuse'],
-        'NC': ['North Carolina', 'Charlotte', 'Raleigh', 'Asheville', 'Wilmington'],
-        'ND': ['North Dakota', 'Fargo', 'Bismarck'],
-        'OH': ['Ohio', 'Cleveland', 'Columbus', 'Cincinnati'],
-        'OK': ['Oklahoma', 'Oklahoma City', 'Tulsa'],
-        'OR': ['Oregon', 'Portland', 'Eugene', 'Medford', 'Bend'],
-        'PA': ['Pennsylvania', 'Philadelphia', 'Pittsburgh', 'Allentown'],
-        'RI': ['Rhode Island'],
-        'SC': ['South Carolina', 'Charleston', 'Myrtle Beach', 'Greenville'],
-        'SD': ['South Dakota', 'Sioux Falls'],
-        'TN': ['Tennessee', 'Nashville', 'Memphis', 'Knoxville'],
-        'TX': ['Texas', 'Dallas', 'Houston', 'Austin', 'San Antonio', 'El Paso', 'Lubbock', 'Amarillo', 'Midland', 'Harlingen', 'Mission', 'McAllen'],
-        'UT': ['Utah', 'Salt Lake City', 'Provo'],
-        'VT': ['Vermont', 'Burlington'],
-        'VA': ['Virginia', 'Norfolk', 'Richmond'],
-        'WA': ['Washington', 'Seattle', 'Spokane'],
-        'WV': ['West Virginia'],
-        'WI': ['Wisconsin', 'Milwaukee', 'Madison'],
-        'WY': ['Wyoming']
-    }
-    
     # Primero intentar encontrar el estado en el nombre de la ciudad
     if ',' in city_name:
         city_part, state_part = city_name.split(',', 1)
@@ -67,16 +106,60 @@ def infer_state(city_name):
             return state_part, city_part.strip()
         return state_part, city_part.strip()
     
-    # Si no hay coma, buscar en el diccionario de estados
+    # Si no hay coma, buscar en el índice de estados
     city_clean = city_name.split('/')[0].strip()  # Tomar solo la primera ciudad en caso de ciudades múltiples
     
-    for state_abbr, cities in states.items():
-        for city in cities:
-            if city.lower() in city_clean.lower() or city_clean.lower() in city.lower():
-                return state_abbr, city_name
+    state_abbr = _lookup_state(city_clean)
+    if state_abbr is not None:
+        return state_abbr, city_name
     
     return "N/A", city_name
 
+def add_cities(unique_cities, row):
+    """Agrega al set las ciudades de una fila, sin el texto entre paréntesis"""
+    if row and len(row) > 6:  # Verificar fila no vacía y que tenga suficientes columnas
+        # Extraer city1 y city2 (posiciones 5 y 6 en base 0)
+        city1 = row[5].strip()
+        city2 = row[6].strip()
+        
+        # Limpiar nombres de ciudades (eliminar texto entre paréntesis)
+        city1_clean = strip_parenthetical(city1)
+        city2_clean = strip_parenthetical(city2)
+        
+        # Agregar ciudades al set si no están vacías
+        if city1_clean:
+            unique_cities.add(city1_clean)
+        if city2_clean:
+            unique_cities.add(city2_clean)
+
+def write_cities(unique_cities):
+    """Escribe archive/cities.csv con las ciudades únicas y su estado inferido"""
+    # Convertir a lista y ordenar alfabéticamente
+    cities_list = sorted(list(unique_cities))
+    
+    # Verificar que existe el directorio 'archive'
+    archive_dir = 'archive'
+    if not os.path.exists(archive_dir):
+        print(f"Error: No se encontró el directorio '{archive_dir}'")
+        sys.exit(1)
+    
+    # Crear el archivo CSV de salida en la carpeta 'archive'
+    output_path = os.path.join(archive_dir, 'cities.csv')
+    with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        
+        # Escribir la cabecera
+        writer.writerow(['id', 'city_name', 'city_state'])
+        
+        # Escribir los datos
+        for idx, city in enumerate(cities_list, 1):
+            state, city_name = infer_state(city)
+            writer.writerow([idx, city_name, state])
+
+    print(f"\nArchivo 'cities.csv' generado exitosamente en la carpeta '{archive_dir}'")
+    print(f"Ruta completa: {os.path.abspath(output_path)}")
+    print(f"Total de ciudades únicas procesadas: {len(cities_list)}")
+
 def process_cities(csv_file_path):
     try:
         # Abrir y leer el archivo CSV
@@ -91,46 +174,9 @@ def process_cities(csv_file_path):
             
             # Procesar cada fila
             for row in reader:
-                if row and len(row) > 6:  # Verificar fila no vacía y que tenga suficientes columnas
-                    # Extraer city1 y city2 (posiciones 5 y 6 en base 0)
-                    city1 = row[5].strip()
-                    city2 = row[6].strip()
-                    
-                    # Limpiar nombres de ciudades (eliminar texto entre paréntesis)
-                    city1_clean = re.sub(r'\s*\(.*?\)', '', city1).strip()
-                    city2_clean = re.sub(r'\s*\(.*?\)', '', city2).strip()
-                    
-                    # Agregar ciudades al set si no están vacías
-                    if city1_clean:
-                        unique_cities.add(city1_clean)
-                    if city2_clean:
-                        unique_cities.add(city2_clean)
-
-        # Convertir a lista y ordenar alfabéticamente
-        cities_list = sorted(list(unique_cities))
-        
-        # Verificar que existe el directorio 'archive'
-        archive_dir = 'archive'
-        if not os.path.exists(archive_dir):
-            print(f"Error: No se encontró el directorio '{archive_dir}'")
-            sys.exit(1)
-        
-        # Crear el archivo CSV de salida en la carpeta 'archive'
-        output_path = os.path.join(archive_dir, 'cities.csv')
-        with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            
-            # Escribir la cabecera
-            writer.writerow(['id', 'city_name', 'city_state'])
-            
-            # Escribir los datos
-            for idx, city in enumerate(cities_list, 1):
-                state, city_name = infer_state(city)
-                writer.writerow([idx, city_name, state])
+                add_cities(unique_cities, row)
 
-        print(f"\nArchivo 'cities.csv' generado exitosamente en la carpeta '{archive_dir}'")
-        print(f"Ruta completa: {os.path.abspath(output_path)}")
-        print(f"Total de ciudades únicas procesadas: {len(cities_list)}")
+        write_cities(unique_cities)
         
     except FileNotFoundError:
         print(f"Error: No se encontró el archivo '{csv_file_path}'")
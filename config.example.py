@@ -10,6 +10,13 @@ DB_CONFIG = {
     "user": os.getenv("DB_USER", "your-username"),
     "password": os.getenv("DB_PASS", "your-password"),
     "port": os.getenv("DB_PORT", "5432"),
+    "sslmode": os.getenv("DB_SSLMODE", "prefer"),  # "require" for AWS RDS
+}
+
+# Session settings applied to every connection opened by scripts/db_connection.py
+DB_SESSION_SETTINGS = {
+    "work_mem": os.getenv("DB_WORK_MEM", ""),
+    "statement_timeout": os.getenv("DB_STATEMENT_TIMEOUT", ""),
 }
 
 # CSV file path
@@ -0,0 +1,90 @@
+"""
+Genera los archivos de referencia de dimensiones con una sola lectura del CSV de origen.
+
+airport_filter.py, generate_correct_airports.py, city_filter.py y carrier_filter.py
+recorren el archivo completo cada uno para reunir un solo conjunto de valores. Este
+script recorre el archivo una vez, pasa cada fila a los cuatro acumuladores de esas
+herramientas y escribe con ellas los mismos archivos:
+
+    archive/airport.csv    aeropuertos por airportid (airport_filter.py)
+    archive/airports.csv   código IATA -> ciudad (generate_correct_airports.py)
+    archive/cities.csv     ciudades con su estado inferido (city_filter.py)
+    archive/carriers.csv   aerolíneas (carrier_filter.py)
+
+El delimitador (',' o ';') se detecta en la cabecera.
+
+Uso:
+    python extract_dimensions.py [ruta_archivo_csv]
+"""
+
+import csv
+import os
+import sys
+
+from airport_filter import add_airports, airport_columns, write_airports
+from carrier_filter import add_carriers, carrier_columns, write_carriers
+from city_filter import add_cities, write_cities
+from generate_correct_airports import add_airport_cities, airport_city_columns, write_airport_cities
+
+DEFAULT_INPUT = os.path.join('archive', 'US Airline Flight Routes and Fares 1993-2024.csv')
+
+def detect_delimiter(header_line):
+    """';' para los CSV exportados con punto y coma, ',' para el archivo original"""
+    return ';' if header_line.count(';') > header_line.count(',') else ','
+
+def extract_dimensions(csv_file_path):
+    try:
+        with open(csv_file_path, 'r', encoding='utf-8') as file:
+            delimiter = detect_delimiter(file.readline())
+            file.seek(0)
+            reader = csv.reader(file, delimiter=delimiter)
+            header = next(reader)
+
+            # Índices de columnas de cada acumulador
+            airport_cols = airport_columns(header)
+            airport_city_cols = airport_city_columns(header)
+            carrier_cols = carrier_columns(header)
+
+            unique_airports = {}       # airportid -> airport_1/airport_2
+            unique_airport_cities = {}  # código IATA -> ciudad
+            unique_cities = set()
+            unique_carriers = set()
+
+            # Una sola pasada: cada fila alimenta los cuatro conjuntos
+            rows = 0
+            for row in reader:
+                rows += 1
+                add_airports(unique_airports, row, airport_cols)
+                add_airport_cities(unique_airport_cities, row, airport_city_cols)
+                add_cities(unique_cities, row)
+                add_carriers(unique_carriers, row, carrier_cols)
+
+        print(f"Filas leídas: {rows:,} (delimitador '{delimiter}')")
+        write_airports(unique_airports)
+        write_airport_cities(unique_airport_cities, os.path.join('archive', 'airports.csv'))
+        write_cities(unique_cities)
+        write_carriers(unique_carriers)
+
+    except FileNotFoundError:
+        print(f"Error: No se encontró el archivo '{csv_file_path}'")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error al procesar el archivo: {str(e)}")
+        sys.exit(1)
+
+def main():
+    # Verificar que existe el directorio archive
+    if not os.path.exists('archive'):
+        print("Error: No se encontró el directorio 'archive'")
+        sys.exit(1)
+
+    if len(sys.argv) > 2:
+        print("Uso: python extract_dimensions.py [ruta_archivo_csv]")
+        sys.exit(1)
+    input_csv_path = sys.argv[1] if len(sys.argv) == 2 else DEFAULT_INPUT
+
+    print("Extrayendo dimensiones...")
+    extract_dimensions(input_csv_path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Limpieza de nombres de ciudades compartida por las herramientas CSV y el ETL.
+
+Los patrones se compilan una sola vez y cada función guarda sus resultados en un caché
+LRU acotado, indexado por la cadena original: los mismos nombres se repiten en millones
+de filas y así cada uno se limpia una vez, no una vez por aparición.
+
+Usado por city_filter.py, generate_correct_airports.py, update_references.py y
+scripts/normalize_to_postgres.py.
+"""
+
+import functools
+import re
+
+# Nombres distintos que conserva cada caché; el archivo completo tiene unos pocos miles
+NAME_CACHE_SIZE = 65536
+
+# Cualquier texto entre paréntesis, p. ej. "Boston, MA (Metropolitan Area)"
+PARENTHETICAL = re.compile(r'\s*\(.*?\)')
+# Paréntesis al final del nombre (desde el primer '(' hasta el último ')')
+TRAILING_PARENTHETICAL = re.compile(r'\s*\(.*\)\s*$')
+# "Ciudad, ST" o "Ciudad, ST (extra)"
+CITY_STATE = re.compile(r'^(.*?),\s*([A-Z]{2})(?:\s*\(.*\))?$')
+# "Ciudad" o "Ciudad (extra)"
+CITY_ONLY = re.compile(r'^(.*?)(?:\s*\(.*\))?$')
+
+@functools.lru_cache(maxsize=NAME_CACHE_SIZE)
+def strip_parenthetical(name):
+    """Elimina el texto entre paréntesis y los espacios de los extremos"""
+    return PARENTHETICAL.sub('', name).strip()
+
+@functools.lru_cache(maxsize=NAME_CACHE_SIZE)
+def strip_trailing_parenthetical(name):
+    """Elimina el paréntesis final (p. ej. "(Metropolitan Area)") y los espacios de los extremos"""
+    return TRAILING_PARENTHETICAL.sub('', name).strip()
+
+@functools.lru_cache(maxsize=NAME_CACHE_SIZE)
+def clean_city_name(city_name):
+    """Limpia el nombre de la ciudad eliminando texto entre paréntesis y estado"""
+    # Primero eliminar texto entre paréntesis
+    clean = strip_parenthetical(city_name)
+
+    # Si tiene coma, tomar solo la parte antes de la coma (quitar el estado)
+    if ',' in clean:
+        clean = clean.split(',')[0].strip()
+
+    return clean
+
+@functools.lru_cache(maxsize=NAME_CACHE_SIZE)
+def parse_city_state(name_raw, missing=None):
+    """
+    Separa (ciudad, estado) de un nombre como "Ciudad, ST (extra)". La parte ausente se
+    devuelve como missing: un código de estado solo ("PA") no tiene ciudad, y un nombre
+    sin ", ST" no tiene estado.
+    """
+    name = str(name_raw).strip()
+    match = CITY_STATE.match(name)
+    if match:
+        return match.group(1).strip(), match.group(2).strip()
+    if len(name) == 2 and name.isupper():
+        return missing, name
+    match = CITY_ONLY.match(name)
+    if match:
+        return match.group(1).strip(), missing
+    return name, missing
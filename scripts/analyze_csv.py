@@ -1,17 +1,23 @@
+import argparse
+
 import pandas as pd
 import numpy as np
 
-def analyze_csv():
+from source_cache import cached_frame
+from source_schema import ANALYSIS_COLUMNS, read_source_csv
+
+# Versión del snapshot 'analysis'; incrementarla si cambia la lectura que lo genera
+ANALYSIS_SNAPSHOT_VERSION = 1
+
+def analyze_csv(no_cache=False):
     file_path = 'archive/US Airline Flight Routes and Fares 1993-2024.csv'
     print("Leyendo el archivo CSV...")
     
     try:
-        # Try different encoding and parsing options
-        df = pd.read_csv(file_path, 
-                        sep=',',  # Changed from ';' to ',' based on CSV inspection
-                        encoding='utf-8',
-                        on_bad_lines='skip',
-                        low_memory=False)
+        # Solo las columnas usadas en el análisis, con tipos compactos y códigos como categorías
+        # Reutiliza el snapshot Arrow de una lectura previa si el archivo no cambió
+        df = cached_frame(file_path, 'analysis', lambda: read_source_csv(file_path, ANALYSIS_COLUMNS),
+                          columns=ANALYSIS_COLUMNS, no_cache=no_cache, version=ANALYSIS_SNAPSHOT_VERSION)
         
         print(f"\n=== INFORMACIÓN BÁSICA ===")
         print(f"Número de columnas: {len(df.columns)}")
@@ -52,7 +58,10 @@ def analyze_csv():
             print("\n=== TOP 5 RUTAS MÁS FRECUENTES ===")
             passenger_data = df[df['passengers'].notna()]
             if len(passenger_data) > 0:
-                top_routes = passenger_data.groupby(['city1', 'city2'])['passengers'].sum().sort_values(ascending=False).head()
+                # passengers se lee como int32; la suma por ruta se acumula en int64
+                top_routes = passenger_data['passengers'].astype('int64').groupby(
+                    [passenger_data['city1'], passenger_data['city2']], observed=True
+                ).sum().sort_values(ascending=False).head()
                 print(top_routes)
             else:
                 print("No se encontraron datos válidos de pasajeros")
@@ -69,4 +78,7 @@ def analyze_csv():
         traceback.print_exc()
 
 if __name__ == "__main__":
-    analyze_csv() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Análisis básico del CSV de rutas y tarifas.")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Leer el CSV aunque exista un snapshot (también AIRLINE_CSV_CACHE=0)")
+    analyze_csv(no_cache=parser.parse_args().no_cache) 
\ No newline at end of file
@@ -0,0 +1,344 @@
+"""
+Benchmark for the analysis queries and PL/pgSQL functions.
+
+Starts a throwaway PostgreSQL cluster (initdb + pg_ctl in a temporary directory),
+loads a synthetic source of --rows records through AirlineDataNormalizer, deploys
+sql/plsql/psql_fixed.sql and then runs every statement of the workload --runs times:
+
+- each "-- Consulta N" of sql/sqlConsultation/queries.sql and queries_optimized.sql
+- each "-- Ejemplo X.Y" of sql/plsql/ejecutar_funciones.sql
+
+For every statement the p50/p95 wall time, the shared buffers hit/read and the plan
+shape of one EXPLAIN (ANALYZE, BUFFERS) run are written to a JSON file. Given a
+--baseline file from an earlier run, statements whose p50 grew by more than
+--threshold (or that stopped completing) are reported and the exit status is 1.
+
+The synthetic cities, airports and carriers behind the busiest routes are renamed to
+the literals the examples use ('New York City', 'ATL', '180', ...) so the function
+calls find rows. The CSVs in database/normalized_data/ are an export of an older
+schema and do not load into the current tables, so they are not used.
+
+PostgreSQL refuses to run as root; in that case run as an unprivileged user, or pass
+--existing to benchmark the database configured in config.py or DB_HOST/DB_NAME/... as it is
+(nothing is loaded or changed there).
+
+Usage:
+    python scripts/benchmark_queries.py --rows 50000 --output results.json
+    python scripts/benchmark_queries.py --baseline results.json --threshold 1.25
+    python scripts/benchmark_queries.py --existing --only consulta --runs 3
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import psycopg2
+
+sys.path.append(str(Path(__file__).parent))
+from compare_queries import OPTIMIZED_QUERIES_FILE, ORIGINAL_QUERIES_FILE, load_queries
+from deploy_functions import SQL_FUNCTIONS_FILE
+from db_connection import connect, connection, resolve_db_params, resolve_session_settings
+from normalize_to_postgres import AirlineDataNormalizer
+from synthetic_data import generate_source_frame
+
+EXAMPLES_FILE = Path(__file__).parent.parent / "sql" / "plsql" / "ejecutar_funciones.sql"
+EXAMPLE_HEADER = re.compile(r'^-- Ejemplo (\d+\.\d+)\b', re.MULTILINE)
+
+# Literals used by the examples, assigned to the synthetic rows behind the busiest routes.
+# Each pair names the origin and destination city of one route; the airports are renamed
+# in the cities of the same position.
+EXAMPLE_CITY_PAIRS = [('New York City', 'Los Angeles'), ('Boston', 'Atlanta'), ('Chicago', 'Miami')]
+EXAMPLE_EXTRA_CITIES = ['Seattle']
+EXAMPLE_AIRPORT_CITIES = {'LAX': 'Los Angeles', 'BOS': 'Boston', 'ATL': 'Atlanta'}
+EXAMPLE_CARRIER_CODES = ['180', '19', '204']
+
+# Load-time settings of the throwaway cluster; durability is irrelevant for a scratch database
+THROWAWAY_SERVER_OPTIONS = [
+    "listen_addresses=''", 'fsync=off', 'synchronous_commit=off', 'full_page_writes=off',
+]
+
+
+def find_pg_bin(pg_bin: Optional[str]) -> Path:
+    """Directory holding initdb and pg_ctl: --pg-bin, else initdb on PATH, else pg_config --bindir."""
+    candidates = [Path(pg_bin)] if pg_bin else []
+    initdb = shutil.which('initdb')
+    if initdb:
+        candidates.append(Path(initdb).parent)
+    # Debian-style installs keep the server binaries off PATH
+    if shutil.which('pg_config'):
+        candidates.append(Path(subprocess.run(['pg_config', '--bindir'], capture_output=True, text=True).stdout.strip()))
+    for candidate in candidates[:1] if pg_bin else candidates:
+        if (candidate / 'initdb').exists():
+            return candidate
+    sys.exit("initdb not found; put the PostgreSQL server binaries on PATH or pass --pg-bin.")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+@contextlib.contextmanager
+def throwaway_postgres(pg_bin: Path) -> Iterator[Dict[str, str]]:
+    """Run a scratch PostgreSQL cluster for the duration of the block and yield its connection parameters."""
+    if hasattr(os, 'geteuid') and os.geteuid() == 0:
+        sys.exit("PostgreSQL refuses to run as root; run the benchmark as an unprivileged user or pass --existing.")
+    workdir = Path(tempfile.mkdtemp(prefix='airline-bench-'))
+    data_dir = workdir / 'data'
+    port = free_port()
+    try:
+        subprocess.run([str(pg_bin / 'initdb'), '-D', str(data_dir), '-U', 'postgres', '-A', 'trust',
+                        '-E', 'UTF8', '--locale=C'], check=True, capture_output=True)
+        options = ' '.join([f'-p {port}', f'-k {workdir}'] + [f'-c {option}' for option in THROWAWAY_SERVER_OPTIONS])
+        subprocess.run([str(pg_bin / 'pg_ctl'), '-D', str(data_dir), '-o', options, '-l', str(workdir / 'server.log'),
+                        '-w', 'start'], check=True, capture_output=True)
+        print(f"Started throwaway PostgreSQL in {workdir} (port {port})")
+        try:
+            yield {"host": str(workdir), "dbname": "postgres", "user": "postgres", "password": "", "port": str(port)}
+        finally:
+            subprocess.run([str(pg_bin / 'pg_ctl'), '-D', str(data_dir), '-m', 'fast', '-w', 'stop'],
+                           capture_output=True)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def load_synthetic(db_params: Dict[str, str], n_rows: int, seed: int) -> None:
+    """Normalize and load n_rows synthetic source records, build the indexes and deploy the functions."""
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix='airline-bench-source-') as source_dir:
+        source_path = os.path.join(source_dir, 'synthetic.csv')
+        generate_source_frame(n_rows, seed=seed).to_csv(source_path, index=False)
+        normalizer = AirlineDataNormalizer(source_path, db_params, loader='copy', use_cache=False)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            loaded = (normalizer.normalize_data() and normalizer.create_db_schema_and_insert_data()
+                      and normalizer.build_secondary_indexes())
+        if not loaded:
+            print(output.getvalue())
+            sys.exit("Loading the synthetic data failed.")
+
+    with connection(db_params) as conn, conn.cursor() as cur:
+        cur.execute(SQL_FUNCTIONS_FILE.read_text(encoding='utf-8'))
+        name_example_entities(cur)
+    print(f"Loaded {n_rows:,} synthetic records ({len(normalizer.tables['flights']):,} flights) "
+          f"and deployed the functions in {time.perf_counter() - started:.1f} s")
+
+
+def name_example_entities(cur) -> None:
+    """Rename the synthetic rows behind the busiest routes to the cities, airports and carriers the examples use."""
+    cur.execute("""
+        SELECT a1.city_market_id, a2.city_market_id
+        FROM routes r
+        JOIN airports a1 ON r.origin_airport_id = a1.airport_id
+        JOIN airports a2 ON r.destination_airport_id = a2.airport_id
+        JOIN flights f ON r.route_id = f.route_id
+        WHERE a1.city_market_id <> a2.city_market_id
+        GROUP BY r.route_id, a1.city_market_id, a2.city_market_id
+        ORDER BY COUNT(*) DESC, r.route_id
+    """)
+    city_ids = {}
+    for origin, destination in cur.fetchall():
+        if len(city_ids) == 2 * len(EXAMPLE_CITY_PAIRS):
+            break
+        if origin not in city_ids.values() and destination not in city_ids.values():
+            pair = EXAMPLE_CITY_PAIRS[len(city_ids) // 2]
+            city_ids.update({pair[0]: origin, pair[1]: destination})
+    cur.execute("SELECT city_market_id FROM cities WHERE NOT (city_market_id = ANY(%s)) ORDER BY city_market_id LIMIT %s",
+                (list(city_ids.values()), len(EXAMPLE_EXTRA_CITIES)))
+    city_ids.update(zip(EXAMPLE_EXTRA_CITIES, (city_id for (city_id,) in cur.fetchall())))
+    for name, city_id in city_ids.items():
+        cur.execute("UPDATE cities SET city_name = %s WHERE city_market_id = %s", (name, city_id))
+
+    for code, city in EXAMPLE_AIRPORT_CITIES.items():
+        if city in city_ids:
+            cur.execute("""
+                UPDATE airports SET airport_code = %s
+                WHERE airport_id = (SELECT airport_id FROM airports WHERE city_market_id = %s ORDER BY airport_id LIMIT 1)
+            """, (code, city_ids[city]))
+
+    cur.execute("""
+        SELECT carrier_id FROM market_share GROUP BY carrier_id ORDER BY COUNT(*) DESC, carrier_id LIMIT %s
+    """, (len(EXAMPLE_CARRIER_CODES),))
+    for code, (carrier_id,) in zip(EXAMPLE_CARRIER_CODES, cur.fetchall()):
+        cur.execute("UPDATE carriers SET carrier_code = %s WHERE carrier_id = %s", (code, carrier_id))
+    cur.execute("ANALYZE cities, airports, carriers")
+
+
+def load_examples(path: Path) -> Dict[str, str]:
+    """Map each "-- Ejemplo X.Y" header of the examples file to the statement that follows it."""
+    text = path.read_text(encoding='utf-8')
+    examples = {}
+    for header in EXAMPLE_HEADER.finditer(text):
+        end = text.find(';', header.end())
+        examples[header.group(1)] = text[header.start():end if end != -1 else len(text)].strip()
+    return examples
+
+
+def build_workload(only: Optional[List[str]]) -> List[Tuple[str, str]]:
+    """(name, sql) for every statement benchmarked, restricted to the name prefixes in only."""
+    workload = [(f"consulta_{n:02d}", sql) for n, sql in sorted(load_queries(ORIGINAL_QUERIES_FILE).items())]
+    workload += [(f"optimizada_{n:02d}", sql) for n, sql in sorted(load_queries(OPTIMIZED_QUERIES_FILE).items())]
+    workload += [(f"ejemplo_{number}", sql) for number, sql in load_examples(EXAMPLES_FILE).items()]
+    if only:
+        workload = [(name, sql) for name, sql in workload if name.startswith(tuple(only))]
+    return workload
+
+
+def plan_shape(node: dict) -> str:
+    """Compact nesting of the plan node types, with the relation each scan reads."""
+    label = node['Node Type']
+    if 'Relation Name' in node:
+        label += f" on {node['Relation Name']}"
+    children = node.get('Plans', [])
+    if children:
+        label += f"({', '.join(plan_shape(child) for child in children)})"
+    return label
+
+
+def benchmark_statement(conn, sql: str, runs: int) -> dict:
+    """Time sql over runs executions after a warm-up, then record the buffers and plan of one EXPLAIN ANALYZE."""
+    timings = []
+    rows = 0
+    try:
+        with conn.cursor() as cur:
+            for attempt in range(runs + 1):
+                started = time.perf_counter()
+                cur.execute(sql)
+                rows = len(cur.fetchall())
+                if attempt:  # the first execution only warms the cache
+                    timings.append((time.perf_counter() - started) * 1000)
+            cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")
+            plan = cur.fetchone()[0][0]['Plan']
+    except psycopg2.errors.QueryCanceled:
+        conn.rollback()
+        return {'status': 'timeout'}
+    except psycopg2.Error as e:
+        conn.rollback()
+        return {'status': 'error', 'error': str(e).strip()}
+    conn.rollback()
+    return {
+        'status': 'ok',
+        'rows': rows,
+        'p50_ms': round(float(np.percentile(timings, 50)), 3),
+        'p95_ms': round(float(np.percentile(timings, 95)), 3),
+        'runs_ms': [round(t, 3) for t in timings],
+        'shared_hit': plan.get('Shared Hit Blocks', 0),
+        'shared_read': plan.get('Shared Read Blocks', 0),
+        'plan_shape': plan_shape(plan),
+    }
+
+
+def run_workload(db_params: Dict[str, str], workload: List[Tuple[str, str]], runs: int,
+                 statement_timeout: str) -> Dict[str, dict]:
+    # A dedicated session, so the timeout does not leak into pooled connections
+    conn = connect(db_params, {**resolve_session_settings(), 'statement_timeout': statement_timeout})
+    results = {}
+    try:
+        print(f"{'statement':<16} {'rows':>8} {'p50 (ms)':>10} {'p95 (ms)':>10} {'hit':>9} {'read':>9}")
+        for name, sql in workload:
+            result = benchmark_statement(conn, sql, runs)
+            results[name] = result
+            if result['status'] == 'ok':
+                print(f"{name:<16} {result['rows']:>8,} {result['p50_ms']:>10.1f} {result['p95_ms']:>10.1f} "
+                      f"{result['shared_hit']:>9,} {result['shared_read']:>9,}", flush=True)
+            else:
+                print(f"{name:<16} {result['status']}{': ' + result['error'] if 'error' in result else ''}", flush=True)
+        with conn.cursor() as cur:
+            cur.execute("SHOW server_version")
+            server_version = cur.fetchone()[0]
+    finally:
+        conn.close()
+    return {'server_version': server_version, 'results': results}
+
+
+def find_regressions(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float,
+                     min_delta_ms: float) -> List[str]:
+    """Statements slower than threshold x their baseline p50 (and by at least min_delta_ms), or no longer completing."""
+    regressions = []
+    for name, before in baseline.items():
+        after = results.get(name)
+        if after is None or before['status'] != 'ok':
+            continue
+        if after['status'] != 'ok':
+            regressions.append(f"{name}: {after['status']} (baseline p50 {before['p50_ms']:.1f} ms)")
+        elif (after['p50_ms'] > before['p50_ms'] * threshold
+              and after['p50_ms'] - before['p50_ms'] >= min_delta_ms):
+            regressions.append(f"{name}: p50 {before['p50_ms']:.1f} -> {after['p50_ms']:.1f} ms "
+                               f"({after['p50_ms'] / before['p50_ms']:.2f}x)")
+        if after['status'] == 'ok' and after['plan_shape'] != before['plan_shape']:
+            print(f"Plan of {name} changed:\n  before: {before['plan_shape']}\n  after:  {after['plan_shape']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the analysis queries and PL/pgSQL functions.")
+    parser.add_argument('--rows', type=int, default=50000, help="Synthetic source records to load (default: 50000)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--runs', type=int, default=5, help="Timed executions per statement (default: 5)")
+    parser.add_argument('--only', nargs='+', default=None, metavar='PREFIX',
+                        help="Only statements whose name starts with one of these (e.g. consulta_09 ejemplo_4)")
+    parser.add_argument('--statement-timeout', default='120s',
+                        help="Per-execution limit; statements exceeding it are recorded as timeouts (default: 120s)")
+    parser.add_argument('--output', type=Path, default=Path('benchmark_results.json'),
+                        help="JSON file for the results (default: benchmark_results.json)")
+    parser.add_argument('--baseline', type=Path, default=None,
+                        help="Results of an earlier run; exit with status 1 if a statement regressed")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="Largest accepted ratio of p50 to the baseline p50 (default: 1.25)")
+    parser.add_argument('--min-delta-ms', type=float, default=5.0,
+                        help="Slowdowns smaller than this are never regressions (default: 5 ms)")
+    parser.add_argument('--pg-bin', default=None, help="Directory with initdb and pg_ctl")
+    parser.add_argument('--existing', action='store_true',
+                        help="Benchmark the configured database (config.py or DB_HOST/DB_NAME/...) instead of a throwaway one")
+    args = parser.parse_args()
+
+    workload = build_workload(args.only)
+    if not workload:
+        parser.error("no statement matches --only")
+    baseline = json.loads(args.baseline.read_text())['results'] if args.baseline else None
+
+    if args.existing:
+        db_params = resolve_db_params()
+        measured = run_workload(db_params, workload, args.runs, args.statement_timeout)
+    else:
+        with throwaway_postgres(find_pg_bin(args.pg_bin)) as db_params:
+            load_synthetic(db_params, args.rows, args.seed)
+            measured = run_workload(db_params, workload, args.runs, args.statement_timeout)
+
+    report = {
+        'generated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'server_version': measured['server_version'],
+        'database': 'existing' if args.existing else 'synthetic',
+        'rows': None if args.existing else args.rows,
+        'runs': args.runs,
+        'results': measured['results'],
+    }
+    args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+    print(f"Results written to {args.output}")
+
+    if baseline is not None:
+        regressions = find_regressions(report['results'], baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"{len(regressions)} statement(s) regressed beyond {args.threshold}x:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold}x against {args.baseline}.")
+
+
+if __name__ == "__main__":
+    main()
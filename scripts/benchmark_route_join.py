@@ -0,0 +1,108 @@
+"""
+Benchmark for route_id assignment in the Flights table.
+
+Compares the original row-by-row lookup (DataFrame.apply over a full copy of the
+source frame) against the hash join used by AirlineDataNormalizer._build_flights_frame,
+on synthetic data. Both paths must produce the same flights table.
+
+Usage:
+    python scripts/benchmark_route_join.py --sizes 1000000 10000000
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent))
+from db_connection import resolve_db_params
+from normalize_to_postgres import AirlineDataNormalizer
+from synthetic_data import generate_source_frame
+
+# Only the columns read by the routes and flights builders are generated
+BENCHMARK_COLUMNS = [
+    'airportid_1', 'airportid_2', 'Geocoded_City1', 'Geocoded_City2',
+    'Year', 'quarter', 'passengers', 'fare', 'tbl1apk'
+]
+# The normalizer only connects when loading; no connection is opened by the benchmark
+DB_PARAMS = resolve_db_params()
+
+
+def legacy_build_flights_frame(normalizer: AirlineDataNormalizer, source: pd.DataFrame,
+                               slice_rows: Optional[int] = None) -> pd.DataFrame:
+    """Route lookup as originally implemented: copy the source and probe a MultiIndex Series per row.
+
+    With slice_rows the per-row apply runs over consecutive slices of the copy. The lookups are the
+    same; it only caps the memory of the boxed rows DataFrame.apply materializes at once.
+    """
+    flights_df = source.copy()
+    route_mapping = normalizer.tables['routes'].set_index(['origin_airport_id', 'destination_airport_id'])['route_id']
+    slice_rows = slice_rows or max(len(flights_df), 1)
+    flights_df['route_id'] = pd.concat([
+        flights_df.iloc[start:start + slice_rows].apply(
+            lambda row: route_mapping.get((row['airportid_1'], row['airportid_2'])), axis=1
+        )
+        for start in range(0, len(flights_df), slice_rows)
+    ])
+    flights_df = flights_df.dropna(subset=['route_id'])
+    flights_df['route_id'] = flights_df['route_id'].astype(int)
+    flights_df = flights_df.reset_index(drop=True)
+    flights_df['flight_id'] = flights_df.index + 1
+    flights_df['passengers'] = flights_df['passengers'].astype('Int64')
+    return flights_df[[
+        'flight_id', 'route_id', 'Year', 'quarter', 'passengers', 'fare', 'tbl1apk'
+    ]].rename(columns={'Year': 'year', 'tbl1apk': 'source_record_id'})
+
+
+def time_call(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def run_size(n_rows: int, skip_legacy: bool, legacy_slice_rows: Optional[int]) -> dict:
+    normalizer = AirlineDataNormalizer('<synthetic>', DB_PARAMS)
+    normalizer.df = normalizer._clean_data_types(generate_source_frame(n_rows, columns=BENCHMARK_COLUMNS))
+    with contextlib.redirect_stdout(io.StringIO()):
+        normalizer.create_routes_table()
+
+    flights, hash_join_seconds = time_call(normalizer._build_flights_frame, normalizer.df)
+    result = {'rows': n_rows, 'routes': len(normalizer.tables['routes']), 'hash_join': hash_join_seconds}
+
+    if not skip_legacy:
+        legacy_flights, legacy_seconds = time_call(
+            legacy_build_flights_frame, normalizer, normalizer.df, legacy_slice_rows
+        )
+        pd.testing.assert_frame_equal(flights, legacy_flights)
+        result['legacy'] = legacy_seconds
+        del legacy_flights
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark route_id assignment for the Flights table.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000000, 10000000],
+                        help="Source row counts to benchmark (default: 1000000 10000000)")
+    parser.add_argument('--skip-legacy', action='store_true',
+                        help="Only time the hash join (the row-by-row path takes minutes at 10M rows)")
+    parser.add_argument('--legacy-slice-rows', type=int, default=None,
+                        help="Run the row-by-row path over slices of this many rows; a single apply over "
+                             "10M rows needs more than 6 GB of memory")
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'routes':>8} {'legacy (s)':>12} {'hash join (s)':>14} {'speedup':>9}")
+    for n_rows in args.sizes:
+        result = run_size(n_rows, args.skip_legacy, args.legacy_slice_rows)
+        legacy = result.get('legacy', np.nan)
+        print(f"{result['rows']:>12,} {result['routes']:>8,} {legacy:>12.2f} "
+              f"{result['hash_join']:>14.2f} {legacy / result['hash_join']:>8.1f}x", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Check the optimized query library against the original queries.
+
+Every "-- Consulta N" in sql/sqlConsultation/queries_optimized.sql is run next to
+the query with the same number in sql/sqlConsultation/queries.sql. Both must return
+the same rows. With --explain-dir, the EXPLAIN ANALYZE plan of each side is written
+there as consulta_NN_original.txt and consulta_NN_optimized.txt.
+
+Exits with status 1 when any pair returns different rows.
+
+Usage:
+    python scripts/compare_queries.py --explain-dir explain/
+    python scripts/compare_queries.py --queries 9 --repeat 5
+"""
+
+import argparse
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Optional
+
+sys.path.append(str(Path(__file__).parent))
+from db_connection import connection
+
+SQL_DIR = Path(__file__).parent.parent / "sql" / "sqlConsultation"
+ORIGINAL_QUERIES_FILE = SQL_DIR / "queries.sql"
+OPTIMIZED_QUERIES_FILE = SQL_DIR / "queries_optimized.sql"
+
+QUERY_HEADER = re.compile(r'^-- Consulta (\d+)\b', re.MULTILINE)
+
+
+def load_queries(path: Path) -> Dict[int, str]:
+    """Map each "-- Consulta N" header of a query file to the statement that follows it."""
+    text = path.read_text(encoding='utf-8')
+    headers = list(QUERY_HEADER.finditer(text))
+    queries = {}
+    for header, following in zip(headers, headers[1:] + [None]):
+        end = following.start() if following else len(text)
+        queries[int(header.group(1))] = text[header.start():end].strip().rstrip(';')
+    return queries
+
+
+def run_query(cur, sql: str, repeat: int):
+    """Return the rows of sql and the best wall time over repeat runs."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        cur.execute(sql)
+        rows = cur.fetchall()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return rows, best
+
+
+def write_plan(cur, sql: str, path: Path) -> None:
+    cur.execute(f"EXPLAIN (ANALYZE, BUFFERS) {sql}")
+    path.write_text('\n'.join(row[0] for row in cur.fetchall()) + '\n', encoding='utf-8')
+
+
+def compare(number: int, original: str, optimized: str, cur, repeat: int,
+            explain_dir: Optional[Path]) -> bool:
+    original_rows, original_seconds = run_query(cur, original, repeat)
+    optimized_rows, optimized_seconds = run_query(cur, optimized, repeat)
+    if original_rows == optimized_rows:
+        verdict = "identical"
+    elif Counter(original_rows) == Counter(optimized_rows):
+        # Rows that tie on the ORDER BY keys may come back in either order
+        verdict = "identical (order of tied rows differs)"
+    else:
+        verdict = "DIFFERENT"
+    print(f"{number:>8} {len(original_rows):>8,} {original_seconds * 1000:>14.1f} "
+          f"{optimized_seconds * 1000:>15.1f} {original_seconds / optimized_seconds:>8.1f}x  {verdict}", flush=True)
+    if explain_dir:
+        write_plan(cur, original, explain_dir / f"consulta_{number:02d}_original.txt")
+        write_plan(cur, optimized, explain_dir / f"consulta_{number:02d}_optimized.txt")
+    return verdict != "DIFFERENT"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the optimized queries against the originals.")
+    parser.add_argument('--queries', type=int, nargs='+', default=None,
+                        help="Query numbers to compare (default: every query in the optimized file)")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per query; the best time is reported (default: 3)")
+    parser.add_argument('--explain-dir', type=Path, default=None,
+                        help="Directory for the EXPLAIN ANALYZE plans of both versions")
+    args = parser.parse_args()
+
+    original = load_queries(ORIGINAL_QUERIES_FILE)
+    optimized = load_queries(OPTIMIZED_QUERIES_FILE)
+    numbers = args.queries or sorted(optimized)
+    missing = [n for n in numbers if n not in optimized or n not in original]
+    if missing:
+        parser.error(f"no query {', '.join(map(str, missing))} in both files")
+    if args.explain_dir:
+        args.explain_dir.mkdir(parents=True, exist_ok=True)
+
+    all_identical = True
+    with connection() as conn, conn.cursor() as cur:
+        print(f"{'consulta':>8} {'rows':>8} {'original (ms)':>14} {'optimized (ms)':>15} {'speedup':>9}  result")
+        for number in numbers:
+            all_identical &= compare(number, original[number], optimized[number], cur, args.repeat,
+                                     args.explain_dir)
+    if args.explain_dir:
+        print(f"EXPLAIN ANALYZE plans written to {args.explain_dir}")
+    sys.exit(0 if all_identical else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Shared PostgreSQL access for the scripts.
+
+Connection settings are resolved once: the DB_* environment variables, overridden by
+config.py when it exists (either its DB_CONFIG dict or the DB_HOST/DB_NAME/... names of
+older configs). Every connection is opened with TCP keepalives, a connect timeout, the
+configured sslmode and the session settings (work_mem, statement_timeout, ...) passed
+as startup options, so they cost no extra round trip.
+
+Connections are handed out by a bounded pool per set of parameters. A borrowed
+connection that sat idle for a while is checked with SELECT 1 and replaced if the
+server dropped it; a returned connection is rolled back and its session settings are
+reset. Reusing connections keeps the TCP and TLS handshakes with a remote server (RDS)
+out of every short job, since libpq has no TLS session resumption of its own.
+
+create_sqlalchemy_engine() does not borrow from these pools: SQLAlchemy keeps its own
+QueuePool of up to DEFAULT_POOL_MAX connections (opened by connect(), so with the same
+options and settings), which exists next to the shared pool of the same parameters.
+
+Usage:
+    from db_connection import connection
+    with connection() as conn:
+        ...
+"""
+
+import contextlib
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+DEFAULT_DB_PARAMS = {
+    "host": os.getenv("DB_HOST", "database-2.cjo0kekim2zi.us-east-2.rds.amazonaws.com"),
+    "dbname": os.getenv("DB_NAME", "proyectobd2"),
+    "user": os.getenv("DB_USER", "postgres"),
+    "password": os.getenv("DB_PASS", "sytpAq-syfci3-cudrud"),
+    "port": os.getenv("DB_PORT", "5432"),
+    "sslmode": os.getenv("DB_SSLMODE", "prefer"),
+}
+# Names older config.py files use for the connection parameters
+CONFIG_ATTRIBUTES = {'DB_HOST': 'host', 'DB_NAME': 'dbname', 'DB_USER': 'user', 'DB_PASS': 'password',
+                     'DB_PORT': 'port', 'DB_SSLMODE': 'sslmode'}
+
+# Applied to every session at connect time; empty values keep the server default
+DEFAULT_SESSION_SETTINGS = {
+    'work_mem': os.getenv('DB_WORK_MEM', ''),
+    'statement_timeout': os.getenv('DB_STATEMENT_TIMEOUT', ''),
+}
+# Client-side connection options (libpq keywords)
+CONNECTION_OPTIONS = {
+    'connect_timeout': 10,
+    'keepalives': 1,
+    'keepalives_idle': 30,
+    'keepalives_interval': 10,
+    'keepalives_count': 5,
+    'application_name': 'USAirlinesBD2',
+    # The SQL files and query labels are in Spanish
+    'client_encoding': 'UTF8',
+}
+
+DEFAULT_POOL_MAX = int(os.getenv('DB_POOL_MAX', '8'))
+# A pooled connection idle for longer than this is probed before it is handed out
+HEALTH_CHECK_IDLE_SECONDS = 30
+
+_pools: Dict[tuple, 'ConnectionPool'] = {}
+_pools_lock = threading.Lock()
+
+
+def _load_config():
+    try:
+        import config
+        return config
+    except ImportError:
+        return None
+
+
+def resolve_db_params() -> Dict[str, str]:
+    """Connection parameters from config.py when present, else from the DB_* environment variables."""
+    params = dict(DEFAULT_DB_PARAMS)
+    config = _load_config()
+    if config is not None:
+        params.update(getattr(config, 'DB_CONFIG', {}))
+        for attribute, key in CONFIG_ATTRIBUTES.items():
+            if hasattr(config, attribute):
+                params[key] = getattr(config, attribute)
+    return params
+
+
+def resolve_session_settings() -> Dict[str, str]:
+    """Session settings from DEFAULT_SESSION_SETTINGS, overridden by DB_SESSION_SETTINGS in config.py."""
+    settings = dict(DEFAULT_SESSION_SETTINGS)
+    config = _load_config()
+    if config is not None:
+        settings.update(getattr(config, 'DB_SESSION_SETTINGS', {}))
+    return {name: str(value) for name, value in settings.items() if value not in (None, '')}
+
+
+def connection_kwargs(params: Optional[Dict[str, str]] = None,
+                      session_settings: Optional[Dict[str, str]] = None) -> Dict[str, object]:
+    """psycopg2.connect() arguments: params plus the shared client options and session settings."""
+    kwargs = {**CONNECTION_OPTIONS, **(params or resolve_db_params())}
+    settings = resolve_session_settings() if session_settings is None else session_settings
+    options = ' '.join(f"-c {name}={value}" for name, value in settings.items())
+    if options:
+        kwargs['options'] = f"{kwargs['options']} {options}" if kwargs.get('options') else options
+    return kwargs
+
+
+def connect(params: Optional[Dict[str, str]] = None, session_settings: Optional[Dict[str, str]] = None):
+    """Open a single connection with the shared client options and session settings."""
+    return psycopg2.connect(**connection_kwargs(params, session_settings))
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of at most maxconn connections, opened on first use and kept open
+    between borrows. getconn() waits for a free connection instead of failing when all
+    are in use.
+    """
+
+    def __init__(self, params: Optional[Dict[str, str]] = None, maxconn: int = DEFAULT_POOL_MAX,
+                 session_settings: Optional[Dict[str, str]] = None):
+        if maxconn < 1:
+            raise ValueError(f"maxconn must be at least 1, got {maxconn}")
+        self.params = dict(params or resolve_db_params())
+        self.session_settings = session_settings
+        self.maxconn = maxconn
+        # Never more borrowers than maxconn, so never more connections
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._lock = threading.Lock()
+        # (connection, time it was returned), most recently returned last
+        self._idle: List[Tuple[object, float]] = []
+        self._in_use = set()
+
+    def getconn(self):
+        self._slots.acquire()
+        try:
+            while True:
+                with self._lock:
+                    conn, returned_at = self._idle.pop() if self._idle else (None, None)
+                if conn is None:
+                    conn = connect(self.params, self.session_settings)
+                elif not self._is_healthy(conn, returned_at):
+                    conn.close()
+                    continue
+                with self._lock:
+                    self._in_use.add(conn)
+                return conn
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn, close: bool = False) -> None:
+        try:
+            with self._lock:
+                self._in_use.discard(conn)
+            if close or conn.closed or not self._reset(conn):
+                conn.close()
+            else:
+                with self._lock:
+                    self._idle.append((conn, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def closeall(self) -> None:
+        with self._lock:
+            connections = [conn for conn, _ in self._idle] + list(self._in_use)
+            self._idle.clear()
+            self._in_use.clear()
+        for conn in connections:
+            conn.close()
+
+    @contextlib.contextmanager
+    def connection(self) -> Iterator:
+        """Borrow a connection; commit when the block succeeds, roll back when it raises."""
+        conn = self.getconn()
+        try:
+            yield conn
+            if not conn.closed and not conn.autocommit:
+                conn.commit()
+        except BaseException:
+            if not conn.closed and not conn.autocommit:
+                conn.rollback()
+            raise
+        finally:
+            self.putconn(conn)
+
+    @staticmethod
+    def _is_healthy(conn, returned_at: float) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - returned_at < HEALTH_CHECK_IDLE_SECONDS:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    @staticmethod
+    def _reset(conn) -> bool:
+        """Return conn to its startup state (no open transaction, autocommit off, startup settings)."""
+        try:
+            if conn.info.transaction_status != TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                # Back to the values the session started with, including the startup options
+                cur.execute("RESET ALL")
+            conn.autocommit = False
+            return True
+        except psycopg2.Error:
+            return False
+
+
+def get_pool(params: Optional[Dict[str, str]] = None) -> ConnectionPool:
+    """The process-wide pool for params (the configured database by default)."""
+    params = dict(params or resolve_db_params())
+    key = tuple(sorted(params.items()))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(params)
+        return _pools[key]
+
+
+@contextlib.contextmanager
+def connection(params: Optional[Dict[str, str]] = None) -> Iterator:
+    """Borrow a connection from the shared pool for params (see ConnectionPool.connection)."""
+    with get_pool(params).connection() as conn:
+        yield conn
+
+
+def create_sqlalchemy_engine(params: Optional[Dict[str, str]] = None):
+    """
+    SQLAlchemy engine whose connections are opened by connect(), with the same options and
+    settings. The engine keeps them in its own QueuePool (up to DEFAULT_POOL_MAX), separate
+    from the pool get_pool() returns for the same parameters.
+    """
+    from sqlalchemy import create_engine
+    params = dict(params or resolve_db_params())
+    return create_engine("postgresql+psycopg2://", creator=lambda: connect(params),
+                         pool_size=DEFAULT_POOL_MAX, pool_pre_ping=True)
+
+
+def describe(params: Optional[Dict[str, str]] = None) -> str:
+    params = params or resolve_db_params()
+    return f"{params['host']}:{params['port']}/{params['dbname']}"
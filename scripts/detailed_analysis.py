@@ -1,14 +1,27 @@
+import argparse
+
 import pandas as pd
 import numpy as np
 from datetime import datetime
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-def load_data():
+from source_cache import cached_frame
+
+# Versión del snapshot 'detailed-analysis'; incrementarla si cambia la lectura que lo genera
+DETAILED_ANALYSIS_SNAPSHOT_VERSION = 1
+
+def load_data(no_cache=False):
     """Carga y preprocesa el dataset."""
     file_path = 'archive/US Airline Flight Routes and Fares 1993-2024.csv'
     try:
-        df = pd.read_csv(file_path, sep=',', encoding='utf-8', on_bad_lines='skip', low_memory=False)
+        # Reutiliza el snapshot Arrow de una lectura previa si el archivo no cambió
+        df = cached_frame(
+            file_path, 'detailed-analysis',
+            lambda: pd.read_csv(file_path, sep=',', encoding='utf-8', on_bad_lines='skip', low_memory=False),
+            no_cache=no_cache,
+            version=DETAILED_ANALYSIS_SNAPSHOT_VERSION
+        )
         print(f"Dataset cargado exitosamente: {len(df)} registros, {len(df.columns)} columnas")
         return df
     except Exception as e:
@@ -94,8 +107,13 @@ def analyze_seasonal_patterns(df):
     print(f"Trimestre más barato: Q{avg_quarterly_fare.idxmin()} (${avg_quarterly_fare.min():.2f})")
 
 def main():
+    parser = argparse.ArgumentParser(description="Análisis estadístico detallado del CSV de rutas y tarifas.")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Leer el CSV aunque exista un snapshot (también AIRLINE_CSV_CACHE=0)")
+    args = parser.parse_args()
+
     print("Cargando datos...")
-    df = load_data()
+    df = load_data(no_cache=args.no_cache)
     
     if df is None:
         print("No se pudieron cargar los datos. Saliendo...")
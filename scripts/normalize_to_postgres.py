@@ -3,19 +3,200 @@ import numpy as np
 import psycopg2
 from psycopg2.extras import execute_values
 import os
-from sqlalchemy import create_engine
 import sys
 import re
-from typing import Dict, Optional
+import io
+import hashlib
+import time
+import argparse
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from db_connection import ConnectionPool, get_pool, resolve_db_params
+from source_cache import cached_frame
+from source_schema import NORMALIZER_COLUMNS, iter_source_csv, read_source_csv
+
+# name_normalization lives at the repository root, next to the CSV tools that share it
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from name_normalization import parse_city_state, strip_trailing_parenthetical
+
+# --- Streaming Settings ---
+# Memory budget used to size the chunks read in streaming mode
+DEFAULT_MEMORY_BUDGET_MB = 512
+# A chunk is held in memory several times over while it is processed (raw read,
+# cleaned frame, flights and market share rows, insert buffers), so the budget
+# is divided by this factor before converting it to a row count.
+CHUNK_WORKING_SET_FACTOR = 6
+MIN_CHUNK_ROWS = 1000
+CHUNK_SIZE_SAMPLE_ROWS = 5000
+# --- End Streaming Settings ---
+
+# --- Loader Settings ---
+# 'insert' sends multi-row INSERTs (execute_values) on the load connection, 'copy' streams
+# each table through COPY ... FROM STDIN from an in-memory CSV buffer.
+LOADERS = ('insert', 'copy')
+DEFAULT_LOADER = 'insert'
+# Rows serialized into one in-memory buffer per COPY call
+COPY_BATCH_ROWS = 100000
+# Rows per multi-row INSERT statement of the 'insert' loader
+INSERT_PAGE_ROWS = 1000
+COPY_NULL_MARKER = '\\N'
+# Connections used by the parallel load; 1 keeps the sequential load
+DEFAULT_LOAD_WORKERS = 1
+# Tables within a stage have no foreign keys between them and load concurrently.
+# A stage only starts once every table of the previous stage is complete.
+LOAD_STAGES = [('cities', 'carriers'), ('airports',), ('routes',), ('flights',), ('market_share',)]
+# Fact tables are split by year so their partitions load over several connections
+PARTITIONED_LOAD_TABLES = ('flights', 'market_share')
+# --- End Loader Settings ---
+
+# --- Incremental Load Settings ---
+# Source columns identifying a slice; the watermark table keeps one row per slice
+SLICE_COLUMNS = ['Year', 'quarter']
+# pg_advisory_xact_lock key that serializes concurrent incremental runs
+INCREMENTAL_LOCK_KEY = 19932024
+# --- End Incremental Load Settings ---
+
+# --- Partitioning Settings ---
+# flights and market_share can be range-partitioned by year or by (year, quarter). A partition is
+# created for each key present in the data right before rows are written into it.
+PARTITION_KEY_COLUMNS = {'year': ['year'], 'quarter': ['year', 'quarter']}
+PARTITIONED_TABLES = ('flights', 'market_share')
+# Schema that receives the partitions detached with --detach-years
+ARCHIVE_SCHEMA = 'archive'
+# --- End Partitioning Settings ---
+
+# --- Rollup Settings ---
+# Aggregates of flights x market_share kept by the ETL for the analyst functions and queries,
+# which read these instead of the raw facts. Every measure is additive (count, sum, min, max,
+# sum of squares), so averages and standard deviations over any set of rows can be rebuilt from
+# them. Slices are refreshed with the fact rows they aggregate.
+ROLLUP_TABLES = ('route_quarter_stats', 'route_quarter_carrier_stats')
+# {slice_join} restricts the refresh to the slices passed to execute_values
+ROLLUP_REFRESH_SQL = {
+    'route_quarter_stats': """
+        INSERT INTO route_quarter_stats
+        SELECT f.route_id, f.year, f.quarter,
+               COUNT(*),
+               COUNT(DISTINCT f.flight_id) FILTER (WHERE ms.fare_avg IS NOT NULL),
+               COUNT(ms.fare_avg), SUM(ms.fare_avg), MIN(ms.fare_avg), MAX(ms.fare_avg),
+               SUM(ms.fare_avg * ms.fare_avg)
+        FROM flights f
+        JOIN market_share ms ON ms.flight_id = f.flight_id{slice_join}
+        GROUP BY f.route_id, f.year, f.quarter""",
+    'route_quarter_carrier_stats': """
+        INSERT INTO route_quarter_carrier_stats
+        SELECT route_id, year, quarter, carrier_id,
+               COUNT(DISTINCT flight_id),
+               COUNT(DISTINCT flight_id) FILTER (WHERE carrier_id = first_carrier_of_type),
+               COUNT(*), SUM(fare), MIN(fare), MAX(fare), SUM(fare * fare),
+               COUNT(share), SUM(share), MIN(share), MAX(share), SUM(share * share),
+               SUM(fare) FILTER (WHERE share IS NOT NULL),
+               COUNT(DISTINCT flight_id) FILTER (WHERE share IS NOT NULL)
+        FROM (
+            SELECT f.route_id, f.year, f.quarter, f.flight_id, ms.carrier_id,
+                   ms.fare_avg AS fare, ms.market_share_percentage AS share,
+                   MIN(ms.carrier_id) OVER (PARTITION BY f.flight_id, c.carrier_type) AS first_carrier_of_type
+            FROM flights f
+            JOIN market_share ms ON ms.flight_id = f.flight_id{slice_join}
+            JOIN carriers c ON c.carrier_id = ms.carrier_id
+            WHERE ms.fare_avg IS NOT NULL
+        ) fare_rows
+        GROUP BY route_id, year, quarter, carrier_id""",
+}
+ROLLUP_SLICE_JOIN = "\n        JOIN (VALUES %s) AS s(year, quarter) ON f.year = s.year AND f.quarter = s.quarter"
+# --- End Rollup Settings ---
+
+# --- Secondary Index Settings ---
+# Built after the load completes, never before, so bulk inserts do not maintain them row by row.
+# (name, table, columns), chosen from the joins and filters in sql/sqlConsultation/queries.sql
+# and sql/plsql/psql_fixed.sql. Lookups already covered by a primary key or by the leading
+# column of a UNIQUE constraint (market_share.flight_id, routes.origin_airport_id,
+# carriers.carrier_code) are left out.
+SECONDARY_INDEXES = [
+    ('idx_flights_route_year_quarter', 'flights', ('route_id', 'year', 'quarter')),
+    ('idx_flights_year_quarter', 'flights', ('year', 'quarter')),
+    ('idx_market_share_carrier', 'market_share', ('carrier_id',)),
+    ('idx_airports_code', 'airports', ('airport_code',)),
+    ('idx_airports_city_market', 'airports', ('city_market_id',)),
+    ('idx_routes_destination', 'routes', ('destination_airport_id',)),
+    ('idx_cities_name', 'cities', ('city_name',)),
+    ('idx_route_quarter_carrier_stats_carrier', 'route_quarter_carrier_stats', ('carrier_id', 'year')),
+]
+# Sort memory for each index build session
+INDEX_MAINTENANCE_WORK_MEM = '256MB'
+# --- End Secondary Index Settings ---
+
+# Identifier and code columns are read as text in streaming mode so every chunk
+# gets the same representation regardless of which values it happens to contain.
+STREAMING_TEXT_COLUMNS = [
+    'airportid_1', 'airportid_2', 'citymarketid_1', 'citymarketid_2',
+    'airport_1', 'airport_2', 'city1', 'city2', 'carrier_lg', 'carrier_low', 'tbl1apk'
+]
+
+# Version of the cleaned-frame snapshot ('normalizer-clean'); bump it whenever
+# _read_clean_source or the _clean_* steps change the frame they produce
+NORMALIZER_CLEAN_VERSION = 2
+
+# Source columns holding BTS airport IDs, loaded as the integer airports key
+AIRPORT_ID_COLUMNS = ['airportid_1', 'airportid_2']
+
+# Source columns read by each dimension table. While streaming only the distinct
+# combinations of these columns are kept, which preserves first-occurrence order.
+DIMENSION_SOURCE_COLUMNS = {
+    'cities': ['citymarketid_1', 'city1', 'city2', 'citymarketid_2'],
+    'airports': ['airportid_1', 'airport_1', 'citymarketid_1', 'airportid_2', 'airport_2', 'citymarketid_2'],
+    'carriers': ['carrier_lg', 'carrier_low'],
+    'routes': ['airportid_1', 'airportid_2', 'Geocoded_City1', 'Geocoded_City2'],
+}
+
+# --- Distance Settings ---
+# Typical US flight distances; a geocoded candidate outside this range is rejected
+DISTANCE_RANGE_MILES = (200, 3000)
+# Scale factors tried in order, raw values first (values may be in tens of miles, hundreds, etc.)
+DISTANCE_SCALE_FACTORS = (1, 0.1, 0.01, 10, 100)
+# --- End Distance Settings ---
+
+
+def calculate_distances_from_geocoded(geo1, geo2) -> np.ndarray:
+    """
+    Derive route distances from the geocoded values, for whole arrays at once.
+    This is experimental - the exact meaning of these geocoded values isn't clear.
+
+    For each scale factor in order, the candidates are geo1, geo2, their absolute
+    difference and their average; the first scaled candidate inside
+    DISTANCE_RANGE_MILES is the distance. Rows with a missing value, or where no
+    candidate fits, get NaN.
+    """
+    geo1 = np.asarray(geo1, dtype=float)
+    geo2 = np.asarray(geo2, dtype=float)
+    distance_diff = np.abs(geo2 - geo1)
+    distance_avg = (geo1 + geo2) / 2
+    low, high = DISTANCE_RANGE_MILES
+
+    conditions, choices = [], []
+    for scale in DISTANCE_SCALE_FACTORS:
+        for candidate in (geo1, geo2, distance_diff, distance_avg):
+            scaled = candidate * scale
+            conditions.append((scaled >= low) & (scaled <= high))
+            choices.append(scaled)
+    # np.select picks the first matching condition, which preserves the rule order
+    distances = np.select(conditions, choices, default=np.nan)
+    distances[np.isnan(geo1) | np.isnan(geo2)] = np.nan
+    return distances
+
+
+def map_distinct_values(series: pd.Series, transform) -> pd.Series:
+    """
+    Run transform once over the distinct values of series and broadcast the result back to
+    every row. transform receives a Series of the distinct values and returns a Series or
+    DataFrame aligned with it, so the cost depends on cardinality rather than row count.
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    mapped = transform(pd.Series(uniques, dtype=series.dtype))
+    return mapped.take(codes).set_axis(series.index)
 
-# --- PostgreSQL Connection Details ---
-# Using environment variables for security
-DB_HOST = os.getenv("DB_HOST", "database-2.cjo0kekim2zi.us-east-2.rds.amazonaws.com")
-DB_NAME = os.getenv("DB_NAME", "proyectobd2")
-DB_USER = os.getenv("DB_USER", "postgres")
-DB_PASS = os.getenv("DB_PASS", "sytpAq-syfci3-cudrud")
-DB_PORT = os.getenv("DB_PORT", "5432")
-# --- End Connection Details ---
 
 class AirlineDataNormalizer:
     """
@@ -25,41 +206,53 @@ class AirlineDataNormalizer:
     converting raw CSV data into a 3NF (Third Normal Form) database schema.
     """
     
-    def __init__(self, csv_file_path: str, db_params: Dict[str, str]):
+    def __init__(self, csv_file_path: str, db_params: Dict[str, str],
+                 chunk_size: Optional[int] = None,
+                 memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB,
+                 loader: str = DEFAULT_LOADER,
+                 workers: int = DEFAULT_LOAD_WORKERS,
+                 use_cache: bool = True,
+                 partition_by: Optional[str] = None):
         self.csv_file_path = csv_file_path
         self.df = None
         self.tables = {}
         self.db_params = db_params
-        
-        try:
-            self.engine = create_engine(
-                f"postgresql+psycopg2://{db_params['user']}:{db_params['password']}@"
-                f"{db_params['host']}:{db_params['port']}/{db_params['dbname']}"
-            )
-        except Exception as e:
-            print(f"Error creating SQLAlchemy engine: {e}")
-            sys.exit(1)
+        # Streaming mode settings: an explicit chunk_size wins over the memory budget
+        self.chunk_size = chunk_size
+        self.memory_budget_mb = memory_budget_mb
+        self.fact_row_counts = {}
+        # (year, quarter) -> row hashes of the chunks streamed so far
+        self.streamed_slice_hashes = {}
+        if loader not in LOADERS:
+            raise ValueError(f"Unknown loader '{loader}', expected one of {LOADERS}")
+        self.loader = loader
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        self.workers = workers
+        if partition_by is not None and partition_by not in PARTITION_KEY_COLUMNS:
+            raise ValueError(f"Unknown partition scheme '{partition_by}', expected one of {tuple(PARTITION_KEY_COLUMNS)}")
+        self.partition_by = partition_by
+        # Key columns of the fact table partitions; empty when the tables are not partitioned
+        self.partition_columns = PARTITION_KEY_COLUMNS.get(partition_by, [])
+        # Partition keys created by this run
+        self.created_partitions = set()
+        # Read the cleaned source from its Arrow snapshot when one matches the file (batch mode only)
+        self.use_cache = use_cache
+        # Rows and seconds spent per table by the loader, for throughput reporting
+        self.load_stats = {}
+        # distance_miles by (origin_airport_id, destination_airport_id) from the last routes build
+        self.route_distances = None
+        # Seconds spent building each secondary index, for reporting
+        self.index_stats = {}
 
     def load_data(self) -> bool:
         """Load and clean the CSV data."""
         print("Loading CSV data...")
         try:
-            self.df = pd.read_csv(
-                self.csv_file_path, 
-                sep=',', 
-                encoding='utf-8',
-                on_bad_lines='skip', 
-                low_memory=False
-            )
-            print(f"Loaded {len(self.df)} records with {len(self.df.columns)} columns")
-            initial_count = len(self.df)
-
-            # Clean and process data
-            self._clean_data_types()
-            self._validate_essential_fields()
-            self._clean_carrier_codes()
-            
-            print(f"After cleaning: {len(self.df)} records ({initial_count - len(self.df)} removed)")
+            # The cleaned frame is snapshotted, so later runs on the same file skip parsing and cleaning
+            self.df = cached_frame(self.csv_file_path, 'normalizer-clean', self._read_clean_source,
+                                   columns=NORMALIZER_COLUMNS, no_cache=not self.use_cache,
+                                   version=NORMALIZER_CLEAN_VERSION)
             
             if self.df.empty:
                 print("No data left after cleaning. Halting.")
@@ -72,35 +265,66 @@ class AirlineDataNormalizer:
             traceback.print_exc()
             return False
 
-    def _clean_data_types(self) -> None:
+    def _read_clean_source(self) -> pd.DataFrame:
+        df = read_source_csv(self.csv_file_path, NORMALIZER_COLUMNS)
+        print(f"Loaded {len(df)} records with {len(df.columns)} columns")
+        initial_count = len(df)
+
+        # Clean and process data
+        df = self._clean_frame(df)
+
+        print(f"After cleaning: {len(df)} records ({initial_count - len(df)} removed)")
+        return df
+
+    def _clean_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Apply the type, essential-field and carrier-code cleaning steps to a frame."""
+        df = self._clean_data_types(df)
+        df = self._validate_essential_fields(df)
+        return self._clean_carrier_codes(df)
+
+    def _clean_data_types(self, df: pd.DataFrame) -> pd.DataFrame:
         """Clean and convert data types for essential columns."""
-        # Convert ID fields to string
-        id_cols = ['airportid_1', 'airportid_2', 'citymarketid_1', 'citymarketid_2']
+        def to_stripped_str(values: pd.Series) -> pd.Series:
+            # Categorical columns from the read schema are stripped once per category
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                return map_distinct_values(values, lambda distinct: distinct.astype(str).str.strip())
+            return values.astype(str).str.strip()
+
+        # Convert city market IDs to string
+        id_cols = ['citymarketid_1', 'citymarketid_2']
         for col in id_cols:
-            if col in self.df.columns:
-                self.df[col] = self.df[col].astype(str).str.strip()
-        
+            if col in df.columns:
+                df[col] = to_stripped_str(df[col])
+
+        # BTS airport IDs are numeric and become the integer airports key; unparseable IDs turn
+        # into NaN and the row is dropped by _validate_essential_fields
+        for col in AIRPORT_ID_COLUMNS:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+
         # Convert airport and carrier codes to string
         string_cols = ['airport_1', 'airport_2', 'city1', 'city2', 'carrier_lg', 'carrier_low']
         for col in string_cols:
-            if col in self.df.columns:
-                self.df[col] = self.df[col].astype(str).str.strip()
+            if col in df.columns:
+                df[col] = to_stripped_str(df[col])
 
         # Convert numeric columns
-        numeric_cols = ['Year', 'quarter', 'fare', 'large_ms', 'fare_lg', 'lf_ms', 'fare_low']
+        numeric_cols = ['Year', 'quarter', 'passengers', 'fare', 'large_ms', 'fare_lg', 'lf_ms', 'fare_low']
         for col in numeric_cols:
-            if col in self.df.columns:
-                self.df[col] = pd.to_numeric(self.df[col], errors='coerce')
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+        return df
 
-    def _validate_essential_fields(self) -> None:
+    def _validate_essential_fields(self, df: pd.DataFrame) -> pd.DataFrame:
         """Remove rows with missing essential data."""
         essential_fields = [
-            'Year', 'citymarketid_1', 'citymarketid_2', 
+            'Year', 'citymarketid_1', 'citymarketid_2',
             'airportid_1', 'airportid_2', 'airport_1', 'airport_2'
         ]
-        self.df = self.df.dropna(subset=essential_fields)
+        df = df.dropna(subset=essential_fields)
+        return df.astype({col: 'int64' for col in AIRPORT_ID_COLUMNS if col in df.columns})
 
-    def _clean_carrier_codes(self) -> None:
+    def _clean_carrier_codes(self, df: pd.DataFrame) -> pd.DataFrame:
         """Clean and validate carrier codes."""
         def validate_carrier_code(code_val) -> Optional[str]:
             if pd.isna(code_val):
@@ -114,14 +338,16 @@ class AirlineDataNormalizer:
             return np.nan
 
         for col in ['carrier_lg', 'carrier_low']:
-            if col in self.df.columns:
-                self.df[col] = self.df[col].apply(validate_carrier_code)
+            if col in df.columns:
+                df[col] = map_distinct_values(df[col], lambda distinct: distinct.apply(validate_carrier_code))
+        return df
 
-    def create_cities_table(self):
+    def create_cities_table(self, source: Optional[pd.DataFrame] = None):
         print("Creating Cities table DataFrame...")
-        
+        source = self.df if source is None else source
+
         # City 1 processing: name from df['city1'], state from df['city2']
-        cities1_df = self.df[['citymarketid_1', 'city1', 'city2']].copy()
+        cities1_df = source[['citymarketid_1', 'city1', 'city2']].copy()
         cities1_df.rename(columns={
             'citymarketid_1': 'city_market_id', 
             'city1': 'raw_city_name', # Will be further processed
@@ -133,14 +359,15 @@ class AirlineDataNormalizer:
         cities1_df['city_market_id'] = cities1_df['city_market_id'].astype(int)
 
         # Extract state for City 1: from raw_state (original city2 col), expect 2 uppercase chars
-        cities1_df['state'] = cities1_df['raw_state'].astype(str).str.strip().apply(
+        # The raw names repeat across millions of rows, so each is parsed once per distinct value
+        cities1_df['state'] = map_distinct_values(cities1_df['raw_state'], lambda raw: raw.astype(str).str.strip().apply(
             lambda x: x if isinstance(x, str) and len(x) == 2 and x.isupper() else pd.NA
-        )
+        ))
         
         # Extract city_name for City 1: from raw_city_name (original city1 col)
         # Attempt to remove (Metropolitan Area) or similar suffixes
-        cities1_df['city_name'] = cities1_df['raw_city_name'].astype(str).str.strip().apply(
-            lambda x: re.sub(r'\s*\(.*\)\s*$', '', x).strip()
+        cities1_df['city_name'] = map_distinct_values(
+            cities1_df['raw_city_name'], lambda raw: raw.astype(str).str.strip().apply(strip_trailing_parenthetical)
         )
         cities1_df['full_city_name_ref'] = cities1_df['raw_city_name'] # Keep original for reference if needed
 
@@ -149,7 +376,7 @@ class AirlineDataNormalizer:
         # However, original script assumed df['city2'] was name for citymarketid_2.
         # If df['city2'] is a state, then citymarketid_2's name is ambiguous.
         # For now, let's take df['city2'] as 'raw_city_name_2' and try to parse city/state from it.
-        cities2_df = self.df[['citymarketid_2', 'city2']].copy()
+        cities2_df = source[['citymarketid_2', 'city2']].copy()
         cities2_df.rename(columns={
             'citymarketid_2': 'city_market_id',
             'city2': 'raw_city_name_2' # Original city2 column content
@@ -161,26 +388,13 @@ class AirlineDataNormalizer:
 
         # Try to parse city and state from raw_city_name_2 (original city2 col)
         # If raw_city_name_2 is just "ST", then city part will be empty.
-        def parse_city_state_from_city2_col(name_raw):
-            name = str(name_raw).strip()
-            # Pattern 1: "City Name, ST" or "City Name, ST (extra)"
-            match1 = re.match(r'^(.*?),\s*([A-Z]{2})(?:\s*\(.*\))?$', name)
-            if match1:
-                return match1.group(1).strip(), match1.group(2).strip()
-            # Pattern 2: Just "ST" (like ' PA')
-            if len(name) == 2 and name.isupper():
-                return pd.NA, name # No city name, just state
-            # Pattern 3: Just city name, no state "City Name (extra)" or "City Name"
-            match3 = re.match(r'^(.*?)(?:\s*\(.*\))?$', name)
-            if match3:
-                 return match3.group(1).strip(), pd.NA
-            return name, pd.NA # Fallback
-
-        parsed_city2 = cities2_df['raw_city_name_2'].apply(parse_city_state_from_city2_col).apply(pd.Series)
+        parsed_city2 = map_distinct_values(
+            cities2_df['raw_city_name_2'], lambda raw: raw.apply(parse_city_state, missing=pd.NA).apply(pd.Series)
+        )
         parsed_city2.columns = ['city_name', 'state']
         
         cities2_df = pd.concat([cities2_df.drop(columns=['raw_city_name_2']), parsed_city2], axis=1)
-        cities2_df['full_city_name_ref'] = self.df.loc[cities2_df.index, 'city2'] # original city2 col for reference
+        cities2_df['full_city_name_ref'] = source.loc[cities2_df.index, 'city2'] # original city2 col for reference
 
         # Combine cities1_df and cities2_df
         all_cities = pd.concat([
@@ -199,19 +413,20 @@ class AirlineDataNormalizer:
             print(self.tables['cities'].head())
 
 
-    def create_airports_table(self):
+    def create_airports_table(self, source: Optional[pd.DataFrame] = None):
         print("Creating Airports table DataFrame...")
-        airports_1 = self.df[['airportid_1', 'airport_1', 'citymarketid_1']].rename(
+        source = self.df if source is None else source
+        airports_1 = source[['airportid_1', 'airport_1', 'citymarketid_1']].rename(
             columns={'airportid_1': 'airport_id', 'airport_1': 'airport_code', 'citymarketid_1': 'city_market_id'}
         )
-        airports_2 = self.df[['airportid_2', 'airport_2', 'citymarketid_2']].rename(
+        airports_2 = source[['airportid_2', 'airport_2', 'citymarketid_2']].rename(
             columns={'airportid_2': 'airport_id', 'airport_2': 'airport_code', 'citymarketid_2': 'city_market_id'}
         )
         all_airports = pd.concat([airports_1, airports_2])
         all_airports['city_market_id'] = pd.to_numeric(all_airports['city_market_id'], errors='coerce')
         all_airports = all_airports.dropna(subset=['airport_id', 'airport_code', 'city_market_id'])
         all_airports['city_market_id'] = all_airports['city_market_id'].astype(int)
-        all_airports['airport_id'] = all_airports['airport_id'].astype(str) 
+        all_airports['airport_id'] = all_airports['airport_id'].astype('int64')
         all_airports = all_airports.drop_duplicates(subset=['airport_id']).reset_index(drop=True)
 
         if 'cities' in self.tables and not self.tables['cities'].empty:
@@ -224,11 +439,12 @@ class AirlineDataNormalizer:
         self.tables['airports'] = all_airports[['airport_id', 'airport_code', 'city_market_id']]
         print(f"Created Airports DataFrame with {len(self.tables['airports'])} unique airports")
 
-    def create_carriers_table(self):
+    def create_carriers_table(self, source: Optional[pd.DataFrame] = None):
         print("Creating Carriers table DataFrame...")
-        large_carriers = self.df[['carrier_lg']].rename(columns={'carrier_lg': 'carrier_code'})
+        source = self.df if source is None else source
+        large_carriers = source[['carrier_lg']].rename(columns={'carrier_lg': 'carrier_code'})
         large_carriers['carrier_type'] = 'Legacy'
-        low_carriers = self.df[['carrier_low']].rename(columns={'carrier_low': 'carrier_code'})
+        low_carriers = source[['carrier_low']].rename(columns={'carrier_low': 'carrier_code'})
         low_carriers['carrier_type'] = 'Low-Cost'
         
         all_carriers = pd.concat([large_carriers, low_carriers])
@@ -255,10 +471,17 @@ class AirlineDataNormalizer:
             print(self.tables['carriers'].head())
 
 
-    def create_routes_table(self):
+    def create_routes_table(self, source: Optional[pd.DataFrame] = None,
+                            distance_lookup: Optional[pd.Series] = None):
+        """
+        Build the routes table. distance_lookup maps (origin_airport_id, destination_airport_id)
+        to distance_miles (a MultiIndexed Series or a dict keyed by pair); pairs found there skip
+        the geocoded derivation. Defaults to the distances from the previous run on this instance.
+        """
         print("Creating Routes table DataFrame...")
+        source = self.df if source is None else source
         # Use Geocoded_City1 and Geocoded_City2 to calculate distance_miles
-        routes_df = self.df[['airportid_1', 'airportid_2', 'Geocoded_City1', 'Geocoded_City2']].rename(
+        routes_df = source[['airportid_1', 'airportid_2', 'Geocoded_City1', 'Geocoded_City2']].rename(
             columns={
                 'airportid_1': 'origin_airport_id', 
                 'airportid_2': 'destination_airport_id',
@@ -266,9 +489,8 @@ class AirlineDataNormalizer:
                 'Geocoded_City2': 'geo_coord_2'
             }
         ).copy()
-        routes_df['origin_airport_id'] = routes_df['origin_airport_id'].astype(str)
-        routes_df['destination_airport_id'] = routes_df['destination_airport_id'].astype(str)
         routes_df = routes_df.dropna(subset=['origin_airport_id', 'destination_airport_id'])
+        routes_df = routes_df.astype({'origin_airport_id': 'int64', 'destination_airport_id': 'int64'})
         
         # Convert geocoded columns to numeric
         routes_df['geo_coord_1'] = pd.to_numeric(routes_df['geo_coord_1'], errors='coerce')
@@ -283,63 +505,14 @@ class AirlineDataNormalizer:
         else:
             print("Warning: Airports table is empty or not found, cannot filter routes by airport_id.")
 
-        # Get unique routes and calculate distance using geocoded data
-        def calculate_distance_from_geocoded(geo1, geo2):
-            """
-            Attempt to calculate distance from geocoded values.
-            This is experimental - the exact meaning of these geocoded values isn't clear.
-            """
-            if pd.isna(geo1) or pd.isna(geo2):
-                return np.nan
-            
-            # Option 1: Simple difference (if these are distance-related values)
-            distance_diff = abs(geo2 - geo1)
-            
-            # Option 2: Average (if they represent different aspects of the same route)
-            distance_avg = (geo1 + geo2) / 2
-            
-            # Option 3: Check if one of them directly represents distance
-            # Since typical US flight distances range from ~200 to ~3000 miles
-            if 200 <= geo1 <= 3000:
-                return geo1
-            elif 200 <= geo2 <= 3000:
-                return geo2
-            elif 200 <= distance_diff <= 3000:
-                return distance_diff
-            elif 200 <= distance_avg <= 3000:
-                return distance_avg
-            else:
-                # If none seem like reasonable distances, try scaling
-                # Maybe the values are in tens of miles, hundreds, etc.
-                for scale in [0.1, 0.01, 10, 100]:
-                    scaled_geo1 = geo1 * scale
-                    scaled_geo2 = geo2 * scale
-                    scaled_diff = distance_diff * scale
-                    scaled_avg = distance_avg * scale
-                    
-                    if 200 <= scaled_geo1 <= 3000:
-                        return scaled_geo1
-                    elif 200 <= scaled_geo2 <= 3000:
-                        return scaled_geo2
-                    elif 200 <= scaled_diff <= 3000:
-                        return scaled_diff
-                    elif 200 <= scaled_avg <= 3000:
-                        return scaled_avg
-                
-                # If nothing works, return NaN
-                return np.nan
-
         # Group by route to get unique combinations
         routes_grouped = routes_df.groupby(['origin_airport_id', 'destination_airport_id']).agg({
             'geo_coord_1': 'first',  # Take first occurrence
             'geo_coord_2': 'first'   # Take first occurrence
         }).reset_index()
         
-        # Calculate distance_miles using the geocoded data
-        routes_grouped['distance_miles'] = routes_grouped.apply(
-            lambda row: calculate_distance_from_geocoded(row['geo_coord_1'], row['geo_coord_2']), 
-            axis=1
-        )
+        # Calculate distance_miles using the geocoded data, reusing known distances by airport pair
+        routes_grouped['distance_miles'] = self._resolve_route_distances(routes_grouped, distance_lookup)
         
         routes_grouped['route_id'] = routes_grouped.index + 1
         self.tables['routes'] = routes_grouped[['route_id', 'origin_airport_id', 'destination_airport_id', 'distance_miles']]
@@ -355,92 +528,126 @@ class AirlineDataNormalizer:
             print(f"Created Routes DataFrame with {len(self.tables['routes'])} unique routes")
             print("Warning: Could not calculate distances from geocoded data - all distances remain NULL")
 
+    def _resolve_route_distances(self, routes_grouped: pd.DataFrame,
+                                 distance_lookup: Optional[pd.Series] = None) -> np.ndarray:
+        """Distances per route: looked up by airport pair when known, derived from the geocoded values otherwise."""
+        lookup = self.route_distances if distance_lookup is None else distance_lookup
+        if lookup is not None and not isinstance(lookup, pd.Series):
+            lookup = pd.Series(lookup, dtype=float)
+
+        pairs = pd.MultiIndex.from_arrays([routes_grouped['origin_airport_id'], routes_grouped['destination_airport_id']])
+        distances = np.full(len(routes_grouped), np.nan)
+        known = np.zeros(len(routes_grouped), dtype=bool)
+        if lookup is not None and len(lookup) > 0:
+            positions = lookup.index.get_indexer(pairs)
+            known = positions >= 0
+            distances[known] = lookup.to_numpy(dtype=float)[positions[known]]
+
+        missing = ~known
+        distances[missing] = calculate_distances_from_geocoded(
+            routes_grouped['geo_coord_1'].to_numpy()[missing], routes_grouped['geo_coord_2'].to_numpy()[missing]
+        )
+        # Kept for the next run of the stage on this instance
+        self.route_distances = pd.Series(distances, index=pairs, name='distance_miles')
+        return distances
+
     def create_flights_table(self):
         print("Creating Flights table DataFrame...")
-        flights_df = self.df.copy()
-        flights_df['airportid_1'] = flights_df['airportid_1'].astype(str)
-        flights_df['airportid_2'] = flights_df['airportid_2'].astype(str)
+        if 'routes' not in self.tables or self.tables['routes'].empty:
+            print("Warning: Routes table is empty, flight 'route_id' will be NaN and rows likely dropped.")
+        self.tables['flights'] = self._build_flights_frame(self.df)
+        print(f"Created Flights DataFrame with {len(self.tables['flights'])} flight records")
+
+    def _build_flights_frame(self, source: pd.DataFrame, first_flight_id: int = 1) -> pd.DataFrame:
+        """Resolve route_id for each source row and number the resulting flights from first_flight_id."""
+        # Only the columns that end up in the flights table are projected; the source frame is not copied.
+        flights_df = source[['Year', 'quarter', 'passengers', 'fare', 'tbl1apk']]
         
         if 'routes' in self.tables and not self.tables['routes'].empty:
-            route_mapping = self.tables['routes'].set_index(['origin_airport_id', 'destination_airport_id'])['route_id']
-            flights_df['route_id'] = flights_df.apply(
-                lambda row: route_mapping.get((row['airportid_1'], row['airportid_2'])), axis=1
-            )
-            flights_df = flights_df.dropna(subset=['route_id'])
-            flights_df['route_id'] = flights_df['route_id'].astype(int)
+            routes = self.tables['routes']
+            # Hash join on the airport pair: build the lookup index once over the routes table and probe it
+            # with every source pair in a single vectorized pass. -1 marks pairs without a route.
+            route_index = pd.MultiIndex.from_arrays([routes['origin_airport_id'], routes['destination_airport_id']])
+            source_pairs = pd.MultiIndex.from_arrays([source['airportid_1'], source['airportid_2']])
+            positions = route_index.get_indexer(source_pairs)
+            matched = positions >= 0
+            if len(source) and not matched.any():
+                # Routes are built from this same source, so every pair should match; none matching means
+                # the source and routes keys disagree (e.g. a stale snapshot with text airport IDs)
+                raise ValueError(
+                    f"No source airport pair matched a route (source airport IDs are "
+                    f"{source['airportid_1'].dtype}, route airport IDs are {routes['origin_airport_id'].dtype}); "
+                    f"rerun with --no-cache if the cleaned-data snapshot predates the current code"
+                )
+            flights_df = flights_df[matched].assign(route_id=routes['route_id'].to_numpy()[positions[matched]])
         else:
-            print("Warning: Routes table is empty, flight 'route_id' will be NaN and rows likely dropped.")
-            flights_df['route_id'] = np.nan
-            flights_df = flights_df.dropna(subset=['route_id']) # This will empty the df
+            flights_df = flights_df.iloc[0:0].assign(route_id=pd.Series(dtype='int64')) # No routes, no flights
 
-        
         flights_df = flights_df.reset_index(drop=True)
-        flights_df['flight_id'] = flights_df.index + 1
-        
-        # 'passengers' column from df is object/string (airport codes), DB expects INTEGER. Will be NULL.
-        # 'fare' is numeric.
-        self.tables['flights'] = flights_df[[
-            'flight_id', 'route_id', 'Year', 'quarter', 
-            'passengers', # This is the original 'passengers' column (string codes)
-            'fare', 'tbl1apk'
+        flights_df['flight_id'] = flights_df.index + first_flight_id
+        # Passenger counts are stored as INTEGER; a missing count stays NULL
+        flights_df['passengers'] = flights_df['passengers'].astype('Int64')
+
+        return flights_df[[
+            'flight_id', 'route_id', 'Year', 'quarter', 'passengers', 'fare', 'tbl1apk'
         ]].rename(columns={'Year': 'year', 'tbl1apk': 'source_record_id'})
-        print(f"Created Flights DataFrame with {len(self.tables['flights'])} flight records")
 
     def create_market_share_table(self):
         print("Creating Market Share table DataFrame...")
-        market_shares_list = []
         
         if 'carriers' not in self.tables or self.tables['carriers'].empty:
             print("Warning: Carriers table is empty. Market Share table will also be empty.")
-            self.tables['market_share'] = pd.DataFrame(market_shares_list) # Empty DF
+            self.tables['market_share'] = pd.DataFrame() # Empty DF
             print(f"Created Market Share DataFrame with {len(self.tables['market_share'])} records")
             return
 
         if 'flights' not in self.tables or self.tables['flights'].empty:
             print("Warning: Flights table is empty. Market Share table will also be empty.")
-            self.tables['market_share'] = pd.DataFrame(market_shares_list) # Empty DF
+            self.tables['market_share'] = pd.DataFrame() # Empty DF
             print(f"Created Market Share DataFrame with {len(self.tables['market_share'])} records")
             return
             
-        carrier_mapping = self.tables['carriers'].set_index('carrier_code')['carrier_id']
-        flights_with_source_id = self.tables['flights'][['flight_id', 'source_record_id']].copy()
-        
         # Merge df (original cleaned data) with the newly created flight_ids
         # Ensure 'tbl1apk' in self.df is of the same type as 'source_record_id' if issues arise
         if 'tbl1apk' not in self.df.columns:
             print("Error: 'tbl1apk' column missing from main DataFrame. Cannot create market_share.")
-            self.tables['market_share'] = pd.DataFrame(market_shares_list)
+            self.tables['market_share'] = pd.DataFrame()
             print(f"Created Market Share DataFrame with {len(self.tables['market_share'])} records")
             return
 
-        temp_df = self.df.merge(flights_with_source_id, left_on='tbl1apk', right_on='source_record_id', how='inner')
-
-        for _, row in temp_df.iterrows():
-            flight_id = row['flight_id']
-            
-            # carrier_lg/low are already cleaned by validate_and_clean_carrier_code
-            # They will be NaN if invalid, or the code string if valid.
-            if pd.notna(row['carrier_lg']) and row['carrier_lg'] in carrier_mapping:
-                market_shares_list.append({
-                    'flight_id': flight_id,
-                    'carrier_id': carrier_mapping[row['carrier_lg']],
-                    'market_share_type': 'Legacy',
-                    'market_share_percentage': row['large_ms'], # numeric
-                    'fare_avg': row['fare'] # Changed from row['fare_lg'] to use main flight fare
-                })
-            if pd.notna(row['carrier_low']) and row['carrier_low'] in carrier_mapping:
-                 market_shares_list.append({
-                    'flight_id': flight_id,
-                    'carrier_id': carrier_mapping[row['carrier_low']],
-                    'market_share_type': 'Low-Cost',
-                    'market_share_percentage': row['lf_ms'], # numeric
-                    'fare_avg': row['fare'] # Changed from row['fare_low'] to use main flight fare
-                })
-        self.tables['market_share'] = pd.DataFrame(market_shares_list)
-        if not self.tables['market_share'].empty:
-            self.tables['market_share'] = self.tables['market_share'].drop_duplicates(subset=['flight_id', 'carrier_id', 'market_share_type'])
+        self.tables['market_share'] = self._build_market_share_frame(self.df, self.tables['flights'])
         print(f"Created Market Share DataFrame with {len(self.tables['market_share'])} records")
 
+    def _build_market_share_frame(self, source: pd.DataFrame, flights: pd.DataFrame) -> pd.DataFrame:
+        """Build the Legacy and Low-Cost market share rows for the given source rows and their flights."""
+        carrier_mapping = self.tables['carriers'].set_index('carrier_code')['carrier_id']
+        # Partitioned market_share rows carry their flight's partition key
+        flights_with_source_id = flights[['flight_id', 'source_record_id'] + self.partition_columns]
+        temp_df = source[['tbl1apk', 'carrier_lg', 'carrier_low', 'large_ms', 'lf_ms', 'fare']].merge(
+            flights_with_source_id, left_on='tbl1apk', right_on='source_record_id', how='inner'
+        )
+
+        # Stack the Legacy and Low-Cost columns side by side and flatten them row-major,
+        # so every source row contributes its Legacy row followed by its Low-Cost row.
+        # carrier_lg/low are already cleaned by validate_and_clean_carrier_code: NaN if
+        # invalid, the code string otherwise; codes missing from carriers map to NaN too.
+        carrier_ids = np.column_stack([
+            temp_df['carrier_lg'].map(carrier_mapping).to_numpy(dtype=float),
+            temp_df['carrier_low'].map(carrier_mapping).to_numpy(dtype=float),
+        ]).ravel()
+        shares = np.column_stack([temp_df['large_ms'].to_numpy(), temp_df['lf_ms'].to_numpy()]).ravel()
+        keep = ~np.isnan(carrier_ids)
+
+        market_share_df = pd.DataFrame({
+            'flight_id': np.repeat(temp_df['flight_id'].to_numpy(), 2)[keep],
+            'carrier_id': carrier_ids[keep].astype(np.int64),
+            'market_share_type': np.tile(np.array(['Legacy', 'Low-Cost'], dtype=object), len(temp_df))[keep],
+            'market_share_percentage': shares[keep],
+            'fare_avg': np.repeat(temp_df['fare'].to_numpy(), 2)[keep], # main flight fare, not fare_lg/fare_low
+            **{col: np.repeat(temp_df[col].to_numpy(), 2)[keep] for col in self.partition_columns},
+        })
+        return market_share_df.drop_duplicates(subset=['flight_id', 'carrier_id', 'market_share_type'])
+
     def normalize_data(self):
         if not self.load_data(): return False
         if self.df.empty: return False 
@@ -452,10 +659,99 @@ class AirlineDataNormalizer:
         self.create_market_share_table() # Depends on carriers and flights
         return True
 
-    def generate_postgres_ddl(self):
+    # --- Streaming mode ---
+    # The source is read twice in bounded-size chunks. The first pass keeps only the
+    # distinct column combinations each dimension table needs, the second pass emits
+    # flights and market_share rows chunk by chunk, so memory is capped by the chunk
+    # size plus the (small) dimension tables instead of by the input size.
+
+    def resolve_chunk_size(self) -> int:
+        """Number of source rows per chunk, derived from the memory budget unless set explicitly."""
+        if self.chunk_size:
+            return self.chunk_size
+        sample = read_source_csv(self.csv_file_path, NORMALIZER_COLUMNS, nrows=CHUNK_SIZE_SAMPLE_ROWS,
+                                 dtype_overrides={col: str for col in STREAMING_TEXT_COLUMNS})
+        if sample.empty:
+            return MIN_CHUNK_ROWS
+        bytes_per_row = sample.memory_usage(deep=True).sum() / len(sample)
+        budget_bytes = self.memory_budget_mb * 1024 * 1024
+        self.chunk_size = max(MIN_CHUNK_ROWS, int(budget_bytes / (bytes_per_row * CHUNK_WORKING_SET_FACTOR)))
+        return self.chunk_size
+
+    def _iter_clean_chunks(self) -> Iterator[pd.DataFrame]:
+        """Yield cleaned source chunks of at most resolve_chunk_size() rows."""
+        chunks = iter_source_csv(self.csv_file_path, self.resolve_chunk_size(), NORMALIZER_COLUMNS,
+                                 dtype_overrides={col: str for col in STREAMING_TEXT_COLUMNS})
+        for chunk in chunks:
+            chunk = self._clean_frame(chunk)
+            if not chunk.empty:
+                yield chunk
+
+    def normalize_dimensions_streaming(self) -> bool:
+        """First streaming pass: build the dimension tables from distinct source combinations."""
+        print(f"Streaming CSV data in chunks of {self.resolve_chunk_size():,} rows "
+              f"(memory budget {self.memory_budget_mb} MB)...")
+        dimension_sources = {}
+        total_rows = 0
+        try:
+            for chunk in self._iter_clean_chunks():
+                total_rows += len(chunk)
+                for table_name, columns in DIMENSION_SOURCE_COLUMNS.items():
+                    distinct = chunk[columns].drop_duplicates()
+                    if table_name in dimension_sources:
+                        distinct = pd.concat([dimension_sources[table_name], distinct], ignore_index=True).drop_duplicates()
+                    dimension_sources[table_name] = distinct.reset_index(drop=True)
+        except Exception as e:
+            print(f"Error streaming data: {e}")
+            import traceback
+            traceback.print_exc()
+            return False
+
+        print(f"Scanned {total_rows:,} cleaned records")
+        if total_rows == 0:
+            print("No data left after cleaning. Halting.")
+            return False
+
+        self.create_cities_table(dimension_sources['cities'])
+        self.create_airports_table(dimension_sources['airports']) # Depends on cities
+        self.create_carriers_table(dimension_sources['carriers'])
+        self.create_routes_table(dimension_sources['routes'])     # Depends on airports
+        return True
+
+    def iter_fact_chunks(self) -> Iterator[Dict[str, pd.DataFrame]]:
+        """
+        Second streaming pass: yield {'flights': ..., 'market_share': ...} for each source chunk.
+        The row hashes of every (Year, quarter) slice are collected along the way, for the
+        watermarks of the streamed load.
+        """
+        self.fact_row_counts = {'flights': 0, 'market_share': 0}
+        self.streamed_slice_hashes = {}
+        next_flight_id = 1
+        for chunk in self._iter_clean_chunks():
+            self._add_slice_row_hashes(self.streamed_slice_hashes, chunk)
+            flights = self._build_flights_frame(chunk, first_flight_id=next_flight_id)
+            next_flight_id += len(flights)
+            if flights.empty or self.tables['carriers'].empty:
+                market_share = pd.DataFrame()
+            else:
+                market_share = self._build_market_share_frame(chunk, flights)
+            self.fact_row_counts['flights'] += len(flights)
+            self.fact_row_counts['market_share'] += len(market_share)
+            yield {'flights': flights, 'market_share': market_share}
+
+    def generate_postgres_ddl(self, if_not_exists: bool = False):
         # DDL statements: Drop tables if they exist, then create them.
         # CASCADE will drop dependent objects like views or foreign key constraints.
+        # With if_not_exists the DROPs are left out and existing tables are kept (incremental mode).
+        # Partitioned fact tables need the partition key in every unique constraint, so market_share
+        # then carries its flight's key columns and references flights through them.
+        key_columns = ''.join(f", {col}" for col in self.partition_columns)
+        key_column_definitions = ''.join(f"\n                {col} INTEGER NOT NULL," for col in self.partition_columns)
+        partition_clause = f" PARTITION BY RANGE ({', '.join(self.partition_columns)})" if self.partition_by else ""
         ddl = [
+            "DROP TABLE IF EXISTS etl_watermarks CASCADE;",
+            "DROP TABLE IF EXISTS route_quarter_carrier_stats CASCADE;",
+            "DROP TABLE IF EXISTS route_quarter_stats CASCADE;",
             "DROP TABLE IF EXISTS market_share CASCADE;",
             "DROP TABLE IF EXISTS flights CASCADE;",
             "DROP TABLE IF EXISTS routes CASCADE;",
@@ -471,7 +767,7 @@ class AirlineDataNormalizer:
             );""",
             """
             CREATE TABLE airports (
-                airport_id VARCHAR(255) PRIMARY KEY, 
+                airport_id INTEGER PRIMARY KEY, -- BTS airport ID
                 airport_code VARCHAR(10) NOT NULL,    
                 city_market_id INTEGER,
                 FOREIGN KEY (city_market_id) REFERENCES cities(city_market_id) ON DELETE SET NULL
@@ -485,97 +781,350 @@ class AirlineDataNormalizer:
             """
             CREATE TABLE routes (
                 route_id INTEGER PRIMARY KEY,
-                origin_airport_id VARCHAR(255) NOT NULL, 
-                destination_airport_id VARCHAR(255) NOT NULL, 
+                origin_airport_id INTEGER NOT NULL, 
+                destination_airport_id INTEGER NOT NULL, 
                 distance_miles DECIMAL(10,2), -- Will be NULL due to source data
                 FOREIGN KEY (origin_airport_id) REFERENCES airports(airport_id) ON DELETE CASCADE,
                 FOREIGN KEY (destination_airport_id) REFERENCES airports(airport_id) ON DELETE CASCADE,
                 UNIQUE(origin_airport_id, destination_airport_id)
             );""",
+            # One row per (airport, route) the route touches. Each UNION ALL branch probes its own
+            # index, where an OR over both endpoint columns cannot. A route whose endpoints are the
+            # same airport is listed once; the filter sits outside the branches because a branch
+            # with its own WHERE is not flattened and loses the index probe.
             """
+            CREATE OR REPLACE VIEW route_endpoints AS
+                SELECT airport_id, route_id, endpoint
+                FROM (
+                    SELECT origin_airport_id AS airport_id, route_id, 'ORIGIN' AS endpoint,
+                           destination_airport_id AS other_airport_id
+                    FROM routes
+                    UNION ALL
+                    SELECT destination_airport_id, route_id, 'DESTINATION', origin_airport_id
+                    FROM routes
+                ) e
+                WHERE NOT (endpoint = 'DESTINATION' AND other_airport_id = airport_id);""",
+            f"""
             CREATE TABLE flights (
-                flight_id INTEGER PRIMARY KEY,
+                flight_id INTEGER NOT NULL,
                 route_id INTEGER NOT NULL,
                 year INTEGER NOT NULL,
                 quarter INTEGER NOT NULL CHECK (quarter BETWEEN 1 AND 4),
-                passengers VARCHAR(255), -- Changed from INTEGER to VARCHAR to hold raw codes
+                passengers INTEGER,
                 fare DECIMAL(10,2),
                 source_record_id VARCHAR(100), 
+                PRIMARY KEY (flight_id{key_columns}),
                 FOREIGN KEY (route_id) REFERENCES routes(route_id) ON DELETE CASCADE
-            );""",
-            """
+            ){partition_clause};""",
+            f"""
             CREATE TABLE market_share (
-                market_share_id SERIAL PRIMARY KEY, 
-                flight_id INTEGER NOT NULL,
+                market_share_id SERIAL, 
+                flight_id INTEGER NOT NULL,{key_column_definitions}
                 carrier_id INTEGER NOT NULL,
                 market_share_type VARCHAR(10) NOT NULL, 
                 market_share_percentage DECIMAL(10,2),
                 fare_avg DECIMAL(10,2),
-                FOREIGN KEY (flight_id) REFERENCES flights(flight_id) ON DELETE CASCADE,
+                PRIMARY KEY (market_share_id{key_columns}),
+                FOREIGN KEY (flight_id{key_columns}) REFERENCES flights(flight_id{key_columns}) ON DELETE CASCADE,
                 FOREIGN KEY (carrier_id) REFERENCES carriers(carrier_id) ON DELETE CASCADE,
-                UNIQUE (flight_id, carrier_id, market_share_type) 
+                UNIQUE (flight_id, carrier_id, market_share_type{key_columns}) 
+            ){partition_clause};""",
+            """
+            CREATE TABLE route_quarter_stats (
+                route_id INTEGER NOT NULL,
+                year INTEGER NOT NULL,
+                quarter INTEGER NOT NULL,
+                market_share_rows INTEGER NOT NULL,
+                flight_count INTEGER NOT NULL, -- flights with a known fare
+                fare_count INTEGER NOT NULL, -- fare measures cover the market share rows with a known fare
+                fare_sum NUMERIC,
+                fare_min DECIMAL(10,2),
+                fare_max DECIMAL(10,2),
+                fare_sumsq NUMERIC,
+                PRIMARY KEY (route_id, year, quarter),
+                FOREIGN KEY (route_id) REFERENCES routes(route_id) ON DELETE CASCADE
+            );""",
+            """
+            CREATE TABLE route_quarter_carrier_stats (
+                route_id INTEGER NOT NULL,
+                year INTEGER NOT NULL,
+                quarter INTEGER NOT NULL,
+                carrier_id INTEGER NOT NULL,
+                -- All measures cover the carrier's market share rows with a known fare
+                flight_count INTEGER NOT NULL,
+                type_flight_count INTEGER NOT NULL, -- each flight counted on one carrier per carrier_type, so it sums per type
+                fare_count INTEGER NOT NULL,
+                fare_sum NUMERIC,
+                fare_min DECIMAL(10,2),
+                fare_max DECIMAL(10,2),
+                fare_sumsq NUMERIC,
+                share_count INTEGER NOT NULL,
+                share_sum NUMERIC,
+                share_min DECIMAL(10,2),
+                share_max DECIMAL(10,2),
+                share_sumsq NUMERIC,
+                share_fare_sum NUMERIC, -- fare sum and flights of the rows with a known share
+                share_flight_count INTEGER NOT NULL,
+                PRIMARY KEY (route_id, year, quarter, carrier_id),
+                FOREIGN KEY (route_id) REFERENCES routes(route_id) ON DELETE CASCADE,
+                FOREIGN KEY (carrier_id) REFERENCES carriers(carrier_id) ON DELETE CASCADE
+            );""",
+            """
+            CREATE TABLE etl_watermarks (
+                year INTEGER NOT NULL,
+                quarter INTEGER NOT NULL,
+                row_count INTEGER NOT NULL,
+                content_hash CHAR(64) NOT NULL, -- SHA-256 of the slice's source rows
+                loaded_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (year, quarter)
             );"""
         ]
+        if if_not_exists:
+            ddl = [stmt.replace("CREATE TABLE ", "CREATE TABLE IF NOT EXISTS ")
+                   for stmt in ddl if not stmt.startswith("DROP ")]
         return ddl
 
+    def generate_partition_ddl(self, keys: List[Tuple[int, ...]]) -> List[str]:
+        """
+        CREATE TABLE ... PARTITION OF statements for both fact tables, one pair per partition key.
+        A table left with the same name (e.g. a partition detached in place) makes them fail rather
+        than receive the rows.
+        """
+        return [
+            f"CREATE TABLE {self._partition_name(table_name, key)} PARTITION OF {table_name} "
+            f"FOR VALUES {self._partition_bounds(key)};"
+            for key in keys for table_name in PARTITIONED_TABLES
+        ]
+
+    @staticmethod
+    def _partition_name(table_name: str, key: Tuple[int, ...]) -> str:
+        # flights_y2021 when partitioned by year, flights_y2021q3 when partitioned by quarter
+        return f"{table_name}_y{int(key[0])}" + (f"q{int(key[1])}" if len(key) > 1 else "")
+
+    @staticmethod
+    def _partition_bounds(key: Tuple[int, ...]) -> str:
+        lower = [int(value) for value in key]
+        upper = lower[:-1] + [lower[-1] + 1]
+        return f"FROM ({', '.join(map(str, lower))}) TO ({', '.join(map(str, upper))})"
+
+    def _partition_condition(self, key: Tuple[int, ...]) -> str:
+        return ' AND '.join(f"{col} = {int(value)}" for col, value in zip(self.partition_columns, key))
+
+    def _partition_keys(self, df: pd.DataFrame) -> List[Tuple[int, ...]]:
+        """Distinct partition keys of a frame holding the partition columns."""
+        return sorted(set(df[self.partition_columns].astype(int).itertuples(index=False, name=None)))
+
+    def _split_by_partition(self, df: pd.DataFrame) -> Dict[Tuple[int, ...], pd.DataFrame]:
+        if df.empty:
+            return {}
+        return {tuple(int(value) for value in key): part
+                for key, part in df.groupby(self.partition_columns, sort=True)}
+
+    def generate_index_ddl(self, concurrently: bool = True, partitioned_tables: Optional[Tuple[str, ...]] = None):
+        """
+        CREATE INDEX statements for SECONDARY_INDEXES; existing indexes are kept. PostgreSQL cannot
+        build an index on a partitioned table concurrently, so those get a plain CREATE INDEX, which
+        also builds the matching index on every partition.
+        """
+        if partitioned_tables is None:
+            partitioned_tables = PARTITIONED_TABLES if self.partition_by else ()
+        return [
+            f"CREATE INDEX {'CONCURRENTLY ' if concurrently and table not in partitioned_tables else ''}"
+            f"IF NOT EXISTS {name} ON {table} ({', '.join(columns)});"
+            for name, table, columns in SECONDARY_INDEXES
+        ]
+
     def create_db_schema_and_insert_data(self):
         print(f"Connecting to PostgreSQL: dbname='{self.db_params['dbname']}' host='{self.db_params['host']}'")
-        ddl_statements = self.generate_postgres_ddl()
         try:
-            with psycopg2.connect(**self.db_params) as conn:
-                with conn.cursor() as cur:
-                    print("Dropping and Creating tables...")
-                    for statement in ddl_statements:
-                        cur.execute(statement)
-                    conn.commit()
-                    print("Tables created successfully.")
+            with self._connection() as conn, self._worker_pool() as pool:
+                self._create_schema(conn)
+                self._create_partitions(conn, self.tables.get('flights', pd.DataFrame()))
 
-                print("Inserting data into tables using SQLAlchemy engine...")
+                if self.loader == 'copy':
+                    print("Inserting data into tables using COPY FROM STDIN...")
+                else:
+                    print("Inserting data into tables using multi-row INSERTs...")
+                if self.workers > 1:
+                    print(f"Loading over {self.workers} parallel connections...")
+                    loaded = self._parallel_load(pool, self._build_load_stages(self.tables, LOAD_STAGES))
+                    if loaded:
+                        self._sync_market_share_sequence(conn)
+                        self._refresh_rollups(conn)
+                        self._record_watermarks(conn, self.compute_slice_watermarks())
+                        print("All data insertion processes attempted.")
+                    return loaded
                 table_order = ['cities', 'airports', 'carriers', 'routes', 'flights', 'market_share']
                 for table_name in table_order:
                     if table_name in self.tables and not self.tables[table_name].empty:
-                        df_to_insert = self.tables[table_name].copy()
-                        
-                        # Handle types before insertion
-                        if table_name == 'flights' and 'passengers' in df_to_insert.columns:
-                            # Ensure passengers is string for VARCHAR DB column
-                            df_to_insert['passengers'] = df_to_insert['passengers'].astype(str).replace('nan', None)
-
-
-                        # Replace Pandas NaT/NaN with None for SQL compatibility
-                        # For object columns that might contain pd.NA, also replace with None
-                        for col in df_to_insert.columns:
-                            if df_to_insert[col].dtype == 'object' or pd.api.types.is_string_dtype(df_to_insert[col].dtype):
-                                df_to_insert[col] = df_to_insert[col].replace({pd.NA: None, np.nan: None})
-                            elif pd.api.types.is_datetime64_any_dtype(df_to_insert[col].dtype):
-                                 df_to_insert[col] = df_to_insert[col].replace({pd.NaT: None})
-                            else: # Numeric types
-                                df_to_insert[col] = df_to_insert[col].replace({np.nan: None})
-                        
-                        print(f"Inserting data into {table_name} ({len(df_to_insert)} records)...")
-                        try:
-                            df_to_insert.to_sql(table_name, self.engine, if_exists='append', index=False, method='multi', chunksize=1000)
-                            print(f"Successfully inserted data into {table_name}.")
-                        except Exception as e_insert:
-                            print(f"SQLAlchemy to_sql Error for table {table_name}: {e_insert}")
-                            print("Sample of data that might be causing issues (first 5 rows):")
-                            print(df_to_insert.head())
-                            # Attempt to get more detailed error from Psycopg2 if possible
-                            if hasattr(e_insert, 'orig') and e_insert.orig:
-                                print(f"Original Psycopg2 error: {e_insert.orig}")
-                            conn.rollback() 
-                            return False 
+                        if not self._insert_dataframe(conn, table_name, self.tables[table_name]):
+                            return False
                     elif table_name not in self.tables:
                         print(f"Table DataFrame '{table_name}' not found. Skipping.")
                     else: # Table is empty
                         print(f"Table DataFrame '{table_name}' is empty. Skipping insertion.")
-                # conn.commit() # This commit is actually handled by to_sql for each table
+                # Each table is committed by its loader
+                self._refresh_rollups(conn)
+                self._record_watermarks(conn, self.compute_slice_watermarks())
                 print("All data insertion processes attempted.")
                 return True
         except psycopg2.Error as e_conn:
-            print(f"PostgreSQL Connection/Execution Error: {e_conn}")
-            if hasattr(e_conn, 'pgcode'): print(f"PGCODE: {e_conn.pgcode}")
-            if hasattr(e_conn, 'pgerror'): print(f"PGERROR: {e_conn.pgerror}")
+            self._report_db_error(e_conn)
+            return False
+        except Exception as e_generic:
+            print(f"An unexpected error occurred during DB operations: {e_generic}")
+            import traceback
+            traceback.print_exc()
+            return False
+
+    def stream_to_database(self) -> bool:
+        """Create the schema, insert the dimension tables and then insert fact rows chunk by chunk."""
+        print(f"Connecting to PostgreSQL: dbname='{self.db_params['dbname']}' host='{self.db_params['host']}'")
+        try:
+            with self._connection() as conn, self._worker_pool() as pool:
+                self._create_schema(conn)
+
+                print("Inserting dimension tables...")
+                if self.workers > 1:
+                    dimension_stages = [stage for stage in LOAD_STAGES if not set(stage) & set(PARTITIONED_LOAD_TABLES)]
+                    if not self._parallel_load(pool, self._build_load_stages(self.tables, dimension_stages)):
+                        return False
+                else:
+                    for table_name in ['cities', 'airports', 'carriers', 'routes']:
+                        if not self.tables[table_name].empty:
+                            if not self._insert_dataframe(conn, table_name, self.tables[table_name]):
+                                return False
+                        else:
+                            print(f"Table DataFrame '{table_name}' is empty. Skipping insertion.")
+
+                print("Streaming fact tables...")
+                next_market_share_id = 1
+                for chunk_number, fact_tables in enumerate(self.iter_fact_chunks(), 1):
+                    print(f"Chunk {chunk_number}: {len(fact_tables['flights']):,} flights, "
+                          f"{len(fact_tables['market_share']):,} market share rows")
+                    self._create_partitions(conn, fact_tables['flights'])
+                    if self.workers > 1:
+                        fact_stages = [(table_name,) for table_name in PARTITIONED_LOAD_TABLES]
+                        stages = self._build_load_stages(fact_tables, fact_stages, next_market_share_id)
+                        if not self._parallel_load(pool, stages):
+                            return False
+                        next_market_share_id += len(fact_tables['market_share'])
+                        continue
+                    for table_name in ['flights', 'market_share']:
+                        if not fact_tables[table_name].empty:
+                            if not self._insert_dataframe(conn, table_name, fact_tables[table_name]):
+                                return False
+                if self.workers > 1:
+                    self._sync_market_share_sequence(conn)
+                # The schema was recreated, so the watermarks must be recorded for the next --incremental run
+                self._record_watermarks(conn, self._watermarks_from_row_hashes(self.streamed_slice_hashes))
+                self._refresh_rollups(conn)
+                print(f"Inserted {self.fact_row_counts.get('flights', 0):,} flights and "
+                      f"{self.fact_row_counts.get('market_share', 0):,} market share rows.")
+                return True
+        except psycopg2.Error as e_conn:
+            self._report_db_error(e_conn)
+            return False
+        except Exception as e_generic:
+            print(f"An unexpected error occurred during DB operations: {e_generic}")
+            import traceback
+            traceback.print_exc()
+            return False
+
+    def compute_slice_watermarks(self, source: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        Row count and content hash of every (Year, quarter) slice of the cleaned source.
+        Values are hashed in a dtype-independent form (numbers as float64, everything else as
+        text), so a new quarter that changes a column's inferred dtype does not alter the
+        hashes of the slices already loaded.
+        """
+        slice_hashes = {}
+        self._add_slice_row_hashes(slice_hashes, self.df if source is None else source)
+        return self._watermarks_from_row_hashes(slice_hashes)
+
+    @staticmethod
+    def _add_slice_row_hashes(slice_hashes: Dict[Tuple[int, int], List[np.ndarray]], source: pd.DataFrame) -> None:
+        """Append the row hashes of every (Year, quarter) slice of source, in source order, to slice_hashes."""
+        columns = sorted(source.columns)
+        for (year, quarter), positions in sorted(source.groupby(SLICE_COLUMNS).indices.items()):
+            slice_df = source.iloc[positions]
+            canonical = pd.DataFrame({
+                col: slice_df[col].astype('float64') if pd.api.types.is_numeric_dtype(slice_df[col].dtype)
+                else slice_df[col].astype(str)
+                for col in columns
+            })
+            row_hashes = pd.util.hash_pandas_object(canonical, index=False).to_numpy()
+            slice_hashes.setdefault((int(year), int(quarter)), []).append(row_hashes)
+
+    @staticmethod
+    def _watermarks_from_row_hashes(slice_hashes: Dict[Tuple[int, int], List[np.ndarray]]) -> pd.DataFrame:
+        """
+        Watermark rows from the accumulated row hashes. A slice split across streaming chunks
+        hashes to the same value as when the whole source is hashed at once.
+        """
+        watermarks = []
+        for (year, quarter), parts in sorted(slice_hashes.items()):
+            row_hashes = np.concatenate(parts)
+            watermarks.append({
+                'year': year, 'quarter': quarter, 'row_count': len(row_hashes),
+                'content_hash': hashlib.sha256(row_hashes.tobytes()).hexdigest(),
+            })
+        return pd.DataFrame(watermarks, columns=['year', 'quarter', 'row_count', 'content_hash'])
+
+    def load_incremental(self) -> bool:
+        """
+        Load only the (Year, quarter) slices that are new or changed since the last run.
+        Tables are created if missing and never dropped. Dimensions are upserted, carrier and
+        route ids are aligned with the ones already stored, and each changed slice is deleted
+        and reloaded. Everything happens in one transaction, so a failed run leaves the
+        database and etl_watermarks as they were.
+        """
+        print(f"Connecting to PostgreSQL: dbname='{self.db_params['dbname']}' host='{self.db_params['host']}'")
+        watermarks = self.compute_slice_watermarks()
+        try:
+            with self._connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT pg_advisory_xact_lock(%s)", (INCREMENTAL_LOCK_KEY,))
+                    # Check the stored partition scheme before any DDL runs; a missing flights table is
+                    # created below with the requested scheme
+                    cur.execute("SELECT to_regclass('flights') IS NOT NULL, "
+                                "(SELECT partnatts FROM pg_partitioned_table WHERE partrelid = to_regclass('flights'))")
+                    flights_exists, partition_columns = cur.fetchone()
+                    stored_scheme = {1: 'year', 2: 'quarter'}.get(partition_columns)
+                    if flights_exists and stored_scheme != self.partition_by:
+                        print(f"Error: flights is {f'partitioned by {stored_scheme}' if stored_scheme else 'not partitioned'} "
+                              f"in the database; run the incremental load with the matching --partition-by.")
+                        conn.rollback()
+                        return False
+                    for statement in self.generate_postgres_ddl(if_not_exists=True):
+                        cur.execute(statement)
+                    cur.execute("SELECT year, quarter, content_hash FROM etl_watermarks")
+                    loaded_hashes = {(year, quarter): content_hash for year, quarter, content_hash in cur.fetchall()}
+
+                is_changed = [
+                    loaded_hashes.get((row.year, row.quarter)) != row.content_hash
+                    for row in watermarks.itertuples(index=False)
+                ]
+                changed = watermarks[is_changed]
+                print(f"{len(changed)} of {len(watermarks)} (year, quarter) slices are new or changed.")
+                if changed.empty:
+                    print("Database is up to date. Nothing to load.")
+                    return True
+                for row in changed.itertuples(index=False):
+                    state = 'changed' if (row.year, row.quarter) in loaded_hashes else 'new'
+                    print(f"  {row.year} Q{row.quarter}: {row.row_count:,} source rows ({state})")
+
+                if not self._upsert_dimensions(conn):
+                    return False
+                if not self._reload_slices(conn, changed):
+                    return False
+                self._refresh_rollups(conn, changed, commit=False)
+                self._record_watermarks(conn, changed, commit=False)
+                conn.commit()
+                print("Incremental load committed.")
+                return True
+        except psycopg2.Error as e_conn:
+            self._report_db_error(e_conn)
             return False
         except Exception as e_generic:
             print(f"An unexpected error occurred during DB operations: {e_generic}")
@@ -583,6 +1132,601 @@ class AirlineDataNormalizer:
             traceback.print_exc()
             return False
 
+    def _upsert_dimensions(self, conn) -> bool:
+        """Upsert the dimension tables, keeping the carrier and route ids already in the database."""
+        self._reconcile_dimension_ids(conn)
+        upserts = [
+            ('cities', ['city_market_id'], ['city_name', 'state', 'full_city_name']),
+            ('airports', ['airport_id'], ['airport_code', 'city_market_id']),
+            ('carriers', ['carrier_code'], []),
+            ('routes', ['origin_airport_id', 'destination_airport_id'], ['distance_miles']),
+        ]
+        for table_name, conflict_columns, update_columns in upserts:
+            if self.tables[table_name].empty:
+                print(f"Table DataFrame '{table_name}' is empty. Skipping upsert.")
+                continue
+            if not self._upsert_dataframe(conn, table_name, self.tables[table_name], conflict_columns, update_columns):
+                return False
+        return True
+
+    def _upsert_dataframe(self, conn, table_name: str, df: pd.DataFrame,
+                          conflict_columns: List[str], update_columns: List[str]) -> bool:
+        """COPY df into a temporary staging table and merge it into table_name with ON CONFLICT."""
+        staging_table = f"staging_{table_name}"
+        started = time.perf_counter()
+        with conn.cursor() as cur:
+            cur.execute(f"CREATE TEMP TABLE {staging_table} (LIKE {table_name} INCLUDING DEFAULTS) ON COMMIT DROP")
+        if not self._copy_dataframe(conn, staging_table, df, commit=False):
+            return False
+
+        columns = ', '.join(df.columns)
+        if update_columns:
+            # Rows whose values did not change are left alone instead of being rewritten
+            action = (
+                "DO UPDATE SET " + ', '.join(f"{col} = EXCLUDED.{col}" for col in update_columns) +
+                f" WHERE ({', '.join(f'{table_name}.{col}' for col in update_columns)}) IS DISTINCT FROM "
+                f"({', '.join(f'EXCLUDED.{col}' for col in update_columns)})"
+            )
+        else:
+            action = "DO NOTHING"
+        with conn.cursor() as cur:
+            cur.execute(
+                f"INSERT INTO {table_name} ({columns}) SELECT {columns} FROM {staging_table} "
+                f"ON CONFLICT ({', '.join(conflict_columns)}) {action}"
+            )
+            print(f"Upserted {cur.rowcount:,} rows into {table_name}.")
+        self._record_load_stats(table_name, len(df), time.perf_counter() - started)
+        return True
+
+    def _reconcile_dimension_ids(self, conn) -> None:
+        """
+        carrier_id and route_id are numbered per run, so a code or airport pair already stored may
+        have a different id in memory. Replace them with the stored ids, number new keys after the
+        current maximum and remap the fact tables to match.
+        """
+        with conn.cursor() as cur:
+            cur.execute("SELECT carrier_code, carrier_id FROM carriers")
+            stored_carriers = pd.DataFrame(cur.fetchall(), columns=['carrier_code', 'carrier_id'])
+            cur.execute("SELECT origin_airport_id, destination_airport_id, route_id FROM routes")
+            stored_routes = pd.DataFrame(cur.fetchall(), columns=['origin_airport_id', 'destination_airport_id', 'route_id'])
+
+        carriers = self.tables['carriers']
+        carrier_ids = self._assign_stored_ids(
+            carriers['carrier_code'].map(stored_carriers.set_index('carrier_code')['carrier_id']),
+            stored_carriers['carrier_id']
+        )
+        carrier_remap = pd.Series(carrier_ids.to_numpy(), index=carriers['carrier_id'].to_numpy())
+        self.tables['carriers'] = carriers.assign(carrier_id=carrier_ids.to_numpy())
+        if not self.tables['market_share'].empty:
+            self.tables['market_share'] = self.tables['market_share'].assign(
+                carrier_id=self.tables['market_share']['carrier_id'].map(carrier_remap)
+            )
+
+        routes = self.tables['routes']
+        known_route_ids = pd.Series(np.nan, index=routes.index)
+        if not stored_routes.empty:
+            stored_route_index = pd.MultiIndex.from_frame(stored_routes[['origin_airport_id', 'destination_airport_id']])
+            positions = stored_route_index.get_indexer(
+                pd.MultiIndex.from_frame(routes[['origin_airport_id', 'destination_airport_id']])
+            )
+            known_route_ids[positions >= 0] = stored_routes['route_id'].to_numpy()[positions[positions >= 0]]
+        route_ids = self._assign_stored_ids(known_route_ids, stored_routes['route_id'])
+        route_remap = pd.Series(route_ids.to_numpy(), index=routes['route_id'].to_numpy())
+        self.tables['routes'] = routes.assign(route_id=route_ids.to_numpy())
+        if not self.tables['flights'].empty:
+            self.tables['flights'] = self.tables['flights'].assign(
+                route_id=self.tables['flights']['route_id'].map(route_remap)
+            )
+
+    @staticmethod
+    def _assign_stored_ids(known_ids: pd.Series, stored_ids: pd.Series) -> pd.Series:
+        """Keep known ids (NaN where the key is new) and number new keys after the largest stored id."""
+        is_new = known_ids.isna().to_numpy()
+        next_id = int(stored_ids.max()) + 1 if len(stored_ids) else 1
+        ids = known_ids.to_numpy(dtype=float).copy()
+        ids[is_new] = np.arange(next_id, next_id + is_new.sum())
+        return pd.Series(ids.astype(np.int64), index=known_ids.index)
+
+    def _reload_slices(self, conn, changed: pd.DataFrame) -> bool:
+        """Replace the flights (and, through ON DELETE CASCADE, market share) of the changed slices."""
+        if self.partition_by:
+            return self._swap_partitions(conn, changed)
+        slices = list(changed[['year', 'quarter']].itertuples(index=False, name=None))
+        with conn.cursor() as cur:
+            execute_values(
+                cur,
+                "DELETE FROM flights f USING (VALUES %s) AS s(year, quarter) "
+                "WHERE f.year = s.year AND f.quarter = s.quarter",
+                slices
+            )
+            print(f"Deleted {cur.rowcount:,} previously loaded flights from changed slices.")
+            cur.execute("SELECT COALESCE(MAX(flight_id), 0) FROM flights")
+            next_flight_id = cur.fetchone()[0] + 1
+
+        # Renumber after the flights kept from unchanged slices
+        slice_flights, slice_market_share = self._renumbered_fact_rows(changed[['year', 'quarter']], next_flight_id)
+        for table_name, df in [('flights', slice_flights), ('market_share', slice_market_share)]:
+            if df.empty:
+                print(f"No {table_name} rows in the changed slices. Skipping insertion.")
+                continue
+            started = time.perf_counter()
+            if not self._copy_dataframe(conn, table_name, df, commit=False):
+                return False
+            self._record_load_stats(table_name, len(df), time.perf_counter() - started)
+        return True
+
+    def _renumbered_fact_rows(self, keys: pd.DataFrame, next_flight_id: int) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Flights whose key columns (year, and quarter when present) match a row of keys, numbered
+        from next_flight_id, and the market share rows of those flights remapped to the new ids.
+        """
+        flights = self.tables['flights']
+        in_keys = pd.MultiIndex.from_frame(keys).get_indexer(
+            pd.MultiIndex.from_arrays([flights[col].fillna(-1).astype(int) for col in keys.columns])
+        ) >= 0
+        key_flights = flights[in_keys]
+        flight_remap = pd.Series(
+            np.arange(next_flight_id, next_flight_id + len(key_flights)), index=key_flights['flight_id'].to_numpy()
+        )
+        key_flights = key_flights.assign(flight_id=flight_remap.to_numpy())
+
+        market_share = self.tables['market_share']
+        if not market_share.empty:
+            key_market_share = market_share[market_share['flight_id'].isin(flight_remap.index)]
+            key_market_share = key_market_share.assign(flight_id=key_market_share['flight_id'].map(flight_remap))
+        else:
+            key_market_share = market_share
+        return key_flights, key_market_share
+
+    def _swap_partitions(self, conn, changed: pd.DataFrame) -> bool:
+        """
+        Partitioned counterpart of the delete-and-reload: each partition holding a changed slice is
+        rebuilt from all of its source rows in a staging table, which then replaces the old
+        partition. The old partition is dropped instead of deleted row by row, and queries keep
+        reading it until the transaction commits.
+        """
+        keys = self._partition_keys(changed)
+        with conn.cursor() as cur:
+            cur.execute("SELECT COALESCE(MAX(flight_id), 0) FROM flights")
+            next_flight_id = cur.fetchone()[0] + 1
+        swap_flights, swap_market_share = self._renumbered_fact_rows(
+            pd.DataFrame(keys, columns=self.partition_columns), next_flight_id
+        )
+        parts = {'flights': self._split_by_partition(swap_flights),
+                 'market_share': self._split_by_partition(swap_market_share)}
+
+        for key in keys:
+            with conn.cursor() as cur:
+                for table_name in PARTITIONED_TABLES:
+                    staging = f"{self._partition_name(table_name, key)}_swap"
+                    cur.execute(f"CREATE TABLE {staging} (LIKE {table_name} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+                    # Lets ATTACH PARTITION skip the scan that checks the rows against the partition bounds
+                    cur.execute(f"ALTER TABLE {staging} ADD CONSTRAINT {staging}_bounds "
+                                f"CHECK ({self._partition_condition(key)})")
+            for table_name in PARTITIONED_TABLES:
+                df = parts[table_name].get(key)
+                if df is None:
+                    continue
+                started = time.perf_counter()
+                if not self._copy_dataframe(conn, table_name, df, commit=False,
+                                            target_table=f"{self._partition_name(table_name, key)}_swap"):
+                    return False
+                self._record_load_stats(table_name, len(df), time.perf_counter() - started)
+
+            with conn.cursor() as cur:
+                # market_share references flights: its old partition is removed first and its new one attached last
+                for table_name in reversed(PARTITIONED_TABLES):
+                    partition = self._partition_name(table_name, key)
+                    cur.execute("SELECT to_regclass(%s)", (partition,))
+                    if cur.fetchone()[0] is not None:
+                        cur.execute(f"ALTER TABLE {table_name} DETACH PARTITION {partition}")
+                        cur.execute(f"DROP TABLE {partition}")
+                for table_name in PARTITIONED_TABLES:
+                    partition = self._partition_name(table_name, key)
+                    cur.execute(f"ALTER TABLE {partition}_swap RENAME TO {partition}")
+                    cur.execute(f"ALTER TABLE {table_name} ATTACH PARTITION {partition} FOR VALUES {self._partition_bounds(key)}")
+                    cur.execute(f"ALTER TABLE {partition} DROP CONSTRAINT {partition}_swap_bounds")
+            print(f"Swapped in partition {self._partition_name('flights', key)[len('flights_'):]} "
+                  f"({len(parts['flights'].get(key, [])):,} flights).")
+        return True
+
+    def detach_years(self, years: List[int], archive_schema: Optional[str] = ARCHIVE_SCHEMA) -> bool:
+        """
+        Detach the flights and market_share partitions of the given years and, with archive_schema,
+        move them into that schema. The detached tables keep their rows and indexes, and the detached
+        market_share references the detached flights instead of the partitioned table. The rollups
+        drop those years, while etl_watermarks keeps them so incremental runs do not load them again.
+        """
+        print(f"Connecting to PostgreSQL: dbname='{self.db_params['dbname']}' host='{self.db_params['host']}'")
+        try:
+            with self._connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                        "WHERE i.inhparent = 'flights'::regclass ORDER BY c.relname"
+                    )
+                    flights_partitions = [
+                        name for (name,) in cur.fetchall()
+                        if any(re.fullmatch(rf"flights_y{year}(q[1-4])?", name) for year in years)
+                    ]
+                    if not flights_partitions:
+                        print(f"No partitions of flights found for years {years}. Nothing to detach.")
+                        return False
+                    if archive_schema:
+                        cur.execute(f"CREATE SCHEMA IF NOT EXISTS {archive_schema}")
+                        for partition in flights_partitions:
+                            suffix = partition[len('flights'):]
+                            for name in (partition, f"market_share{suffix}"):
+                                cur.execute("SELECT to_regclass(%s)", (f"{archive_schema}.{name}",))
+                                if cur.fetchone()[0] is not None:
+                                    print(f"Error: {archive_schema}.{name} already exists. Nothing was detached.")
+                                    conn.rollback()
+                                    return False
+
+                    for partition in flights_partitions:
+                        suffix = partition[len('flights'):]
+                        market_share_partition = f"market_share{suffix}"
+                        key_columns = ', '.join(PARTITION_KEY_COLUMNS['quarter' if 'q' in suffix else 'year'])
+                        # A flights partition can only be detached once nothing else references its rows,
+                        # so market_share goes first and drops its copy of the foreign key to flights.
+                        cur.execute(f"ALTER TABLE market_share DETACH PARTITION {market_share_partition}")
+                        cur.execute(
+                            "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass "
+                            "AND contype = 'f' AND confrelid = 'flights'::regclass", (market_share_partition,)
+                        )
+                        for (constraint,) in cur.fetchall():
+                            cur.execute(f'ALTER TABLE {market_share_partition} DROP CONSTRAINT "{constraint}"')
+                        # The id sequence belongs to market_share and is dropped with it by the next full load
+                        cur.execute(f"ALTER TABLE {market_share_partition} ALTER COLUMN market_share_id DROP DEFAULT")
+                        cur.execute(f"ALTER TABLE flights DETACH PARTITION {partition}")
+                        flights_table, market_share_table = partition, market_share_partition
+                        if archive_schema:
+                            for name in (partition, market_share_partition):
+                                cur.execute(f"ALTER TABLE {name} SET SCHEMA {archive_schema}")
+                            flights_table = f"{archive_schema}.{partition}"
+                            market_share_table = f"{archive_schema}.{market_share_partition}"
+                        cur.execute(
+                            f"ALTER TABLE {market_share_table} ADD FOREIGN KEY (flight_id, {key_columns}) "
+                            f"REFERENCES {flights_table} (flight_id, {key_columns})"
+                        )
+                        print(f"Detached {flights_table} and {market_share_table}.")
+                    # The rollups describe the facts still attached
+                    for table_name in ROLLUP_TABLES:
+                        cur.execute(f"DELETE FROM {table_name} WHERE year = ANY(%s)", (list(years),))
+                conn.commit()
+                return True
+        except psycopg2.Error as e_conn:
+            self._report_db_error(e_conn)
+            return False
+
+    def _refresh_rollups(self, conn, slices: Optional[pd.DataFrame] = None, commit: bool = True) -> None:
+        """
+        Rebuild ROLLUP_TABLES from flights and market_share, either entirely or only for the
+        (year, quarter) rows of slices, whose previous aggregates are deleted first.
+        """
+        started = time.perf_counter()
+        with conn.cursor() as cur:
+            if slices is None:
+                cur.execute(f"TRUNCATE {', '.join(ROLLUP_TABLES)}")
+                for table_name in ROLLUP_TABLES:
+                    cur.execute(ROLLUP_REFRESH_SQL[table_name].format(slice_join=''))
+                scope = "all slices"
+            else:
+                values = list(slices[['year', 'quarter']].itertuples(index=False, name=None))
+                if not values:
+                    return
+                for table_name in ROLLUP_TABLES:
+                    execute_values(
+                        cur,
+                        f"DELETE FROM {table_name} t USING (VALUES %s) AS s(year, quarter) "
+                        "WHERE t.year = s.year AND t.quarter = s.quarter",
+                        values, page_size=len(values)
+                    )
+                    execute_values(cur, ROLLUP_REFRESH_SQL[table_name].format(slice_join=ROLLUP_SLICE_JOIN),
+                                   values, page_size=len(values))
+                scope = f"{len(values)} changed (year, quarter) slices"
+        if commit:
+            conn.commit()
+        print(f"Refreshed {' and '.join(ROLLUP_TABLES)} ({scope}) in {time.perf_counter() - started:.2f} s.")
+
+    def _record_watermarks(self, conn, watermarks: pd.DataFrame, commit: bool = True) -> None:
+        """Upsert the ingested slices into etl_watermarks."""
+        if watermarks.empty:
+            return
+        with conn.cursor() as cur:
+            execute_values(
+                cur,
+                "INSERT INTO etl_watermarks (year, quarter, row_count, content_hash) VALUES %s "
+                "ON CONFLICT (year, quarter) DO UPDATE SET row_count = EXCLUDED.row_count, "
+                "content_hash = EXCLUDED.content_hash, loaded_at = CURRENT_TIMESTAMP",
+                list(watermarks[['year', 'quarter', 'row_count', 'content_hash']].itertuples(index=False, name=None))
+            )
+        if commit:
+            conn.commit()
+        print(f"Recorded {len(watermarks)} (year, quarter) slices in etl_watermarks.")
+
+    def build_secondary_indexes(self) -> bool:
+        """
+        Post-load phase: build SECONDARY_INDEXES and refresh planner statistics.
+        Indexes are built CONCURRENTLY so the tables stay writable meanwhile, which needs an
+        autocommit connection; partitioned tables are the exception (see generate_index_ddl). An index left INVALID by an interrupted concurrent build would
+        be skipped by IF NOT EXISTS, so those are dropped and rebuilt first.
+        """
+        print("Building secondary indexes...")
+        names = [name for name, _, _ in SECONDARY_INDEXES]
+        tables = list(dict.fromkeys(table for _, table, _ in SECONDARY_INDEXES))
+        pool = get_pool(self.db_params)
+        try:
+            conn = pool.getconn()
+        except psycopg2.Error as e_conn:
+            self._report_db_error(e_conn)
+            return False
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute("SET maintenance_work_mem = %s", (INDEX_MAINTENANCE_WORK_MEM,))
+                cur.execute("SELECT relname FROM pg_class WHERE relkind = 'p' AND relname = ANY(%s)", (tables,))
+                partitioned_tables = tuple(name for (name,) in cur.fetchall())
+                cur.execute(
+                    "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                    "WHERE NOT i.indisvalid AND c.relkind = 'i' AND c.relname = ANY(%s)", (names,)
+                )
+                for (name,) in cur.fetchall():
+                    print(f"  Dropping invalid index {name} left by an earlier build")
+                    cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+                for (name, table, columns), statement in zip(SECONDARY_INDEXES,
+                                                                  self.generate_index_ddl(partitioned_tables=partitioned_tables)):
+                    started = time.perf_counter()
+                    cur.execute(statement)
+                    seconds = time.perf_counter() - started
+                    self.index_stats[name] = seconds
+                    print(f"  {name:<32} {table}({', '.join(columns)})  {seconds:.2f} s")
+
+                started = time.perf_counter()
+                cur.execute(f"ANALYZE {', '.join(tables)}")
+                print(f"  ANALYZE {', '.join(tables)}  {time.perf_counter() - started:.2f} s")
+            print(f"Built {len(SECONDARY_INDEXES)} secondary indexes in {sum(self.index_stats.values()):.2f} s.")
+            return True
+        except psycopg2.Error as e_conn:
+            self._report_db_error(e_conn)
+            return False
+        finally:
+            pool.putconn(conn)
+
+    def _create_partitions(self, conn, flights: pd.DataFrame) -> None:
+        """Create the fact table partitions for the keys of flights that this run has not created yet."""
+        if not self.partition_by or flights.empty:
+            return
+        keys = [key for key in self._partition_keys(flights) if key not in self.created_partitions]
+        if not keys:
+            return
+        with conn.cursor() as cur:
+            for statement in self.generate_partition_ddl(keys):
+                cur.execute(statement)
+        conn.commit()
+        self.created_partitions.update(keys)
+        print(f"Created {len(keys)} {self.partition_by} partitions of {' and '.join(PARTITIONED_TABLES)}.")
+
+    def _connection(self):
+        """Borrow a pooled connection: committed when the block succeeds, rolled back when it raises."""
+        return get_pool(self.db_params).connection()
+
+    def _create_schema(self, conn) -> None:
+        """Drop and recreate all tables using the generated DDL."""
+        with conn.cursor() as cur:
+            print("Dropping and Creating tables...")
+            for statement in self.generate_postgres_ddl():
+                cur.execute(statement)
+            conn.commit()
+            print("Tables created successfully.")
+
+    def _prepare_insert_frame(self, table_name: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Return a copy of df with values converted to what the database columns expect."""
+        # Boxing to object turns numpy scalars into Python ones psycopg2 can adapt;
+        # NaN, NaT and pd.NA become None (NULL)
+        return df.astype(object).where(df.notna(), None)
+
+    def _insert_dataframe(self, conn, table_name: str, df: pd.DataFrame) -> bool:
+        """Load df into table_name with the configured loader. Returns False on failure."""
+        started = time.perf_counter()
+        loaded = self._load_dataframe(conn, table_name, df)
+        if loaded:
+            self._record_load_stats(table_name, len(df), time.perf_counter() - started)
+        return loaded
+
+    def _load_dataframe(self, conn, table_name: str, df: pd.DataFrame) -> bool:
+        for target_table, part in self._load_targets(table_name, df):
+            if self.loader == 'copy':
+                loaded = self._copy_dataframe(conn, table_name, part, target_table=target_table)
+            else:
+                loaded = self._multirow_insert_dataframe(conn, table_name, part, target_table=target_table)
+            if not loaded:
+                return False
+        return True
+
+    def _load_targets(self, table_name: str, df: pd.DataFrame) -> List[Tuple[str, pd.DataFrame]]:
+        """Partitioned fact tables are written straight into their partitions instead of through the parent."""
+        if not self.partition_by or table_name not in PARTITIONED_TABLES:
+            return [(table_name, df)]
+        return [(self._partition_name(table_name, key), part) for key, part in self._split_by_partition(df).items()]
+
+    def _build_load_stages(self, tables: Dict[str, pd.DataFrame], stages: List[Tuple[str, ...]],
+                           first_market_share_id: int = 1) -> List[List[Tuple[str, pd.DataFrame]]]:
+        """Turn a list of table stages into (table_name, frame) load tasks, splitting fact tables by year."""
+        load_stages = []
+        for stage in stages:
+            tasks = []
+            for table_name in stage:
+                if table_name not in tables:
+                    print(f"Table DataFrame '{table_name}' not found. Skipping.")
+                elif tables[table_name].empty:
+                    print(f"Table DataFrame '{table_name}' is empty. Skipping insertion.")
+                elif table_name in PARTITIONED_LOAD_TABLES:
+                    df = tables[table_name]
+                    if table_name == 'market_share':
+                        # Concurrent partitions would draw SERIAL ids in arrival order; numbering the
+                        # rows up front gives them the ids a sequential load assigns.
+                        df = df.assign(market_share_id=np.arange(first_market_share_id, first_market_share_id + len(df)))
+                    tasks.extend((table_name, part) for part in self._partition_by_year(df, tables['flights']))
+                else:
+                    tasks.append((table_name, tables[table_name]))
+            load_stages.append(tasks)
+        return load_stages
+
+    def _partition_by_year(self, df: pd.DataFrame, flights: pd.DataFrame) -> List[pd.DataFrame]:
+        """Split a fact table by flight year; market_share rows take the year of their flight."""
+        if 'year' in df.columns:
+            years = df['year']
+        else:
+            years = df['flight_id'].map(flights.set_index('flight_id')['year'])
+        return [part for _, part in df.groupby(years, sort=True, dropna=False)]
+
+    @contextlib.contextmanager
+    def _worker_pool(self) -> Iterator[Optional[ConnectionPool]]:
+        """
+        Pool of self.workers connections for the parallel load, opened once per load so a
+        streamed load reuses the same connections for every chunk. None when workers is 1.
+        """
+        if self.workers <= 1:
+            yield None
+            return
+        pool = ConnectionPool(self.db_params, maxconn=self.workers)
+        try:
+            yield pool
+        finally:
+            pool.closeall()
+
+    def _parallel_load(self, pool: ConnectionPool, stages: List[List[Tuple[str, pd.DataFrame]]]) -> bool:
+        """
+        Run each stage's load tasks concurrently over the connections of pool (see _worker_pool).
+        Stages run in order so foreign keys always point at rows that are already committed.
+        Throughput is recorded per table as wall time from stage start to its last partition.
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for tasks in stages:
+                started = time.perf_counter()
+                futures = {
+                    executor.submit(self._load_partition, pool, table_name, part): (table_name, len(part))
+                    for table_name, part in tasks
+                }
+                all_loaded = True
+                rows, finished = {}, {}
+                for future in as_completed(futures):
+                    table_name, row_count = futures[future]
+                    loaded, finished_at = future.result()
+                    all_loaded = all_loaded and loaded
+                    rows[table_name] = rows.get(table_name, 0) + row_count
+                    finished[table_name] = max(finished.get(table_name, started), finished_at)
+                if not all_loaded:
+                    return False
+                for table_name, row_count in rows.items():
+                    self._record_load_stats(table_name, row_count, finished[table_name] - started)
+        return True
+
+    def _sync_market_share_sequence(self, conn) -> None:
+        """Move the market_share_id sequence past the ids assigned by the parallel load."""
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT setval(pg_get_serial_sequence('market_share', 'market_share_id'), "
+                "COALESCE(MAX(market_share_id), 0) + 1, false) FROM market_share"
+            )
+        conn.commit()
+
+    def _load_partition(self, pool: ConnectionPool, table_name: str, df: pd.DataFrame) -> Tuple[bool, float]:
+        """Load one task on a pooled connection; returns whether it loaded and when it finished."""
+        conn = pool.getconn()
+        try:
+            return self._load_dataframe(conn, table_name, df), time.perf_counter()
+        finally:
+            pool.putconn(conn)
+
+    def _multirow_insert_dataframe(self, conn, table_name: str, df: pd.DataFrame,
+                                   target_table: Optional[str] = None) -> bool:
+        """
+        Append df to table_name (or to target_table, one of its partitions) with multi-row
+        INSERTs on conn, so a parallel load writes through its own pooled connection.
+        """
+        df_to_insert = self._prepare_insert_frame(table_name, df)
+        target_table = target_table or table_name
+        columns = ', '.join(df_to_insert.columns)
+        print(f"Inserting data into {target_table} ({len(df_to_insert)} records)...")
+        try:
+            with conn.cursor() as cur:
+                execute_values(cur, f"INSERT INTO {target_table} ({columns}) VALUES %s",
+                               df_to_insert.itertuples(index=False, name=None), page_size=INSERT_PAGE_ROWS)
+            conn.commit()
+            print(f"Successfully inserted data into {target_table}.")
+            return True
+        except psycopg2.Error as e_insert:
+            print(f"INSERT Error for table {target_table}: {e_insert}")
+            print("Sample of data that might be causing issues (first 5 rows):")
+            print(df_to_insert.head())
+            conn.rollback()
+            return False
+
+    def _prepare_copy_frame(self, table_name: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Return a copy of df whose CSV rendering is accepted by COPY for the target columns."""
+        df_to_copy = df.copy()
+        for col in df_to_copy.columns:
+            # Float columns holding whole numbers (e.g. year after NaN coercion) would be
+            # written as '2021.0', which COPY rejects for INTEGER columns.
+            if pd.api.types.is_float_dtype(df_to_copy[col].dtype):
+                values = df_to_copy[col].dropna()
+                if (values == values.round()).all():
+                    df_to_copy[col] = df_to_copy[col].astype('Int64')
+        return df_to_copy
+
+    def _copy_dataframe(self, conn, table_name: str, df: pd.DataFrame, commit: bool = True,
+                        target_table: Optional[str] = None) -> bool:
+        """Stream df into table_name (or target_table, a partition or staging copy of it) with COPY FROM STDIN."""
+        df_to_copy = self._prepare_copy_frame(table_name, df)
+        target_table = target_table or table_name
+        columns = ', '.join(df_to_copy.columns)
+        copy_sql = (f"COPY {target_table} ({columns}) FROM STDIN "
+                    f"WITH (FORMAT csv, NULL '{COPY_NULL_MARKER}')")
+        print(f"Copying data into {target_table} ({len(df_to_copy)} records)...")
+        try:
+            with conn.cursor() as cur:
+                for batch_start in range(0, len(df_to_copy), COPY_BATCH_ROWS):
+                    buffer = io.StringIO()
+                    df_to_copy.iloc[batch_start:batch_start + COPY_BATCH_ROWS].to_csv(
+                        buffer, index=False, header=False, na_rep=COPY_NULL_MARKER
+                    )
+                    buffer.seek(0)
+                    cur.copy_expert(copy_sql, buffer)
+            if commit:
+                conn.commit()
+            print(f"Successfully copied data into {target_table}.")
+            return True
+        except psycopg2.Error as e_copy:
+            print(f"COPY Error for table {target_table}: {e_copy}")
+            print("Sample of data that might be causing issues (first 5 rows):")
+            print(df_to_copy.head())
+            conn.rollback()
+            return False
+
+    def _record_load_stats(self, table_name: str, rows: int, seconds: float) -> None:
+        stats = self.load_stats.setdefault(table_name, {'rows': 0, 'seconds': 0.0})
+        stats['rows'] += rows
+        stats['seconds'] += seconds
+
+    def print_load_stats(self) -> None:
+        """Print rows/sec per table for the loader used in this run."""
+        if not self.load_stats:
+            return
+        print("\n" + "="*60)
+        print(f"LOAD THROUGHPUT (loader: {self.loader})")
+        print("="*60)
+        for table_name, stats in self.load_stats.items():
+            rate = stats['rows'] / stats['seconds'] if stats['seconds'] > 0 else float('inf')
+            print(f"  {table_name:<14} {stats['rows']:>12,} rows  {stats['seconds']:>9.2f} s  {rate:>14,.0f} rows/sec")
+
+    def _report_db_error(self, e_conn) -> None:
+        print(f"PostgreSQL Connection/Execution Error: {e_conn}")
+        if hasattr(e_conn, 'pgcode'): print(f"PGCODE: {e_conn.pgcode}")
+        if hasattr(e_conn, 'pgerror'): print(f"PGERROR: {e_conn.pgerror}")
+
     def print_summary(self):
         print("\n" + "="*60)
         print("NORMALIZED DATA SUMMARY (Pandas DataFrames)")
@@ -599,33 +1743,96 @@ class AirlineDataNormalizer:
             else:
                 print("  Sample: DataFrame is empty.")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Normalize US airline data and load it into PostgreSQL.")
+    parser.add_argument('--csv', default='archive/US Airline Flight Routes and Fares 1993-2024.csv',
+                        help="Path to the source CSV file")
+    parser.add_argument('--stream', action='store_true',
+                        help="Process the source in bounded-size chunks instead of loading it whole")
+    parser.add_argument('--chunk-size', type=int, default=None,
+                        help="Rows per chunk in streaming mode (overrides --memory-budget-mb)")
+    parser.add_argument('--memory-budget-mb', type=float, default=DEFAULT_MEMORY_BUDGET_MB,
+                        help=f"Memory budget used to size chunks in streaming mode (default: {DEFAULT_MEMORY_BUDGET_MB})")
+    parser.add_argument('--loader', choices=LOADERS, default=DEFAULT_LOADER,
+                        help="'insert' uses multi-row INSERTs, 'copy' uses COPY FROM STDIN")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Keep existing tables and load only the (Year, quarter) slices that are new or "
+                             "changed since the last run (always stages through COPY)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Parse the CSV even when a snapshot of the cleaned data exists (also AIRLINE_CSV_CACHE=0)")
+    parser.add_argument('--partition-by', choices=sorted(PARTITION_KEY_COLUMNS), default=None,
+                        help="Range-partition flights and market_share by year or by (year, quarter)")
+    parser.add_argument('--detach-years', type=int, nargs='+', metavar='YEAR',
+                        help="Detach the flights and market_share partitions of these years, then exit")
+    parser.add_argument('--archive-schema', default=ARCHIVE_SCHEMA,
+                        help=f"Schema the detached partitions are moved to; '' leaves them in place (default: {ARCHIVE_SCHEMA})")
+    parser.add_argument('--skip-indexes', action='store_true',
+                        help="Do not build the secondary indexes after the load")
+    parser.add_argument('--workers', type=int, default=DEFAULT_LOAD_WORKERS,
+                        help="Parallel database connections; independent tables and per-year partitions of "
+                             f"flights and market_share load concurrently (default: {DEFAULT_LOAD_WORKERS})")
+    args = parser.parse_args()
+    if args.incremental and (args.stream or args.workers > 1):
+        parser.error("--incremental cannot be combined with --stream or --workers")
+    return args
+
 def main():
-    db_connection_params = {
-        "host": DB_HOST,
-        "dbname": DB_NAME,
-        "user": DB_USER,
-        "password": DB_PASS,
-        "port": DB_PORT,
-    }
+    args = parse_args()
+    db_connection_params = resolve_db_params()
+    if args.detach_years:
+        normalizer = AirlineDataNormalizer(csv_file_path=args.csv, db_params=db_connection_params)
+        if normalizer.detach_years(args.detach_years, archive_schema=args.archive_schema or None):
+            print("\n✅ Partitions detached.")
+        else:
+            print("\n❌ Detaching partitions failed.")
+        return
+
     print("Starting airline data normalization and database population process for PostgreSQL...")
-    print("WARNING: This script will DROP and RECREATE tables in the specified database.")
+    if not args.incremental:
+        print("WARNING: This script will DROP and RECREATE tables in the specified database.")
     
     normalizer = AirlineDataNormalizer(
-        csv_file_path='archive/US Airline Flight Routes and Fares 1993-2024.csv',
-        db_params=db_connection_params
+        csv_file_path=args.csv,
+        db_params=db_connection_params,
+        chunk_size=args.chunk_size,
+        memory_budget_mb=args.memory_budget_mb,
+        loader='copy' if args.incremental else args.loader,
+        workers=args.workers,
+        use_cache=not args.no_cache,
+        partition_by=args.partition_by
     )
 
-    if normalizer.normalize_data():
+    if args.stream:
+        normalized = normalizer.normalize_dimensions_streaming()
+    else:
+        normalized = normalizer.normalize_data()
+
+    if normalized:
         normalizer.print_summary() # Print summary before DB insertion attempt
-        if normalizer.create_db_schema_and_insert_data():
+        if args.stream:
+            loaded = normalizer.stream_to_database()
+        elif args.incremental:
+            loaded = normalizer.load_incremental()
+        else:
+            loaded = normalizer.create_db_schema_and_insert_data()
+        if loaded and not args.skip_indexes:
+            loaded = normalizer.build_secondary_indexes()
+        normalizer.print_load_stats()
+        if loaded:
             print("\n✅ Normalization and database population complete!")
-            print(f"🗄️  Data should now be in PostgreSQL database '{DB_NAME}' on host '{DB_HOST}'.")
-            ddl_statements = normalizer.generate_postgres_ddl()
+            print(f"🗄️  Data should now be in PostgreSQL database '{db_connection_params['dbname']}' on host '{db_connection_params['host']}'.")
+            ddl_statements = normalizer.generate_postgres_ddl() + \
+                normalizer.generate_partition_ddl(sorted(normalizer.created_partitions))
             ddl_file_path = 'create_postgres_tables.sql'
             with open(ddl_file_path, 'w') as f:
                 for stmt in ddl_statements:
                     f.write(stmt + '\n\n') 
             print(f"📜 PostgreSQL DDL statements saved to '{ddl_file_path}'")
+            index_ddl_file_path = 'create_postgres_indexes.sql'
+            with open(index_ddl_file_path, 'w') as f:
+                for stmt in normalizer.generate_index_ddl():
+                    f.write(stmt + '\n\n')
+            print(f"📜 Secondary index statements saved to '{index_ddl_file_path}'")
         else:
             print("\n❌ Database schema creation or data insertion failed.")
     else:
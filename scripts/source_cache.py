@@ -0,0 +1,154 @@
+"""
+Columnar snapshot cache for frames parsed from the source CSV.
+
+The first run parses (and, for the normalizer, cleans) the CSV as usual and writes
+the resulting frame as an uncompressed Arrow IPC file. Later runs memory-map that
+file instead of parsing the CSV again.
+
+Snapshots are keyed by the content hash of the source file together with the
+variant (which tool and columns), the variant's version and the declared read
+schema. The content hash itself is remembered per (path, size, mtime), so an
+unchanged file is not re-read to hash it. Any change to the file produces a new
+key, and the stale snapshot is replaced automatically.
+
+The key cannot see the code that builds a frame. Each caller passes a version for
+its variant and must bump it whenever its build function changes what the frame
+contains (columns, dtypes, cleaning rules); otherwise snapshots written by the old
+code keep being served.
+
+The cache is bypassed when pyarrow is not installed, when a tool is run with
+--no-cache, or when AIRLINE_CSV_CACHE=0 is set. AIRLINE_CSV_CACHE_DIR moves the
+cache away from the default .cache/ directory next to the source file.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import pandas as pd
+
+from source_schema import schema_dtypes
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:  # Optional dependency; without it every run parses the CSV
+    pa = None
+
+CACHE_ENV_SWITCH = 'AIRLINE_CSV_CACHE'
+CACHE_DIR_ENV = 'AIRLINE_CSV_CACHE_DIR'
+CACHE_DIR_NAME = '.cache'
+# Bump when the snapshot layout changes so older snapshots are ignored
+CACHE_FORMAT_VERSION = 1
+HASH_BLOCK_BYTES = 8 * 1024 * 1024
+HASH_INDEX_FILE = 'source_hashes.json'
+
+
+def cache_enabled(no_cache: bool = False) -> bool:
+    """Whether snapshots should be used: not disabled by flag or environment and pyarrow available."""
+    if no_cache or os.getenv(CACHE_ENV_SWITCH, '1').strip().lower() in ('0', 'false', 'no', 'off'):
+        return False
+    if pa is None:
+        print("pyarrow is not installed; parsing the CSV without the snapshot cache.")
+        return False
+    return True
+
+
+def cache_dir_for(source_path: str) -> Path:
+    return Path(os.getenv(CACHE_DIR_ENV) or Path(source_path).resolve().parent / CACHE_DIR_NAME)
+
+
+def source_content_hash(source_path: str, cache_dir: Path) -> str:
+    """SHA-256 of the source file, reused while its size and mtime are unchanged."""
+    stat = os.stat(source_path)
+    index_path = cache_dir / HASH_INDEX_FILE
+    index_key = str(Path(source_path).resolve())
+    try:
+        index = json.loads(index_path.read_text())
+    except (OSError, ValueError):
+        index = {}
+    entry = index.get(index_key)
+    if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        return entry['sha256']
+
+    digest = hashlib.sha256()
+    with open(source_path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b''):
+            digest.update(block)
+    index[index_key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+    _write_atomically(index_path, lambda tmp: tmp.write_text(json.dumps(index, indent=2)))
+    return digest.hexdigest()
+
+
+def cached_frame(source_path: str, variant: str, build: Callable[[], pd.DataFrame],
+                 columns: Optional[List[str]] = None, no_cache: bool = False, *, version: int) -> pd.DataFrame:
+    """
+    Return the frame build() produces for source_path, from the snapshot when one matches the
+    current file. variant names what build() does (e.g. 'normalizer-clean'); columns are the
+    source columns it reads, which together with the read schema are part of the key.
+    version identifies the build() code of the variant: bump it whenever build() changes
+    the frame it returns, so snapshots from the previous code are not reused.
+    """
+    if not cache_enabled(no_cache):
+        return build()
+
+    cache_dir = cache_dir_for(source_path)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    key_material = json.dumps({
+        'source': source_content_hash(source_path, cache_dir),
+        'variant': variant,
+        'version': version,
+        'columns': columns,
+        'dtypes': {col: str(dtype) for col, dtype in schema_dtypes(columns).items()},
+        'format': CACHE_FORMAT_VERSION,
+        'pandas': pd.__version__,
+    }, sort_keys=True)
+    key = hashlib.sha256(key_material.encode()).hexdigest()[:16]
+    prefix = f"{Path(source_path).stem}.{variant}."
+    snapshot_path = cache_dir / f"{prefix}{key}.arrow"
+
+    if snapshot_path.exists():
+        try:
+            df = _read_snapshot(snapshot_path)
+            print(f"Loaded {len(df):,} rows from snapshot {snapshot_path}")
+            return df
+        except (OSError, pa.ArrowException) as e:
+            print(f"Could not read snapshot {snapshot_path} ({e}); parsing the CSV again.")
+
+    df = build()
+    if df is None:
+        return df
+    # Snapshots of earlier versions of this source are no longer reachable
+    for stale in cache_dir.glob(f"{prefix}*.arrow"):
+        stale.unlink(missing_ok=True)
+    try:
+        _write_atomically(snapshot_path, lambda tmp: _write_snapshot(df, tmp))
+        print(f"Wrote snapshot {snapshot_path}")
+    except (OSError, pa.ArrowException) as e:
+        print(f"Could not write snapshot {snapshot_path} ({e}); continuing without it.")
+    return df
+
+
+def _read_snapshot(path: Path) -> pd.DataFrame:
+    # Uncompressed IPC buffers are used in place from the mapping instead of being read into memory
+    with pa.memory_map(str(path), 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas()
+
+
+def _write_snapshot(df: pd.DataFrame, path: Path) -> None:
+    table = pa.Table.from_pandas(df)
+    with pa.OSFile(str(path), 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def _write_atomically(path: Path, write: Callable[[Path], None]) -> None:
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
@@ -0,0 +1,129 @@
+"""
+Declared read schema for "US Airline Flight Routes and Fares 1993-2024.csv".
+
+Covers the columns documented in archive/references.json. Each tool reads only the
+columns it needs: integer columns get compact integer dtypes, low-cardinality text
+(airport codes, carrier codes, city names, geocoded city labels) is read straight
+into categoricals and the record key as plain strings, so the parser never builds a
+Python object per cell.
+
+A file that does not fit the schema (e.g. a missing value in an integer column)
+falls back to the inferred read the tools used before.
+"""
+
+import warnings
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+SOURCE_DTYPES = {
+    'tbl': 'category',
+    'Year': 'int16',
+    'quarter': 'int8',
+    'citymarketid_1': 'int32',
+    'citymarketid_2': 'int32',
+    'city1': 'category',
+    'city2': 'category',
+    'airportid_1': 'int32',
+    'airportid_2': 'int32',
+    'airport_1': 'category',
+    'airport_2': 'category',
+    'nsmiles': 'int32',
+    'passengers': 'int32',
+    'fare': 'float64',
+    'carrier_lg': 'category',
+    'large_ms': 'float64',
+    'fare_lg': 'float64',
+    'carrier_low': 'category',
+    'lf_ms': 'float64',
+    'fare_low': 'float64',
+    'Geocoded_City1': 'category',
+    'Geocoded_City2': 'category',
+    'tbl1apk': 'str',
+}
+
+# Columns read by each tool
+NORMALIZER_COLUMNS = [
+    'Year', 'quarter', 'citymarketid_1', 'citymarketid_2', 'city1', 'city2',
+    'airportid_1', 'airportid_2', 'airport_1', 'airport_2', 'passengers', 'fare',
+    'carrier_lg', 'large_ms', 'carrier_low', 'lf_ms', 'Geocoded_City1', 'Geocoded_City2', 'tbl1apk'
+]
+ANALYSIS_COLUMNS = ['Year', 'city1', 'city2', 'airport_1', 'airport_2', 'passengers', 'fare']
+
+SOURCE_READ_OPTIONS = {
+    'sep': ',',
+    'encoding': 'utf-8',
+    'on_bad_lines': 'skip',
+}
+# The fallback infers every column over the whole file, as the tools did before
+LOOSE_READ_OPTIONS = {**SOURCE_READ_OPTIONS, 'low_memory': False}
+
+# Raised by the parser when a value does not fit its declared dtype
+SCHEMA_ERRORS = (ValueError, OverflowError)
+
+
+def schema_dtypes(columns: Optional[List[str]] = None,
+                  dtype_overrides: Optional[Dict[str, object]] = None) -> Dict[str, object]:
+    """Declared dtypes for columns (all source columns by default), with dtype_overrides applied on top."""
+    dtypes = {col: dtype for col, dtype in SOURCE_DTYPES.items() if columns is None or col in columns}
+    dtypes.update(dtype_overrides or {})
+    return dtypes
+
+
+def _usecols(columns: Optional[List[str]]):
+    # A callable keeps the read working when the file lacks one of the requested columns
+    if columns is None:
+        return None
+    wanted = set(columns)
+    return lambda col: col in wanted
+
+
+def read_source_csv(path: str, columns: Optional[List[str]] = None,
+                    dtype_overrides: Optional[Dict[str, object]] = None, **read_options) -> pd.DataFrame:
+    """Read columns of the source file with the declared schema, falling back to an inferred read."""
+    try:
+        with warnings.catch_warnings():
+            # NaN-to-integer casts warn right before they raise
+            warnings.simplefilter('ignore', RuntimeWarning)
+            return pd.read_csv(path, usecols=_usecols(columns), dtype=schema_dtypes(columns, dtype_overrides),
+                               **SOURCE_READ_OPTIONS, **read_options)
+    except SCHEMA_ERRORS as e:
+        print(f"Source does not match the declared schema ({e}); falling back to an inferred read.")
+        return pd.read_csv(path, usecols=_usecols(columns), dtype=dtype_overrides,
+                           **LOOSE_READ_OPTIONS, **read_options)
+
+
+def iter_source_csv(path: str, chunksize: int, columns: Optional[List[str]] = None,
+                    dtype_overrides: Optional[Dict[str, object]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Yield chunks of the source file read with the declared schema. If a chunk does not fit
+    the schema, the file is reopened with an inferred read and continues after the rows
+    already yielded.
+    """
+    rows_yielded = 0
+    try:
+        with pd.read_csv(path, chunksize=chunksize, usecols=_usecols(columns),
+                         dtype=schema_dtypes(columns, dtype_overrides), **SOURCE_READ_OPTIONS) as reader:
+            while True:
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore', RuntimeWarning)
+                    chunk = next(reader, None)
+                if chunk is None:
+                    return
+                rows_yielded += len(chunk)
+                yield chunk
+    except SCHEMA_ERRORS as e:
+        print(f"Source does not match the declared schema ({e}); continuing after row "
+              f"{rows_yielded:,} with an inferred read.")
+
+    rows_to_skip = rows_yielded
+    with pd.read_csv(path, chunksize=chunksize, usecols=_usecols(columns), dtype=dtype_overrides,
+                     **LOOSE_READ_OPTIONS) as reader:
+        for chunk in reader:
+            if rows_to_skip:
+                skipped = min(rows_to_skip, len(chunk))
+                rows_to_skip -= skipped
+                chunk = chunk.iloc[skipped:]
+                if chunk.empty:
+                    continue
+            yield chunk
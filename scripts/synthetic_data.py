@@ -0,0 +1,105 @@
+"""
+Synthetic generator for data shaped like "US Airline Flight Routes and Fares 1993-2024.csv".
+
+Used by the benchmark scripts to exercise the ETL at sizes well beyond the sample
+data in archive/. Values are random but follow the structure of the real source:
+a fixed set of cities and airports, routes between airport pairs, one row per
+route/quarter observation with a legacy and a low-cost carrier.
+"""
+
+import argparse
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+SOURCE_COLUMNS = [
+    'tbl', 'Year', 'quarter', 'citymarketid_1', 'citymarketid_2', 'city1', 'city2',
+    'airportid_1', 'airportid_2', 'airport_1', 'airport_2', 'nsmiles', 'passengers',
+    'fare', 'carrier_lg', 'large_ms', 'fare_lg', 'carrier_low', 'lf_ms', 'fare_low',
+    'Geocoded_City1', 'Geocoded_City2', 'tbl1apk'
+]
+
+CARRIER_CODES = ['AA', 'AS', 'B6', 'DL', 'F9', 'G4', 'NK', 'UA', 'WN', 'US', 'CO', 'NW',
+                 'FL', 'HP', 'TW', 'SY', 'VX']
+STATE_CODES = ['NY', 'CA', 'TX', 'FL', 'IL', 'GA', 'MA', 'WA', 'CO', 'AZ', 'PA', 'OH',
+               'MI', 'NC', 'NV', 'MN', 'MO', 'TN', 'OR', 'UT']
+
+
+def generate_source_frame(n_rows: int, n_airports: int = 150, n_routes: int = 2000,
+                          seed: int = 42, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Return n_rows synthetic source records, optionally restricted to `columns`."""
+    rng = np.random.default_rng(seed)
+    columns = columns or SOURCE_COLUMNS
+
+    n_cities = max(2, int(n_airports * 0.8))
+    city_ids = 30000 + np.arange(n_cities) * 7
+    city_names = np.array([
+        f"City{i:03d}, {STATE_CODES[i % len(STATE_CODES)]}" + (" (Metropolitan Area)" if i % 5 == 0 else "")
+        for i in range(n_cities)
+    ], dtype=object)
+    airport_ids = 10000 + np.arange(n_airports) * 13
+    airport_city = rng.integers(0, n_cities, n_airports)
+    letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    airport_codes = np.array([
+        letters[(i // 676) % 26] + letters[(i // 26) % 26] + letters[i % 26] for i in range(n_airports)
+    ], dtype=object)
+
+    # Routes are directed airport pairs with a fixed pair of geocoded values each
+    route_origin = rng.integers(0, n_airports, n_routes)
+    route_destination = (route_origin + rng.integers(1, n_airports, n_routes)) % n_airports
+    route_geo_1 = rng.uniform(-120, 3500, n_routes).round(2)
+    route_geo_2 = rng.uniform(-120, 3500, n_routes).round(2)
+
+    route = rng.integers(0, n_routes, n_rows)
+    origin = route_origin[route]
+    destination = route_destination[route]
+    carriers = np.array(CARRIER_CODES, dtype=object)
+
+    generators = {
+        'tbl': lambda: np.full(n_rows, 'Table1a', dtype=object),
+        'Year': lambda: rng.integers(1993, 2025, n_rows),
+        'quarter': lambda: rng.integers(1, 5, n_rows),
+        'citymarketid_1': lambda: city_ids[airport_city[origin]],
+        'citymarketid_2': lambda: city_ids[airport_city[destination]],
+        'city1': lambda: city_names[airport_city[origin]],
+        'city2': lambda: city_names[airport_city[destination]],
+        'airportid_1': lambda: airport_ids[origin],
+        'airportid_2': lambda: airport_ids[destination],
+        'airport_1': lambda: airport_codes[origin],
+        'airport_2': lambda: airport_codes[destination],
+        'nsmiles': lambda: rng.integers(100, 2800, n_rows),
+        'passengers': lambda: rng.integers(0, 10000, n_rows),
+        'fare': lambda: np.where(rng.random(n_rows) < 0.01, np.nan, rng.uniform(50, 700, n_rows).round(2)),
+        'carrier_lg': lambda: carriers[rng.integers(0, len(carriers), n_rows)],
+        'large_ms': lambda: rng.uniform(0, 1, n_rows).round(4),
+        'fare_lg': lambda: rng.uniform(50, 700, n_rows).round(2),
+        'carrier_low': lambda: np.where(rng.random(n_rows) < 0.05, None,
+                                        carriers[rng.integers(0, len(carriers), n_rows)]),
+        'lf_ms': lambda: rng.uniform(0, 1, n_rows).round(4),
+        'fare_low': lambda: rng.uniform(50, 700, n_rows).round(2),
+        'Geocoded_City1': lambda: route_geo_1[route],
+        'Geocoded_City2': lambda: route_geo_2[route],
+        # Unique record key: row number prefixed by the route endpoints
+        'tbl1apk': lambda: (pd.Series(airport_ids[origin]).astype(str) + pd.Series(airport_ids[destination]).astype(str)
+                            + pd.Series(np.arange(n_rows)).astype(str)).to_numpy(dtype=object),
+    }
+    return pd.DataFrame({col: generators[col]() for col in columns})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic source CSV for benchmarking.")
+    parser.add_argument('output', help="Path of the CSV file to write")
+    parser.add_argument('--rows', type=int, default=100000, help="Number of records (default: 100000)")
+    parser.add_argument('--airports', type=int, default=150, help="Number of distinct airports (default: 150)")
+    parser.add_argument('--routes', type=int, default=2000, help="Number of distinct routes (default: 2000)")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    df = generate_source_frame(args.rows, n_airports=args.airports, n_routes=args.routes, seed=args.seed)
+    df.to_csv(args.output, index=False)
+    print(f"Wrote {len(df):,} synthetic records to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,6 @@ Proyecto de Base de Datos II - UPTC 2025-I
 import os
 import sys
 import subprocess
-import psycopg2
 from pathlib import Path
 
 # Configuración del proyecto
@@ -151,20 +150,15 @@ def test_database_connection():
         sys.path.append('.')
         import config
         
-        conn = psycopg2.connect(
-            host=config.DB_HOST,
-            database=config.DB_NAME,
-            user=config.DB_USER,
-            password=config.DB_PASS,
-            port=config.DB_PORT
-        )
+        # Misma conexión que usan los scripts (lee config.py)
+        sys.path.append('scripts')
+        from db_connection import connection
         
-        cursor = conn.cursor()
-        cursor.execute("SELECT version();")
-        version = cursor.fetchone()[0]
-        
-        cursor.close()
-        conn.close()
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT version();")
+            version = cursor.fetchone()[0]
+            cursor.close()
         
         print(f"✅ Conexión exitosa")
         print(f"   Servidor: {version.split(',')[0]}")
@@ -0,0 +1,102 @@
+"""
+Recorrido de un CSV grande repartido entre varios procesos.
+
+El cuerpo del archivo (sin la cabecera) se divide en rangos de bytes que empiezan y
+terminan en un salto de línea. Cada rango se procesa en un proceso: una función de la
+herramienta recibe un csv.reader sobre sus filas y devuelve un resultado parcial
+(conjuntos, contadores, un fragmento del archivo de salida...). Los resultados se
+entregan en el orden del archivo, de modo que la herramienta los combina o concatena
+y obtiene lo mismo que con un solo csv.reader sobre todo el archivo.
+
+Los rangos se leen como el archivo completo (texto UTF-8 con saltos de línea
+universales). Se asume que ningún campo entre comillas contiene saltos de línea, como
+en los CSV del proyecto.
+
+Uso:
+    header = read_header(ruta, delimiter=';')
+    for parcial in scan_shards(ruta, contar_filas, args=(columnas,), delimiter=';'):
+        ...
+
+El número de procesos se toma de SCAN_WORKERS (por defecto, los núcleos disponibles).
+"""
+
+import collections
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+DEFAULT_WORKERS = int(os.getenv('SCAN_WORKERS', os.cpu_count() or 1))
+# Tamaño máximo de un rango; un archivo grande tiene más rangos que procesos
+SHARD_BYTES = 32 * 1024 * 1024
+# Por debajo de este tamaño el archivo se recorre en el proceso actual
+MIN_PARALLEL_BYTES = 4 * 1024 * 1024
+# Rangos en curso por proceso; acota los resultados parciales que esperan en memoria
+SHARDS_IN_FLIGHT_PER_WORKER = 2
+
+class _ByteRange(io.RawIOBase):
+    """Lectura de un archivo binario sin buffer que termina en el byte end"""
+
+    def __init__(self, file, end):
+        self._file = file
+        self._end = end
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        remaining = self._end - self._file.tell()
+        if remaining <= 0:
+            return 0
+        return self._file.readinto(memoryview(buffer)[:remaining])
+
+def read_header(csv_file_path, delimiter=','):
+    """Cabecera del CSV como lista de columnas"""
+    with open(csv_file_path, 'r', encoding='utf-8') as file:
+        return next(csv.reader(file, delimiter=delimiter))
+
+def plan_shards(csv_file_path, shards):
+    """Hasta shards rangos (inicio, fin) de bytes que cubren el cuerpo del archivo, alineados a líneas"""
+    size = os.path.getsize(csv_file_path)
+    with open(csv_file_path, 'rb') as file:
+        file.readline()  # Cabecera
+        body_start = file.tell()
+        bounds = [body_start]
+        for shard in range(1, shards):
+            target = body_start + (size - body_start) * shard // shards
+            # La línea que contiene el byte target - 1 termina en el siguiente límite
+            file.seek(max(target - 1, bounds[-1]))
+            file.readline()
+            if bounds[-1] < file.tell() < size:
+                bounds.append(file.tell())
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+def _scan_range(csv_file_path, start, end, delimiter, process_rows, args):
+    with open(csv_file_path, 'rb', buffering=0) as raw:
+        raw.seek(start)
+        text = io.TextIOWrapper(io.BufferedReader(_ByteRange(raw, end)), encoding='utf-8')
+        return process_rows(csv.reader(text, delimiter=delimiter), *args)
+
+def scan_shards(csv_file_path, process_rows, args=(), delimiter=',', workers=None):
+    """
+    Generador con process_rows(filas, *args) de cada rango del cuerpo del archivo, en el
+    orden del archivo. process_rows y args deben poder enviarse a otro proceso (funciones
+    de nivel de módulo y datos simples).
+    """
+    workers = workers or DEFAULT_WORKERS
+    size = os.path.getsize(csv_file_path)
+    if workers == 1 or size < MIN_PARALLEL_BYTES:
+        for start, end in plan_shards(csv_file_path, 1):
+            yield _scan_range(csv_file_path, start, end, delimiter, process_rows, args)
+        return
+
+    ranges = plan_shards(csv_file_path, max(workers, -(-size // SHARD_BYTES)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = collections.deque()
+        for start, end in ranges:
+            pending.append(pool.submit(_scan_range, csv_file_path, start, end, delimiter, process_rows, args))
+            if len(pending) >= workers * SHARDS_IN_FLIGHT_PER_WORKER:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
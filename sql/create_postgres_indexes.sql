@@ -0,0 +1,16 @@
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_flights_route_year_quarter ON flights (route_id, year, quarter);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_flights_year_quarter ON flights (year, quarter);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_market_share_carrier ON market_share (carrier_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_airports_code ON airports (airport_code);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_airports_city_market ON airports (city_market_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_routes_destination ON routes (destination_airport_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_cities_name ON cities (city_name);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_route_quarter_carrier_stats_carrier ON route_quarter_carrier_stats (carrier_id, year);
+
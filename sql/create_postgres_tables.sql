@@ -1,3 +1,9 @@
+DROP TABLE IF EXISTS etl_watermarks CASCADE;
+
+DROP TABLE IF EXISTS route_quarter_carrier_stats CASCADE;
+
+DROP TABLE IF EXISTS route_quarter_stats CASCADE;
+
 DROP TABLE IF EXISTS market_share CASCADE;
 
 DROP TABLE IF EXISTS flights CASCADE;
@@ -20,7 +26,7 @@ DROP TABLE IF EXISTS cities CASCADE;
 
 
             CREATE TABLE airports (
-                airport_id VARCHAR(255) PRIMARY KEY, 
+                airport_id INTEGER PRIMARY KEY, -- BTS airport ID
                 airport_code VARCHAR(10) NOT NULL,    
                 city_market_id INTEGER,
                 FOREIGN KEY (city_market_id) REFERENCES cities(city_market_id) ON DELETE SET NULL
@@ -36,8 +42,8 @@ DROP TABLE IF EXISTS cities CASCADE;
 
             CREATE TABLE routes (
                 route_id INTEGER PRIMARY KEY,
-                origin_airport_id VARCHAR(255) NOT NULL, 
-                destination_airport_id VARCHAR(255) NOT NULL, 
+                origin_airport_id INTEGER NOT NULL, 
+                destination_airport_id INTEGER NOT NULL, 
                 distance_miles DECIMAL(10,2), -- Will be NULL due to source data
                 FOREIGN KEY (origin_airport_id) REFERENCES airports(airport_id) ON DELETE CASCADE,
                 FOREIGN KEY (destination_airport_id) REFERENCES airports(airport_id) ON DELETE CASCADE,
@@ -45,27 +51,94 @@ DROP TABLE IF EXISTS cities CASCADE;
             );
 
 
+            CREATE OR REPLACE VIEW route_endpoints AS
+                SELECT airport_id, route_id, endpoint
+                FROM (
+                    SELECT origin_airport_id AS airport_id, route_id, 'ORIGIN' AS endpoint,
+                           destination_airport_id AS other_airport_id
+                    FROM routes
+                    UNION ALL
+                    SELECT destination_airport_id, route_id, 'DESTINATION', origin_airport_id
+                    FROM routes
+                ) e
+                WHERE NOT (endpoint = 'DESTINATION' AND other_airport_id = airport_id);
+
+
             CREATE TABLE flights (
-                flight_id INTEGER PRIMARY KEY,
+                flight_id INTEGER NOT NULL,
                 route_id INTEGER NOT NULL,
                 year INTEGER NOT NULL,
                 quarter INTEGER NOT NULL CHECK (quarter BETWEEN 1 AND 4),
-                passengers VARCHAR(255), -- Changed from INTEGER to VARCHAR to hold raw codes
+                passengers INTEGER,
                 fare DECIMAL(10,2),
                 source_record_id VARCHAR(100), 
+                PRIMARY KEY (flight_id),
                 FOREIGN KEY (route_id) REFERENCES routes(route_id) ON DELETE CASCADE
             );
 
 
             CREATE TABLE market_share (
-                market_share_id SERIAL PRIMARY KEY, 
+                market_share_id SERIAL, 
                 flight_id INTEGER NOT NULL,
                 carrier_id INTEGER NOT NULL,
                 market_share_type VARCHAR(10) NOT NULL, 
                 market_share_percentage DECIMAL(10,2),
                 fare_avg DECIMAL(10,2),
+                PRIMARY KEY (market_share_id),
                 FOREIGN KEY (flight_id) REFERENCES flights(flight_id) ON DELETE CASCADE,
                 FOREIGN KEY (carrier_id) REFERENCES carriers(carrier_id) ON DELETE CASCADE,
                 UNIQUE (flight_id, carrier_id, market_share_type) 
             );
 
+
+            CREATE TABLE route_quarter_stats (
+                route_id INTEGER NOT NULL,
+                year INTEGER NOT NULL,
+                quarter INTEGER NOT NULL,
+                market_share_rows INTEGER NOT NULL,
+                flight_count INTEGER NOT NULL, -- flights with a known fare
+                fare_count INTEGER NOT NULL, -- fare measures cover the market share rows with a known fare
+                fare_sum NUMERIC,
+                fare_min DECIMAL(10,2),
+                fare_max DECIMAL(10,2),
+                fare_sumsq NUMERIC,
+                PRIMARY KEY (route_id, year, quarter),
+                FOREIGN KEY (route_id) REFERENCES routes(route_id) ON DELETE CASCADE
+            );
+
+
+            CREATE TABLE route_quarter_carrier_stats (
+                route_id INTEGER NOT NULL,
+                year INTEGER NOT NULL,
+                quarter INTEGER NOT NULL,
+                carrier_id INTEGER NOT NULL,
+                -- All measures cover the carrier's market share rows with a known fare
+                flight_count INTEGER NOT NULL,
+                type_flight_count INTEGER NOT NULL, -- each flight counted on one carrier per carrier_type, so it sums per type
+                fare_count INTEGER NOT NULL,
+                fare_sum NUMERIC,
+                fare_min DECIMAL(10,2),
+                fare_max DECIMAL(10,2),
+                fare_sumsq NUMERIC,
+                share_count INTEGER NOT NULL,
+                share_sum NUMERIC,
+                share_min DECIMAL(10,2),
+                share_max DECIMAL(10,2),
+                share_sumsq NUMERIC,
+                share_fare_sum NUMERIC, -- fare sum and flights of the rows with a known share
+                share_flight_count INTEGER NOT NULL,
+                PRIMARY KEY (route_id, year, quarter, carrier_id),
+                FOREIGN KEY (route_id) REFERENCES routes(route_id) ON DELETE CASCADE,
+                FOREIGN KEY (carrier_id) REFERENCES carriers(carrier_id) ON DELETE CASCADE
+            );
+
+
+            CREATE TABLE etl_watermarks (
+                year INTEGER NOT NULL,
+                quarter INTEGER NOT NULL,
+                row_count INTEGER NOT NULL,
+                content_hash CHAR(64) NOT NULL, -- SHA-256 of the slice's source rows
+                loaded_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (year, quarter)
+            );
+
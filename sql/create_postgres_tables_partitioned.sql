@@ -0,0 +1,273 @@
+DROP TABLE IF EXISTS etl_watermarks CASCADE;
+
+DROP TABLE IF EXISTS route_quarter_carrier_stats CASCADE;
+
+DROP TABLE IF EXISTS route_quarter_stats CASCADE;
+
+DROP TABLE IF EXISTS market_share CASCADE;
+
+DROP TABLE IF EXISTS flights CASCADE;
+
+DROP TABLE IF EXISTS routes CASCADE;
+
+DROP TABLE IF EXISTS carriers CASCADE;
+
+DROP TABLE IF EXISTS airports CASCADE;
+
+DROP TABLE IF EXISTS cities CASCADE;
+
+
+            CREATE TABLE cities (
+                city_market_id INTEGER PRIMARY KEY,
+                city_name VARCHAR(150) NOT NULL,
+                state VARCHAR(5),
+                full_city_name VARCHAR(255)
+            );
+
+
+            CREATE TABLE airports (
+                airport_id INTEGER PRIMARY KEY, -- BTS airport ID
+                airport_code VARCHAR(10) NOT NULL,    
+                city_market_id INTEGER,
+                FOREIGN KEY (city_market_id) REFERENCES cities(city_market_id) ON DELETE SET NULL
+            );
+
+
+            CREATE TABLE carriers (
+                carrier_id INTEGER PRIMARY KEY,
+                carrier_code VARCHAR(10) NOT NULL UNIQUE, 
+                carrier_type VARCHAR(10) NOT NULL CHECK (carrier_type IN ('Legacy', 'Low-Cost'))
+            );
+
+
+            CREATE TABLE routes (
+                route_id INTEGER PRIMARY KEY,
+                origin_airport_id INTEGER NOT NULL, 
+                destination_airport_id INTEGER NOT NULL, 
+                distance_miles DECIMAL(10,2), -- Will be NULL due to source data
+                FOREIGN KEY (origin_airport_id) REFERENCES airports(airport_id) ON DELETE CASCADE,
+                FOREIGN KEY (destination_airport_id) REFERENCES airports(airport_id) ON DELETE CASCADE,
+                UNIQUE(origin_airport_id, destination_airport_id)
+            );
+
+
+            CREATE OR REPLACE VIEW route_endpoints AS
+                SELECT airport_id, route_id, endpoint
+                FROM (
+                    SELECT origin_airport_id AS airport_id, route_id, 'ORIGIN' AS endpoint,
+                           destination_airport_id AS other_airport_id
+                    FROM routes
+                    UNION ALL
+                    SELECT destination_airport_id, route_id, 'DESTINATION', origin_airport_id
+                    FROM routes
+                ) e
+                WHERE NOT (endpoint = 'DESTINATION' AND other_airport_id = airport_id);
+
+
+            CREATE TABLE flights (
+                flight_id INTEGER NOT NULL,
+                route_id INTEGER NOT NULL,
+                year INTEGER NOT NULL,
+                quarter INTEGER NOT NULL CHECK (quarter BETWEEN 1 AND 4),
+                passengers INTEGER,
+                fare DECIMAL(10,2),
+                source_record_id VARCHAR(100), 
+                PRIMARY KEY (flight_id, year),
+                FOREIGN KEY (route_id) REFERENCES routes(route_id) ON DELETE CASCADE
+            ) PARTITION BY RANGE (year);
+
+
+            CREATE TABLE market_share (
+                market_share_id SERIAL, 
+                flight_id INTEGER NOT NULL,
+                year INTEGER NOT NULL,
+                carrier_id INTEGER NOT NULL,
+                market_share_type VARCHAR(10) NOT NULL, 
+                market_share_percentage DECIMAL(10,2),
+                fare_avg DECIMAL(10,2),
+                PRIMARY KEY (market_share_id, year),
+                FOREIGN KEY (flight_id, year) REFERENCES flights(flight_id, year) ON DELETE CASCADE,
+                FOREIGN KEY (carrier_id) REFERENCES carriers(carrier_id) ON DELETE CASCADE,
+                UNIQUE (flight_id, carrier_id, market_share_type, year) 
+            ) PARTITION BY RANGE (year);
+
+
+            CREATE TABLE route_quarter_stats (
+                route_id INTEGER NOT NULL,
+                year INTEGER NOT NULL,
+                quarter INTEGER NOT NULL,
+                market_share_rows INTEGER NOT NULL,
+                flight_count INTEGER NOT NULL, -- flights with a known fare
+                fare_count INTEGER NOT NULL, -- fare measures cover the market share rows with a known fare
+                fare_sum NUMERIC,
+                fare_min DECIMAL(10,2),
+                fare_max DECIMAL(10,2),
+                fare_sumsq NUMERIC,
+                PRIMARY KEY (route_id, year, quarter),
+                FOREIGN KEY (route_id) REFERENCES routes(route_id) ON DELETE CASCADE
+            );
+
+
+            CREATE TABLE route_quarter_carrier_stats (
+                route_id INTEGER NOT NULL,
+                year INTEGER NOT NULL,
+                quarter INTEGER NOT NULL,
+                carrier_id INTEGER NOT NULL,
+                -- All measures cover the carrier's market share rows with a known fare
+                flight_count INTEGER NOT NULL,
+                type_flight_count INTEGER NOT NULL, -- each flight counted on one carrier per carrier_type, so it sums per type
+                fare_count INTEGER NOT NULL,
+                fare_sum NUMERIC,
+                fare_min DECIMAL(10,2),
+                fare_max DECIMAL(10,2),
+                fare_sumsq NUMERIC,
+                share_count INTEGER NOT NULL,
+                share_sum NUMERIC,
+                share_min DECIMAL(10,2),
+                share_max DECIMAL(10,2),
+                share_sumsq NUMERIC,
+                share_fare_sum NUMERIC, -- fare sum and flights of the rows with a known share
+                share_flight_count INTEGER NOT NULL,
+                PRIMARY KEY (route_id, year, quarter, carrier_id),
+                FOREIGN KEY (route_id) REFERENCES routes(route_id) ON DELETE CASCADE,
+                FOREIGN KEY (carrier_id) REFERENCES carriers(carrier_id) ON DELETE CASCADE
+            );
+
+
+            CREATE TABLE etl_watermarks (
+                year INTEGER NOT NULL,
+                quarter INTEGER NOT NULL,
+                row_count INTEGER NOT NULL,
+                content_hash CHAR(64) NOT NULL, -- SHA-256 of the slice's source rows
+                loaded_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (year, quarter)
+            );
+
+CREATE TABLE flights_y1993 PARTITION OF flights FOR VALUES FROM (1993) TO (1994);
+
+CREATE TABLE market_share_y1993 PARTITION OF market_share FOR VALUES FROM (1993) TO (1994);
+
+CREATE TABLE flights_y1994 PARTITION OF flights FOR VALUES FROM (1994) TO (1995);
+
+CREATE TABLE market_share_y1994 PARTITION OF market_share FOR VALUES FROM (1994) TO (1995);
+
+CREATE TABLE flights_y1995 PARTITION OF flights FOR VALUES FROM (1995) TO (1996);
+
+CREATE TABLE market_share_y1995 PARTITION OF market_share FOR VALUES FROM (1995) TO (1996);
+
+CREATE TABLE flights_y1996 PARTITION OF flights FOR VALUES FROM (1996) TO (1997);
+
+CREATE TABLE market_share_y1996 PARTITION OF market_share FOR VALUES FROM (1996) TO (1997);
+
+CREATE TABLE flights_y1997 PARTITION OF flights FOR VALUES FROM (1997) TO (1998);
+
+CREATE TABLE market_share_y1997 PARTITION OF market_share FOR VALUES FROM (1997) TO (1998);
+
+CREATE TABLE flights_y1998 PARTITION OF flights FOR VALUES FROM (1998) TO (1999);
+
+CREATE TABLE market_share_y1998 PARTITION OF market_share FOR VALUES FROM (1998) TO (1999);
+
+CREATE TABLE flights_y1999 PARTITION OF flights FOR VALUES FROM (1999) TO (2000);
+
+CREATE TABLE market_share_y1999 PARTITION OF market_share FOR VALUES FROM (1999) TO (2000);
+
+CREATE TABLE flights_y2000 PARTITION OF flights FOR VALUES FROM (2000) TO (2001);
+
+CREATE TABLE market_share_y2000 PARTITION OF market_share FOR VALUES FROM (2000) TO (2001);
+
+CREATE TABLE flights_y2001 PARTITION OF flights FOR VALUES FROM (2001) TO (2002);
+
+CREATE TABLE market_share_y2001 PARTITION OF market_share FOR VALUES FROM (2001) TO (2002);
+
+CREATE TABLE flights_y2002 PARTITION OF flights FOR VALUES FROM (2002) TO (2003);
+
+CREATE TABLE market_share_y2002 PARTITION OF market_share FOR VALUES FROM (2002) TO (2003);
+
+CREATE TABLE flights_y2003 PARTITION OF flights FOR VALUES FROM (2003) TO (2004);
+
+CREATE TABLE market_share_y2003 PARTITION OF market_share FOR VALUES FROM (2003) TO (2004);
+
+CREATE TABLE flights_y2004 PARTITION OF flights FOR VALUES FROM (2004) TO (2005);
+
+CREATE TABLE market_share_y2004 PARTITION OF market_share FOR VALUES FROM (2004) TO (2005);
+
+CREATE TABLE flights_y2005 PARTITION OF flights FOR VALUES FROM (2005) TO (2006);
+
+CREATE TABLE market_share_y2005 PARTITION OF market_share FOR VALUES FROM (2005) TO (2006);
+
+CREATE TABLE flights_y2006 PARTITION OF flights FOR VALUES FROM (2006) TO (2007);
+
+CREATE TABLE market_share_y2006 PARTITION OF market_share FOR VALUES FROM (2006) TO (2007);
+
+CREATE TABLE flights_y2007 PARTITION OF flights FOR VALUES FROM (2007) TO (2008);
+
+CREATE TABLE market_share_y2007 PARTITION OF market_share FOR VALUES FROM (2007) TO (2008);
+
+CREATE TABLE flights_y2008 PARTITION OF flights FOR VALUES FROM (2008) TO (2009);
+
+CREATE TABLE market_share_y2008 PARTITION OF market_share FOR VALUES FROM (2008) TO (2009);
+
+CREATE TABLE flights_y2009 PARTITION OF flights FOR VALUES FROM (2009) TO (2010);
+
+CREATE TABLE market_share_y2009 PARTITION OF market_share FOR VALUES FROM (2009) TO (2010);
+
+CREATE TABLE flights_y2010 PARTITION OF flights FOR VALUES FROM (2010) TO (2011);
+
+CREATE TABLE market_share_y2010 PARTITION OF market_share FOR VALUES FROM (2010) TO (2011);
+
+CREATE TABLE flights_y2011 PARTITION OF flights FOR VALUES FROM (2011) TO (2012);
+
+CREATE TABLE market_share_y2011 PARTITION OF market_share FOR VALUES FROM (2011) TO (2012);
+
+CREATE TABLE flights_y2012 PARTITION OF flights FOR VALUES FROM (2012) TO (2013);
+
+CREATE TABLE market_share_y2012 PARTITION OF market_share FOR VALUES FROM (2012) TO (2013);
+
+CREATE TABLE flights_y2013 PARTITION OF flights FOR VALUES FROM (2013) TO (2014);
+
+CREATE TABLE market_share_y2013 PARTITION OF market_share FOR VALUES FROM (2013) TO (2014);
+
+CREATE TABLE flights_y2014 PARTITION OF flights FOR VALUES FROM (2014) TO (2015);
+
+CREATE TABLE market_share_y2014 PARTITION OF market_share FOR VALUES FROM (2014) TO (2015);
+
+CREATE TABLE flights_y2015 PARTITION OF flights FOR VALUES FROM (2015) TO (2016);
+
+CREATE TABLE market_share_y2015 PARTITION OF market_share FOR VALUES FROM (2015) TO (2016);
+
+CREATE TABLE flights_y2016 PARTITION OF flights FOR VALUES FROM (2016) TO (2017);
+
+CREATE TABLE market_share_y2016 PARTITION OF market_share FOR VALUES FROM (2016) TO (2017);
+
+CREATE TABLE flights_y2017 PARTITION OF flights FOR VALUES FROM (2017) TO (2018);
+
+CREATE TABLE market_share_y2017 PARTITION OF market_share FOR VALUES FROM (2017) TO (2018);
+
+CREATE TABLE flights_y2018 PARTITION OF flights FOR VALUES FROM (2018) TO (2019);
+
+CREATE TABLE market_share_y2018 PARTITION OF market_share FOR VALUES FROM (2018) TO (2019);
+
+CREATE TABLE flights_y2019 PARTITION OF flights FOR VALUES FROM (2019) TO (2020);
+
+CREATE TABLE market_share_y2019 PARTITION OF market_share FOR VALUES FROM (2019) TO (2020);
+
+CREATE TABLE flights_y2020 PARTITION OF flights FOR VALUES FROM (2020) TO (2021);
+
+CREATE TABLE market_share_y2020 PARTITION OF market_share FOR VALUES FROM (2020) TO (2021);
+
+CREATE TABLE flights_y2021 PARTITION OF flights FOR VALUES FROM (2021) TO (2022);
+
+CREATE TABLE market_share_y2021 PARTITION OF market_share FOR VALUES FROM (2021) TO (2022);
+
+CREATE TABLE flights_y2022 PARTITION OF flights FOR VALUES FROM (2022) TO (2023);
+
+CREATE TABLE market_share_y2022 PARTITION OF market_share FOR VALUES FROM (2022) TO (2023);
+
+CREATE TABLE flights_y2023 PARTITION OF flights FOR VALUES FROM (2023) TO (2024);
+
+CREATE TABLE market_share_y2023 PARTITION OF market_share FOR VALUES FROM (2023) TO (2024);
+
+CREATE TABLE flights_y2024 PARTITION OF flights FOR VALUES FROM (2024) TO (2025);
+
+CREATE TABLE market_share_y2024 PARTITION OF market_share FOR VALUES FROM (2024) TO (2025);
+
@@ -307,6 +307,67 @@ FROM calcular_indice_estacionalidad('New York City', 'Los Angeles', 2021)
 WHERE ABS(variacion_porcentual) > 5
 ORDER BY ABS(variacion_porcentual) DESC;
 
+-- ============================================================================
+-- FUNCIONES 7, 8 Y 9: VERSIONES POR LOTES
+-- Reciben arreglos y devuelven una fila por entrada, en el orden recibido
+-- ============================================================================
+
+-- Ejemplo 7.1: Tarifas promedio de varias rutas en una sola llamada
+SELECT * FROM calcular_tarifa_promedio_lote(
+    ARRAY['New York City', 'Boston', 'Chicago'],
+    ARRAY['Los Angeles', 'Atlanta', 'Miami']
+);
+
+-- Ejemplo 8.1: Participación de mercado de una aerolínea en los cuatro trimestres de 2021
+SELECT * FROM calcular_participacion_mercado_lote(
+    ARRAY['180', '180', '180', '180'],
+    ARRAY[2021, 2021, 2021, 2021],
+    ARRAY[1, 2, 3, 4]
+);
+
+-- Ejemplo 9.1: Aerolínea dominante en varias rutas (equivale al ejemplo 4.4 en una sola llamada)
+SELECT * FROM obtener_aerolinea_dominante_lote(
+    ARRAY['New York City', 'Boston'],
+    ARRAY['Los Angeles', 'Atlanta']
+);
+
+-- Ejemplo 9.2: Misma ruta en varios años (equivale al ejemplo 4.5)
+SELECT anio, codigo_aerolinea, tipo_aerolinea, participacion_maxima
+FROM obtener_aerolinea_dominante_lote(
+    ARRAY['New York City', 'New York City'],
+    ARRAY['Los Angeles', 'Los Angeles'],
+    ARRAY[2021, 2022]
+);
+
+-- ============================================================================
+-- FUNCIONES 10 Y 11: VERSIONES SIN BUCLES DE LAS FUNCIONES 3 Y 6
+-- Devuelven las mismas columnas y filas con una sola consulta
+-- ============================================================================
+
+-- Ejemplo 10.1: Evolución de una aerolínea en todo el dataset
+SELECT * FROM analizar_evolucion_aerolinea_agrupada('180', 1993, 2024);
+
+-- Ejemplo 10.2: Solo los años de crecimiento
+SELECT year_analizado, participacion_promedio, total_vuelos
+FROM analizar_evolucion_aerolinea_agrupada('180', 1993, 2024)
+WHERE tendencia = 'CRECIMIENTO';
+
+-- Ejemplo 11.1: Índice de estacionalidad en ruta principal
+SELECT * FROM calcular_indice_estacionalidad_agrupada('New York City', 'Los Angeles', 2021);
+
+-- ============================================================================
+-- FUNCIÓN 12: ANALIZAR_COMPETENCIA_AEROPUERTO_RANKING
+-- Todas las aerolíneas del aeropuerto ordenadas por participación (la 1 es la dominante de la función 5)
+-- ============================================================================
+
+-- Ejemplo 12.1: Ranking completo en aeropuerto principal
+SELECT * FROM analizar_competencia_aeropuerto_ranking('ATL', 2021);
+
+-- Ejemplo 12.2: Las tres aerolíneas con mayor participación
+SELECT posicion, codigo_aerolinea, participacion_promedio
+FROM analizar_competencia_aeropuerto_ranking('LAX', 2021)
+WHERE posicion <= 3;
+
 -- ============================================================================
 -- EJEMPLOS COMBINADOS - ANÁLISIS INTEGRAL
 -- ============================================================================
@@ -1,4 +1,5 @@
 -- Función 1 - Calcular promedio de tarifas por ruta
+-- Lee los agregados por ruta y trimestre de route_quarter_stats que mantiene el ETL
 CREATE OR REPLACE FUNCTION calcular_tarifa_promedio(
     v_origin_city VARCHAR(150),
     v_destination_city VARCHAR(150)
@@ -7,18 +8,16 @@ RETURNS NUMERIC AS $$
 DECLARE
     v_tarifa_promedio NUMERIC := 0;
 BEGIN
-    SELECT AVG(ms.fare_avg)
+    SELECT SUM(rq.fare_sum) / NULLIF(SUM(rq.fare_count), 0)
     INTO v_tarifa_promedio
     FROM routes r
-    JOIN flights f ON r.route_id = f.route_id
-    JOIN market_share ms ON f.flight_id = ms.flight_id
+    JOIN route_quarter_stats rq ON r.route_id = rq.route_id
     JOIN airports a1 ON r.origin_airport_id = a1.airport_id
     JOIN airports a2 ON r.destination_airport_id = a2.airport_id
     JOIN cities c1 ON a1.city_market_id = c1.city_market_id
     JOIN cities c2 ON a2.city_market_id = c2.city_market_id
     WHERE c1.city_name = v_origin_city 
-    AND c2.city_name = v_destination_city
-    AND ms.fare_avg IS NOT NULL;
+    AND c2.city_name = v_destination_city;
 
     -- Si no se encontraron datos, devolver 0
     IF v_tarifa_promedio IS NULL THEN
@@ -136,6 +135,7 @@ END;
 $$ LANGUAGE plpgsql;
 
 -- Función 4 - Obtener aerolínea dominante por ruta
+-- Lee route_quarter_carrier_stats; las columnas share_* cubren solo las filas con participación conocida
 CREATE OR REPLACE FUNCTION obtener_aerolinea_dominante(
     v_origin_city VARCHAR(150),
     v_destination_city VARCHAR(150),
@@ -153,29 +153,28 @@ BEGIN
     SELECT 
         c.carrier_code,
         c.carrier_type,
-        ROUND(AVG(ms.market_share_percentage), 2),
-        COUNT(DISTINCT f.flight_id),
-        ROUND(AVG(ms.fare_avg), 2)
+        ROUND(SUM(rqc.share_sum) / SUM(rqc.share_count), 2),
+        SUM(rqc.share_flight_count)::BIGINT,
+        ROUND(SUM(rqc.share_fare_sum) / SUM(rqc.share_count), 2)
     FROM routes r
-    JOIN flights f ON r.route_id = f.route_id
-    JOIN market_share ms ON f.flight_id = ms.flight_id
-    JOIN carriers c ON ms.carrier_id = c.carrier_id
+    JOIN route_quarter_carrier_stats rqc ON r.route_id = rqc.route_id
+    JOIN carriers c ON rqc.carrier_id = c.carrier_id
     JOIN airports a1 ON r.origin_airport_id = a1.airport_id
     JOIN airports a2 ON r.destination_airport_id = a2.airport_id
     JOIN cities c1 ON a1.city_market_id = c1.city_market_id
     JOIN cities c2 ON a2.city_market_id = c2.city_market_id
     WHERE c1.city_name = v_origin_city 
     AND c2.city_name = v_destination_city
-    AND ms.market_share_percentage IS NOT NULL
-    AND ms.fare_avg IS NOT NULL
-    AND (v_year IS NULL OR f.year = v_year)
+    AND rqc.share_count > 0
+    AND (v_year IS NULL OR rqc.year = v_year)
     GROUP BY c.carrier_code, c.carrier_type
-    ORDER BY AVG(ms.market_share_percentage) DESC
+    ORDER BY SUM(rqc.share_sum) / SUM(rqc.share_count) DESC, c.carrier_code
     LIMIT 1;
 END;
 $$ LANGUAGE plpgsql;
 
 -- Función 5 - Analizar competencia por aeropuerto (usa WHILE LOOP y manejo de cursores)
+-- Las rutas del aeropuerto se buscan en la vista route_endpoints (una fila por aeropuerto y ruta)
 CREATE OR REPLACE FUNCTION analizar_competencia_aeropuerto(
     v_airport_code VARCHAR(10),
     v_year_objetivo INTEGER
@@ -204,27 +203,27 @@ DECLARE
         FROM carriers c
         JOIN market_share ms ON c.carrier_id = ms.carrier_id
         JOIN flights f ON ms.flight_id = f.flight_id
-        JOIN routes r ON f.route_id = r.route_id
-        JOIN airports a ON (r.origin_airport_id = a.airport_id OR r.destination_airport_id = a.airport_id)
+        JOIN route_endpoints re ON f.route_id = re.route_id
+        JOIN airports a ON re.airport_id = a.airport_id
         WHERE a.airport_code = v_airport_code
         AND f.year = v_year_objetivo
         AND ms.market_share_percentage IS NOT NULL
         GROUP BY c.carrier_code
-        ORDER BY avg_share DESC;
+        ORDER BY avg_share DESC, c.carrier_code;
     
     carrier_rec RECORD;
 BEGIN
     -- Obtener estadísticas generales del aeropuerto
     SELECT 
         COUNT(DISTINCT c.carrier_code),
-        COUNT(DISTINCT r.route_id),
+        COUNT(DISTINCT re.route_id),
         AVG(ms.fare_avg)
     INTO v_total_carriers, v_total_rutas, v_tarifa_prom
     FROM carriers c
     JOIN market_share ms ON c.carrier_id = ms.carrier_id
     JOIN flights f ON ms.flight_id = f.flight_id
-    JOIN routes r ON f.route_id = r.route_id
-    JOIN airports a ON (r.origin_airport_id = a.airport_id OR r.destination_airport_id = a.airport_id)
+    JOIN route_endpoints re ON f.route_id = re.route_id
+    JOIN airports a ON re.airport_id = a.airport_id
     WHERE a.airport_code = v_airport_code
     AND f.year = v_year_objetivo
     AND ms.market_share_percentage IS NOT NULL;
@@ -274,6 +273,7 @@ END;
 $$ LANGUAGE plpgsql;
 
 -- Función 6 - Calcular índice de estacionalidad de precios (usa variables individuales en lugar de arrays)
+-- Lee los agregados por ruta y trimestre de route_quarter_stats que mantiene el ETL
 CREATE OR REPLACE FUNCTION calcular_indice_estacionalidad(
     v_origin_city VARCHAR(150),
     v_destination_city VARCHAR(150),
@@ -298,39 +298,35 @@ DECLARE
     v_variacion NUMERIC;
 BEGIN
     -- Calcular tarifa anual promedio
-    SELECT AVG(ms.fare_avg)
+    SELECT SUM(rq.fare_sum) / NULLIF(SUM(rq.fare_count), 0)
     INTO v_tarifa_anual
     FROM routes r
-    JOIN flights f ON r.route_id = f.route_id
-    JOIN market_share ms ON f.flight_id = ms.flight_id
+    JOIN route_quarter_stats rq ON r.route_id = rq.route_id
     JOIN airports a1 ON r.origin_airport_id = a1.airport_id
     JOIN airports a2 ON r.destination_airport_id = a2.airport_id
     JOIN cities c1 ON a1.city_market_id = c1.city_market_id
     JOIN cities c2 ON a2.city_market_id = c2.city_market_id
     WHERE c1.city_name = v_origin_city 
     AND c2.city_name = v_destination_city
-    AND f.year = v_year_base
-    AND ms.fare_avg IS NOT NULL;
+    AND rq.year = v_year_base;
 
     -- FOR LOOP para calcular por cada trimestre (1-4)
     FOR v_quarter IN 1..4 LOOP
         -- Obtener tarifa y volumen del trimestre
         SELECT 
-            AVG(ms.fare_avg),
-            COUNT(DISTINCT f.flight_id)
+            SUM(rq.fare_sum) / NULLIF(SUM(rq.fare_count), 0),
+            SUM(rq.flight_count)
         INTO v_tarifa_q, v_vuelos_q
         FROM routes r
-        JOIN flights f ON r.route_id = f.route_id
-        JOIN market_share ms ON f.flight_id = ms.flight_id
+        JOIN route_quarter_stats rq ON r.route_id = rq.route_id
         JOIN airports a1 ON r.origin_airport_id = a1.airport_id
         JOIN airports a2 ON r.destination_airport_id = a2.airport_id
         JOIN cities c1 ON a1.city_market_id = c1.city_market_id
         JOIN cities c2 ON a2.city_market_id = c2.city_market_id
         WHERE c1.city_name = v_origin_city 
         AND c2.city_name = v_destination_city
-        AND f.year = v_year_base
-        AND f.quarter = v_quarter
-        AND ms.fare_avg IS NOT NULL;
+        AND rq.year = v_year_base
+        AND rq.quarter = v_quarter;
 
         -- Calcular índice estacional (tarifa_trimestre / tarifa_anual)
         IF v_tarifa_anual > 0 AND v_tarifa_q IS NOT NULL THEN
@@ -369,6 +365,375 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- Función 7 - Calcular promedio de tarifas para un lote de rutas
+-- Versión por lotes de la función 1: recibe arreglos paralelos de origen y destino y devuelve una
+-- fila por par, en el orden recibido, calculadas todas en una sola consulta
+CREATE OR REPLACE FUNCTION calcular_tarifa_promedio_lote(
+    v_origin_cities VARCHAR(150)[],
+    v_destination_cities VARCHAR(150)[]
+)
+RETURNS TABLE (
+    posicion INTEGER,
+    ciudad_origen VARCHAR(150),
+    ciudad_destino VARCHAR(150),
+    tarifa_promedio NUMERIC
+) AS $$
+BEGIN
+    IF cardinality(v_origin_cities) IS DISTINCT FROM cardinality(v_destination_cities) THEN
+        RAISE EXCEPTION 'Los arreglos de origen y destino deben tener la misma longitud';
+    END IF;
+
+    RETURN QUERY
+    WITH pares AS (
+        SELECT p.origen, p.destino, p.orden
+        FROM unnest(v_origin_cities, v_destination_cities) WITH ORDINALITY AS p(origen, destino, orden)
+    ),
+    tarifas AS (
+        SELECT 
+            d.origen,
+            d.destino,
+            SUM(rq.fare_sum) / NULLIF(SUM(rq.fare_count), 0) tarifa
+        FROM (SELECT DISTINCT pr.origen, pr.destino FROM pares pr) d
+        JOIN cities c1 ON c1.city_name = d.origen
+        JOIN cities c2 ON c2.city_name = d.destino
+        JOIN airports a1 ON a1.city_market_id = c1.city_market_id
+        JOIN airports a2 ON a2.city_market_id = c2.city_market_id
+        JOIN routes r ON r.origin_airport_id = a1.airport_id AND r.destination_airport_id = a2.airport_id
+        JOIN route_quarter_stats rq ON rq.route_id = r.route_id
+        GROUP BY d.origen, d.destino
+    )
+    SELECT 
+        pr.orden::INTEGER,
+        pr.origen,
+        pr.destino,
+        COALESCE(t.tarifa, 0) -- Sin datos, igual que la función 1
+    FROM pares pr
+    LEFT JOIN tarifas t ON t.origen = pr.origen AND t.destino = pr.destino
+    ORDER BY pr.orden;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Función 8 - Calcular participación de mercado para un lote de consultas
+-- Versión por lotes de la función 2: una fila por cada (aerolínea, año, trimestre) recibido
+CREATE OR REPLACE FUNCTION calcular_participacion_mercado_lote(
+    v_carrier_codes VARCHAR(10)[],
+    v_years INTEGER[],
+    v_quarters INTEGER[]
+)
+RETURNS TABLE (
+    posicion INTEGER,
+    codigo_aerolinea VARCHAR(10),
+    anio INTEGER,
+    trimestre INTEGER,
+    participacion_mercado NUMERIC
+) AS $$
+BEGIN
+    IF cardinality(v_carrier_codes) IS DISTINCT FROM cardinality(v_years)
+       OR cardinality(v_carrier_codes) IS DISTINCT FROM cardinality(v_quarters) THEN
+        RAISE EXCEPTION 'Los arreglos de aerolíneas, años y trimestres deben tener la misma longitud';
+    END IF;
+
+    RETURN QUERY
+    WITH consultas AS (
+        SELECT q.codigo, q.y, q.q, q.orden
+        FROM unnest(v_carrier_codes, v_years, v_quarters) WITH ORDINALITY AS q(codigo, y, q, orden)
+    ),
+    participaciones AS (
+        SELECT 
+            d.codigo,
+            d.y,
+            d.q,
+            AVG(ms.market_share_percentage) participacion
+        FROM (SELECT DISTINCT cs.codigo, cs.y, cs.q FROM consultas cs) d
+        JOIN carriers c ON c.carrier_code = d.codigo
+        JOIN market_share ms ON ms.carrier_id = c.carrier_id
+        JOIN flights f ON f.flight_id = ms.flight_id AND f.year = d.y AND f.quarter = d.q
+        WHERE ms.market_share_percentage IS NOT NULL
+        GROUP BY d.codigo, d.y, d.q
+    )
+    SELECT 
+        cs.orden::INTEGER,
+        cs.codigo,
+        cs.y,
+        cs.q,
+        COALESCE(p.participacion, 0) -- Sin datos, igual que la función 2
+    FROM consultas cs
+    LEFT JOIN participaciones p ON p.codigo = cs.codigo AND p.y = cs.y AND p.q = cs.q
+    ORDER BY cs.orden;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Función 9 - Obtener aerolínea dominante para un lote de rutas
+-- Versión por lotes de la función 4: v_years es opcional (NULL o un elemento NULL = todos los años)
+-- y las rutas sin datos devuelven la fila con los campos de la aerolínea en NULL
+CREATE OR REPLACE FUNCTION obtener_aerolinea_dominante_lote(
+    v_origin_cities VARCHAR(150)[],
+    v_destination_cities VARCHAR(150)[],
+    v_years INTEGER[] DEFAULT NULL
+)
+RETURNS TABLE (
+    posicion INTEGER,
+    ciudad_origen VARCHAR(150),
+    ciudad_destino VARCHAR(150),
+    anio INTEGER,
+    codigo_aerolinea VARCHAR(10),
+    tipo_aerolinea VARCHAR(10),
+    participacion_maxima NUMERIC,
+    total_vuelos BIGINT,
+    tarifa_promedio NUMERIC
+) AS $$
+BEGIN
+    IF cardinality(v_origin_cities) IS DISTINCT FROM cardinality(v_destination_cities)
+       OR (v_years IS NOT NULL AND cardinality(v_years) IS DISTINCT FROM cardinality(v_origin_cities)) THEN
+        RAISE EXCEPTION 'Los arreglos de origen, destino y años deben tener la misma longitud';
+    END IF;
+
+    RETURN QUERY
+    WITH pares AS (
+        SELECT p.origen, p.destino, p.y, p.orden
+        FROM unnest(v_origin_cities, v_destination_cities, v_years) WITH ORDINALITY AS p(origen, destino, y, orden)
+    ),
+    dominantes AS (
+        -- DISTINCT ON se queda con la aerolínea de mayor participación promedio de cada par
+        SELECT DISTINCT ON (d.origen, d.destino, d.y)
+            d.origen,
+            d.destino,
+            d.y,
+            c.carrier_code,
+            c.carrier_type,
+            ROUND(SUM(rqc.share_sum) / SUM(rqc.share_count), 2) participacion,
+            SUM(rqc.share_flight_count)::BIGINT vuelos,
+            ROUND(SUM(rqc.share_fare_sum) / SUM(rqc.share_count), 2) tarifa
+        FROM (SELECT DISTINCT pr.origen, pr.destino, pr.y FROM pares pr) d
+        JOIN cities c1 ON c1.city_name = d.origen
+        JOIN cities c2 ON c2.city_name = d.destino
+        JOIN airports a1 ON a1.city_market_id = c1.city_market_id
+        JOIN airports a2 ON a2.city_market_id = c2.city_market_id
+        JOIN routes r ON r.origin_airport_id = a1.airport_id AND r.destination_airport_id = a2.airport_id
+        JOIN route_quarter_carrier_stats rqc ON rqc.route_id = r.route_id
+        JOIN carriers c ON c.carrier_id = rqc.carrier_id
+        WHERE rqc.share_count > 0
+        AND (d.y IS NULL OR rqc.year = d.y)
+        GROUP BY d.origen, d.destino, d.y, c.carrier_code, c.carrier_type
+        ORDER BY d.origen, d.destino, d.y, SUM(rqc.share_sum) / SUM(rqc.share_count) DESC, c.carrier_code
+    )
+    SELECT 
+        pr.orden::INTEGER,
+        pr.origen,
+        pr.destino,
+        pr.y,
+        dm.carrier_code,
+        dm.carrier_type,
+        dm.participacion,
+        dm.vuelos,
+        dm.tarifa
+    FROM pares pr
+    LEFT JOIN dominantes dm
+        ON dm.origen = pr.origen AND dm.destino = pr.destino AND dm.y IS NOT DISTINCT FROM pr.y
+    ORDER BY pr.orden;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Función 10 - Analizar evolución histórica de aerolínea sin bucles
+-- Mismas columnas que la función 3, calculadas en una sola consulta: generate_series recorre todos los
+-- años del rango y LAG toma la participación del año anterior para determinar la tendencia
+CREATE OR REPLACE FUNCTION analizar_evolucion_aerolinea_agrupada(
+    v_carrier_code VARCHAR(10),
+    v_year_inicio INTEGER,
+    v_year_fin INTEGER
+)
+RETURNS TABLE (
+    year_analizado INTEGER,
+    participacion_promedio NUMERIC,
+    total_vuelos BIGINT,
+    tarifa_promedio NUMERIC,
+    tendencia VARCHAR(20)
+) AS $$
+BEGIN
+    RETURN QUERY
+    WITH anual AS (
+        SELECT 
+            rqc.year,
+            SUM(rqc.share_sum) / SUM(rqc.share_count) participacion,
+            SUM(rqc.share_flight_count) vuelos,
+            SUM(rqc.share_fare_sum) / SUM(rqc.share_count) tarifa
+        FROM route_quarter_carrier_stats rqc
+        JOIN carriers c ON rqc.carrier_id = c.carrier_id
+        WHERE c.carrier_code = v_carrier_code
+        AND rqc.year BETWEEN v_year_inicio AND v_year_fin
+        AND rqc.share_count > 0
+        GROUP BY rqc.year
+    ),
+    serie AS (
+        -- Los años sin datos siguen en la serie para que LAG compare con el año calendario anterior
+        SELECT 
+            g.y,
+            a.participacion,
+            a.vuelos,
+            a.tarifa,
+            LAG(a.participacion) OVER (ORDER BY g.y) participacion_anterior
+        FROM generate_series(v_year_inicio, v_year_fin) AS g(y)
+        LEFT JOIN anual a ON a.year = g.y
+    )
+    SELECT 
+        s.y,
+        ROUND(COALESCE(s.participacion, 0), 2),
+        s.vuelos::BIGINT,
+        ROUND(COALESCE(s.tarifa, 0), 2),
+        (CASE 
+            WHEN s.y = v_year_inicio THEN 'INICIAL'
+            WHEN COALESCE(s.participacion, 0) > COALESCE(s.participacion_anterior, 0) THEN 'CRECIMIENTO'
+            WHEN COALESCE(s.participacion, 0) < COALESCE(s.participacion_anterior, 0) THEN 'DECLIVE'
+            ELSE 'ESTABLE'
+        END)::VARCHAR(20)
+    FROM serie s
+    WHERE COALESCE(s.vuelos, 0) > 0 -- Solo años con datos, como la función 3
+    ORDER BY s.y;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Función 11 - Calcular índice de estacionalidad de precios sin bucles
+-- Mismas columnas que la función 6: agrupa los cuatro trimestres en una sola consulta y obtiene la
+-- tarifa anual con una ventana sobre esos mismos trimestres
+CREATE OR REPLACE FUNCTION calcular_indice_estacionalidad_agrupada(
+    v_origin_city VARCHAR(150),
+    v_destination_city VARCHAR(150),
+    v_year_base INTEGER
+)
+RETURNS TABLE (
+    quarter_analizado INTEGER,
+    tarifa_quarter NUMERIC,
+    tarifa_anual_promedio NUMERIC,
+    indice_estacional NUMERIC,
+    interpretacion VARCHAR(30),
+    volumen_vuelos INTEGER,
+    variacion_porcentual NUMERIC
+) AS $$
+BEGIN
+    RETURN QUERY
+    WITH trimestres AS (
+        SELECT 
+            rq.quarter,
+            SUM(rq.fare_sum) fare_sum,
+            SUM(rq.fare_count) fare_count,
+            SUM(rq.flight_count) vuelos
+        FROM routes r
+        JOIN route_quarter_stats rq ON r.route_id = rq.route_id
+        JOIN airports a1 ON r.origin_airport_id = a1.airport_id
+        JOIN airports a2 ON r.destination_airport_id = a2.airport_id
+        JOIN cities c1 ON a1.city_market_id = c1.city_market_id
+        JOIN cities c2 ON a2.city_market_id = c2.city_market_id
+        WHERE c1.city_name = v_origin_city 
+        AND c2.city_name = v_destination_city
+        AND rq.year = v_year_base
+        GROUP BY rq.quarter
+    ),
+    tarifas AS (
+        SELECT 
+            g.q,
+            t.fare_sum / NULLIF(t.fare_count, 0) tarifa_q,
+            SUM(t.fare_sum) OVER () / NULLIF(SUM(t.fare_count) OVER (), 0) tarifa_anual,
+            t.vuelos
+        FROM generate_series(1, 4) AS g(q)
+        LEFT JOIN trimestres t ON t.quarter = g.q
+    ),
+    indices AS (
+        -- Índice estacional (tarifa_trimestre / tarifa_anual)
+        SELECT 
+            ta.*,
+            CASE WHEN ta.tarifa_anual > 0 AND ta.tarifa_q IS NOT NULL
+                 THEN ta.tarifa_q / ta.tarifa_anual ELSE 0 END indice,
+            CASE WHEN ta.tarifa_anual > 0 AND ta.tarifa_q IS NOT NULL
+                 THEN ((ta.tarifa_q - ta.tarifa_anual) / ta.tarifa_anual) * 100 ELSE 0 END variacion
+        FROM tarifas ta
+    )
+    SELECT 
+        i.q,
+        ROUND(COALESCE(i.tarifa_q, 0), 2),
+        ROUND(COALESCE(i.tarifa_anual, 0), 2),
+        ROUND(i.indice, 3),
+        (CASE 
+            WHEN i.indice = 0 THEN 'SIN DATOS'
+            WHEN i.indice >= 1.2 THEN 'MUY ALTA ESTACIONALIDAD'
+            WHEN i.indice >= 1.1 THEN 'ALTA ESTACIONALIDAD'
+            WHEN i.indice >= 1.05 THEN 'ESTACIONALIDAD MODERADA'
+            WHEN i.indice >= 0.95 THEN 'PRECIO NORMAL'
+            WHEN i.indice >= 0.8 THEN 'PRECIO BAJO'
+            ELSE 'PRECIO MUY BAJO'
+        END)::VARCHAR(30),
+        COALESCE(i.vuelos, 0)::INTEGER,
+        ROUND(i.variacion, 2)
+    FROM indices i
+    ORDER BY i.q;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Función 12 - Ranking de aerolíneas por aeropuerto
+-- Variante de la función 5 que devuelve todas las aerolíneas del aeropuerto ordenadas por participación
+-- (la posición 1 es la dominante que devuelve la función 5) junto con las estadísticas del aeropuerto,
+-- leyendo las filas una sola vez. Sin datos no devuelve filas.
+CREATE OR REPLACE FUNCTION analizar_competencia_aeropuerto_ranking(
+    v_airport_code VARCHAR(10),
+    v_year_objetivo INTEGER
+)
+RETURNS TABLE (
+    posicion INTEGER,
+    codigo_aerolinea VARCHAR(10),
+    participacion_promedio NUMERIC,
+    total_carriers INTEGER,
+    nivel_competencia VARCHAR(20),
+    total_rutas INTEGER,
+    tarifa_promedio_aeropuerto NUMERIC
+) AS $$
+BEGIN
+    RETURN QUERY
+    WITH filas AS (
+        SELECT 
+            c.carrier_code,
+            re.route_id,
+            ms.market_share_percentage,
+            ms.fare_avg
+        FROM airports a
+        JOIN route_endpoints re ON re.airport_id = a.airport_id
+        JOIN flights f ON f.route_id = re.route_id
+        JOIN market_share ms ON ms.flight_id = f.flight_id
+        JOIN carriers c ON c.carrier_id = ms.carrier_id
+        WHERE a.airport_code = v_airport_code
+        AND f.year = v_year_objetivo
+        AND ms.market_share_percentage IS NOT NULL
+    ),
+    aerolineas AS (
+        SELECT fl.carrier_code, AVG(fl.market_share_percentage) avg_share
+        FROM filas fl
+        GROUP BY fl.carrier_code
+    ),
+    resumen AS (
+        SELECT 
+            COUNT(DISTINCT fl.carrier_code) n_carriers,
+            COUNT(DISTINCT fl.route_id) n_rutas,
+            AVG(fl.fare_avg) tarifa
+        FROM filas fl
+    )
+    SELECT 
+        (ROW_NUMBER() OVER (ORDER BY ae.avg_share DESC, ae.carrier_code))::INTEGER,
+        ae.carrier_code,
+        ROUND(ae.avg_share, 2),
+        rs.n_carriers::INTEGER,
+        -- Mismos umbrales que la función 5, sobre la participación de la aerolínea dominante
+        (CASE 
+            WHEN MAX(ae.avg_share) OVER () > 60 THEN 'MONOPOLIO'
+            WHEN MAX(ae.avg_share) OVER () > 40 THEN 'DOMINANTE'
+            WHEN MAX(ae.avg_share) OVER () > 25 THEN 'COMPETITIVO'
+            ELSE 'FRAGMENTADO'
+        END)::VARCHAR(20),
+        rs.n_rutas::INTEGER,
+        ROUND(COALESCE(rs.tarifa, 0), 2)
+    FROM aerolineas ae
+    CROSS JOIN resumen rs
+    ORDER BY 1;
+END;
+$$ LANGUAGE plpgsql;
+
 -- ============================================================================
 -- EJEMPLOS DE USO
 -- ============================================================================
@@ -392,4 +757,24 @@ SELECT * FROM obtener_aerolinea_dominante('New York City', 'Los Angeles', 2021);
 SELECT * FROM analizar_competencia_aeropuerto('ATL', 2021);
 
 -- Ejemplo 7: USAR CASE AVANZADO - Calcular índice de estacionalidad
-SELECT * FROM calcular_indice_estacionalidad('New York City', 'Los Angeles', 2021); 
\ No newline at end of file
+SELECT * FROM calcular_indice_estacionalidad('New York City', 'Los Angeles', 2021); 
+
+-- Ejemplo 8: Tarifa promedio de varias rutas en una sola llamada
+SELECT * FROM calcular_tarifa_promedio_lote(
+    ARRAY['Boston', 'New York City'], ARRAY['New York City', 'Los Angeles']);
+
+-- Ejemplo 9: Participación de mercado de varias aerolíneas y trimestres en una sola llamada
+SELECT * FROM calcular_participacion_mercado_lote(ARRAY['180', 'WN'], ARRAY[2021, 2021], ARRAY[3, 4]);
+
+-- Ejemplo 10: Aerolínea dominante de varias rutas (el año es opcional por ruta)
+SELECT * FROM obtener_aerolinea_dominante_lote(
+    ARRAY['Boston', 'New York City'], ARRAY['Atlanta', 'Los Angeles'], ARRAY[NULL, 2021]);
+
+-- Ejemplo 11: Evolución de aerolínea sin bucles (mismo resultado que el ejemplo 3)
+SELECT * FROM analizar_evolucion_aerolinea_agrupada('180', 2020, 2023);
+
+-- Ejemplo 12: Índice de estacionalidad sin bucles (mismo resultado que el ejemplo 7)
+SELECT * FROM calcular_indice_estacionalidad_agrupada('New York City', 'Los Angeles', 2021);
+
+-- Ejemplo 13: Todas las aerolíneas de un aeropuerto ordenadas por participación
+SELECT * FROM analizar_competencia_aeropuerto_ranking('ATL', 2021);
@@ -1,19 +1,19 @@
 -- Consulta 1 - Análisis de rutas por distancia y promedio de tarifas por trimestre
+-- Lee route_quarter_stats (agregados por ruta y trimestre que mantiene el ETL)
 SELECT 
     CASE 
         WHEN r.distance_miles < 500 THEN 'Corta distancia (<500 millas)'
         WHEN r.distance_miles < 1000 THEN 'Media distancia (500-1000 millas)'
         ELSE 'Larga distancia (>1000 millas)'
     END categoria_distancia,
-    f.year,
-    f.quarter,
+    rq.year,
+    rq.quarter,
     COUNT(DISTINCT r.route_id) numero_rutas,
-    ROUND(AVG(ms.fare_avg), 2) tarifa_promedio,
-    ROUND(MAX(ms.fare_avg), 2) tarifa_maxima,
-    ROUND(MIN(ms.fare_avg), 2) tarifa_minima
-FROM routes r, flights f, market_share ms
-WHERE r.route_id = f.route_id
-AND f.flight_id = ms.flight_id
+    ROUND(SUM(rq.fare_sum) / NULLIF(SUM(rq.fare_count), 0), 2) tarifa_promedio,
+    ROUND(MAX(rq.fare_max), 2) tarifa_maxima,
+    ROUND(MIN(rq.fare_min), 2) tarifa_minima
+FROM routes r, route_quarter_stats rq
+WHERE r.route_id = rq.route_id
 AND r.distance_miles IS NOT NULL
 GROUP BY 
     CASE 
@@ -21,9 +21,9 @@ GROUP BY
         WHEN r.distance_miles < 1000 THEN 'Media distancia (500-1000 millas)'
         ELSE 'Larga distancia (>1000 millas)'
     END,
-    f.year,
-    f.quarter
-ORDER BY f.year, f.quarter, categoria_distancia;
+    rq.year,
+    rq.quarter
+ORDER BY rq.year, rq.quarter, categoria_distancia;
 
 -- Consulta 2 - Rutas con mayor competencia entre aerolíneas
 SELECT 
@@ -84,26 +84,26 @@ HAVING AVG(ms.market_share_percentage) >= 30
 ORDER BY f.year, participacion_promedio DESC;
 
 -- Consulta 5 - Rutas más caras por año y trimestre
+-- Una fila por ruta y trimestre con su tarifa más alta, leída de route_quarter_stats
 SELECT 
     c1.city_name origen,
     c2.city_name destino,
-    f.year,
-    f.quarter,
-    ROUND(ms.fare_avg, 2) tarifa,
+    rq.year,
+    rq.quarter,
+    ROUND(MAX(rq.fare_max), 2) tarifa,
     r.distance_miles distancia
-FROM flights f, market_share ms, routes r, airports a1, airports a2, cities c1, cities c2
-WHERE f.flight_id = ms.flight_id
-AND f.route_id = r.route_id
+FROM route_quarter_stats rq, routes r, airports a1, airports a2, cities c1, cities c2
+WHERE rq.route_id = r.route_id
 AND r.origin_airport_id = a1.airport_id
 AND r.destination_airport_id = a2.airport_id
 AND a1.city_market_id = c1.city_market_id
 AND a2.city_market_id = c2.city_market_id
-AND f.year >= 2020
-AND ms.fare_avg IS NOT NULL
+AND rq.year >= 2020
+AND rq.fare_max IS NOT NULL
 AND r.distance_miles IS NOT NULL
-GROUP BY c1.city_name, c2.city_name, f.year, f.quarter, ms.fare_avg, r.distance_miles
-HAVING ms.fare_avg >= 500  -- Tarifas altas
-ORDER BY f.year, f.quarter, ms.fare_avg DESC;
+GROUP BY c1.city_name, c2.city_name, rq.year, rq.quarter, r.distance_miles
+HAVING MAX(rq.fare_max) >= 500  -- Tarifas altas
+ORDER BY rq.year, rq.quarter, tarifa DESC;
 
 -- Consulta 6 - Aerolíneas de bajo costo con mayor participación por año
 SELECT 
@@ -124,58 +124,67 @@ AND AVG(ms.market_share_percentage) >= 20
 ORDER BY f.year, participacion_promedio DESC;
 
 -- Consulta 7 - Análisis de evolución de precios por estado y tipo de aerolínea
+-- Lee route_quarter_carrier_stats. Una ruta con origen y destino en el mismo estado pesa dos veces
+-- en tarifas y participación (extremos = 2), igual que el join con OR sobre los aeropuertos;
+-- type_flight_count cuenta cada vuelo una sola vez por tipo de aerolínea.
+WITH ruta_estado AS (
+    SELECT r.route_id, c.state, COUNT(*) extremos
+    FROM cities c, airports a, routes r
+    WHERE c.city_market_id = a.city_market_id
+    AND (a.airport_id = r.origin_airport_id OR a.airport_id = r.destination_airport_id)
+    AND c.state IS NOT NULL
+    GROUP BY r.route_id, c.state
+)
 SELECT 
-    c.state,
+    re.state,
     car.carrier_type,
-    f.year,
-    COUNT(DISTINCT f.flight_id) total_vuelos,
-    ROUND(AVG(ms.fare_avg), 2) tarifa_promedio,
-    ROUND(STDDEV(ms.fare_avg), 2) desviacion_tarifa,
-    ROUND(MIN(ms.fare_avg), 2) tarifa_minima,
-    ROUND(MAX(ms.fare_avg), 2) tarifa_maxima,
-    ROUND(AVG(ms.market_share_percentage), 2) participacion_promedio
-FROM cities c, airports a, routes r, flights f, market_share ms, carriers car
-WHERE c.city_market_id = a.city_market_id
-AND (a.airport_id = r.origin_airport_id OR a.airport_id = r.destination_airport_id)
-AND r.route_id = f.route_id
-AND f.flight_id = ms.flight_id
-AND ms.carrier_id = car.carrier_id
-AND c.state IS NOT NULL
-AND ms.fare_avg IS NOT NULL
-AND f.year >= 2015
-GROUP BY c.state, car.carrier_type, f.year
-HAVING COUNT(DISTINCT f.flight_id) >= 15
-AND AVG(ms.fare_avg) BETWEEN 100 AND 800
-ORDER BY c.state, car.carrier_type, f.year;
+    rqc.year,
+    SUM(rqc.type_flight_count) total_vuelos,
+    ROUND(SUM(rqc.fare_sum * re.extremos) / SUM(rqc.fare_count * re.extremos), 2) tarifa_promedio,
+    ROUND(SQRT((SUM(rqc.fare_sumsq * re.extremos)
+                - SUM(rqc.fare_sum * re.extremos) ^ 2 / SUM(rqc.fare_count * re.extremos))
+               / NULLIF(SUM(rqc.fare_count * re.extremos) - 1, 0)), 2) desviacion_tarifa,
+    ROUND(MIN(rqc.fare_min), 2) tarifa_minima,
+    ROUND(MAX(rqc.fare_max), 2) tarifa_maxima,
+    ROUND(SUM(rqc.share_sum * re.extremos) / NULLIF(SUM(rqc.share_count * re.extremos), 0), 2) participacion_promedio
+FROM ruta_estado re, route_quarter_carrier_stats rqc, carriers car
+WHERE re.route_id = rqc.route_id
+AND rqc.carrier_id = car.carrier_id
+AND rqc.year >= 2015
+GROUP BY re.state, car.carrier_type, rqc.year
+HAVING SUM(rqc.type_flight_count) >= 15
+AND SUM(rqc.fare_sum * re.extremos) / SUM(rqc.fare_count * re.extremos) BETWEEN 100 AND 800
+ORDER BY re.state, car.carrier_type, rqc.year;
 
 -- Consulta 8 - Rutas con mayor variabilidad de precios y competencia estacional
+-- Lee route_quarter_carrier_stats; la desviación se obtiene de las sumas y sumas de cuadrados
 SELECT 
     c1.city_name origen,
     c1.state estado_origen,
     c2.city_name destino,
     c2.state estado_destino,
-    f.year,
-    COUNT(DISTINCT f.quarter) trimestres_activos,
-    COUNT(DISTINCT ms.carrier_id) num_competidores,
-    ROUND(AVG(ms.fare_avg), 2) tarifa_promedio_anual,
-    ROUND(STDDEV(ms.fare_avg), 2) variabilidad_precios,
-    ROUND(MAX(ms.fare_avg) - MIN(ms.fare_avg), 2) rango_precios,
-    ROUND(AVG(r.distance_miles), 2) distancia_promedio
-FROM cities c1, cities c2, airports a1, airports a2, routes r, flights f, market_share ms
+    rqc.year,
+    COUNT(DISTINCT rqc.quarter) trimestres_activos,
+    COUNT(DISTINCT rqc.carrier_id) num_competidores,
+    ROUND(SUM(rqc.fare_sum) / SUM(rqc.fare_count), 2) tarifa_promedio_anual,
+    ROUND(SQRT((SUM(rqc.fare_sumsq) - SUM(rqc.fare_sum) ^ 2 / SUM(rqc.fare_count))
+               / NULLIF(SUM(rqc.fare_count) - 1, 0)), 2) variabilidad_precios,
+    ROUND(MAX(rqc.fare_max) - MIN(rqc.fare_min), 2) rango_precios,
+    ROUND(SUM(r.distance_miles * rqc.fare_count) / SUM(rqc.fare_count), 2) distancia_promedio
+FROM cities c1, cities c2, airports a1, airports a2, routes r, route_quarter_carrier_stats rqc
 WHERE c1.city_market_id = a1.city_market_id
 AND c2.city_market_id = a2.city_market_id
 AND a1.airport_id = r.origin_airport_id
 AND a2.airport_id = r.destination_airport_id
-AND r.route_id = f.route_id
-AND f.flight_id = ms.flight_id
-AND ms.fare_avg IS NOT NULL
+AND r.route_id = rqc.route_id
 AND r.distance_miles IS NOT NULL
-AND f.year >= 2018
-GROUP BY c1.city_name, c1.state, c2.city_name, c2.state, f.year
-HAVING COUNT(DISTINCT f.quarter) >= 3
-AND COUNT(DISTINCT ms.carrier_id) >= 2
-AND STDDEV(ms.fare_avg) > 50
-ORDER BY f.year, variabilidad_precios DESC, num_competidores DESC;
+AND rqc.year >= 2018
+GROUP BY c1.city_name, c1.state, c2.city_name, c2.state, rqc.year
+HAVING COUNT(DISTINCT rqc.quarter) >= 3
+AND COUNT(DISTINCT rqc.carrier_id) >= 2
+AND SQRT((SUM(rqc.fare_sumsq) - SUM(rqc.fare_sum) ^ 2 / SUM(rqc.fare_count))
+         / NULLIF(SUM(rqc.fare_count) - 1, 0)) > 50
+ORDER BY rqc.year, variabilidad_precios DESC, num_competidores DESC;
 
 -- Consulta 9 - Análisis de concentración de mercado por aeropuerto hub
 SELECT 
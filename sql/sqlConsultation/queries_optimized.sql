@@ -0,0 +1,94 @@
+-- Versiones optimizadas de consultas de queries.sql
+-- Cada consulta conserva el número y el resultado de la original; scripts/compare_queries.py ejecuta
+-- ambas versiones, verifica que devuelvan las mismas filas y guarda sus planes EXPLAIN ANALYZE.
+
+-- Consulta 3 - Aeropuertos con mayor número de conexiones y participación de aerolíneas legacy
+-- Las rutas de cada aeropuerto salen de la vista route_endpoints (una búsqueda por índice en cada
+-- extremo, sin el join con OR) y las tarifas se agregan antes por ruta y aerolínea
+WITH por_ruta AS (
+    SELECT
+        f.route_id,
+        ms.carrier_id,
+        SUM(ms.fare_avg) tarifa_suma,
+        COUNT(ms.fare_avg) tarifa_filas
+    FROM flights f, market_share ms
+    WHERE f.flight_id = ms.flight_id
+    GROUP BY f.route_id, ms.carrier_id
+)
+SELECT
+    a.airport_code,
+    c.city_name,
+    c.state,
+    COUNT(DISTINCT re.route_id) total_rutas,
+    COUNT(DISTINCT CASE WHEN car.carrier_type = 'Legacy' THEN pr.carrier_id END) carriers_legacy,
+    COUNT(DISTINCT CASE WHEN car.carrier_type = 'Low-Cost' THEN pr.carrier_id END) carriers_lowcost,
+    ROUND(SUM(pr.tarifa_suma) / NULLIF(SUM(pr.tarifa_filas), 0), 2) tarifa_promedio
+FROM airports a, cities c, route_endpoints re, por_ruta pr, carriers car
+WHERE a.city_market_id = c.city_market_id
+AND a.airport_id = re.airport_id
+AND re.route_id = pr.route_id
+AND pr.carrier_id = car.carrier_id
+GROUP BY a.airport_code, c.city_name, c.state
+HAVING COUNT(DISTINCT re.route_id) >= 5  -- Aeropuertos con al menos 5 rutas
+ORDER BY total_rutas DESC;
+
+-- Consulta 6 - Aerolíneas de bajo costo con mayor participación por año
+-- Lee route_quarter_carrier_stats: las columnas share_* cubren justo las filas con participación y
+-- tarifa conocidas, y cada vuelo pertenece a una sola ruta y trimestre, así que los vuelos se suman
+SELECT
+    car.carrier_code,
+    rqc.year,
+    SUM(rqc.share_flight_count) total_vuelos,
+    ROUND(SUM(rqc.share_sum) / SUM(rqc.share_count), 2) participacion_promedio,
+    ROUND(SUM(rqc.share_fare_sum) / SUM(rqc.share_count), 2) tarifa_promedio
+FROM carriers car, route_quarter_carrier_stats rqc
+WHERE car.carrier_id = rqc.carrier_id
+AND car.carrier_type = 'Low-Cost'
+AND rqc.share_count > 0
+GROUP BY car.carrier_code, rqc.year
+HAVING SUM(rqc.share_flight_count) >= 10
+AND SUM(rqc.share_sum) / SUM(rqc.share_count) >= 20
+ORDER BY rqc.year, participacion_promedio DESC;
+
+-- Consulta 9 - Análisis de concentración de mercado por aeropuerto hub
+-- La participación máxima de cada aeropuerto de origen y año se calcula una sola vez con una ventana
+-- MAX() OVER, en lugar de la subconsulta correlacionada que se evaluaba para cada fila
+WITH filas AS (
+    SELECT
+        a.airport_code,
+        c.city_name,
+        c.state,
+        f.year,
+        r.route_id,
+        ms.carrier_id,
+        ms.market_share_percentage,
+        MAX(ms.market_share_percentage) OVER (PARTITION BY a.airport_id, f.year) participacion_maxima_aeropuerto
+    FROM airports a, cities c, routes r, flights f, market_share ms
+    WHERE a.city_market_id = c.city_market_id
+    AND a.airport_id = r.origin_airport_id
+    AND r.route_id = f.route_id
+    AND f.flight_id = ms.flight_id
+)
+SELECT
+    fl.airport_code,
+    fl.city_name,
+    fl.state,
+    fl.year,
+    COUNT(DISTINCT fl.route_id) total_rutas,
+    COUNT(DISTINCT fl.carrier_id) total_carriers,
+    ROUND(AVG(fl.market_share_percentage), 2) participacion_promedio,
+    ROUND(MAX(fl.market_share_percentage), 2) participacion_maxima,
+    car_dominante.carrier_code carrier_dominante,
+    car_dominante.carrier_type tipo_dominante,
+    CASE
+        WHEN MAX(fl.market_share_percentage) > 50 THEN 'Monopolio'
+        WHEN MAX(fl.market_share_percentage) > 30 THEN 'Dominante'
+        ELSE 'Competitivo'
+    END nivel_concentracion
+FROM filas fl, carriers car_dominante
+WHERE fl.carrier_id = car_dominante.carrier_id
+AND fl.market_share_percentage = fl.participacion_maxima_aeropuerto
+GROUP BY fl.airport_code, fl.city_name, fl.state, fl.year,
+         car_dominante.carrier_code, car_dominante.carrier_type
+HAVING COUNT(DISTINCT fl.route_id) >= 8
+ORDER BY fl.year, nivel_concentracion, participacion_maxima DESC;
@@ -1,8 +1,24 @@
 import csv
-import re
+import io
 import sys
 import os
 
+from name_normalization import clean_city_name, strip_parenthetical
+from sharded_scan import read_header, scan_shards
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+except ImportError:  # Dependencia opcional; sin ella el archivo se recorre con csv.reader
+    pa = None
+
+# Tamaño de los bloques que lee pyarrow; cada bloque se convierte y se escribe de una vez
+ARROW_BLOCK_BYTES = 16 * 1024 * 1024
+# Caracteres por los que csv.writer (QUOTE_MINIMAL, delimitador ';') entrecomilla un campo
+ARROW_QUOTE_PATTERN = '[;"\r\n]'
+ARROW_QUOTE_BYTES = (b';', b'"', b'\r', b'\n')
+
 def load_airport_ids(airports_csv_path):
     """Carga el mapeo de códigos de aeropuertos a nombres desde el archivo airport.csv"""
     airport_mapping = {}
@@ -47,7 +63,7 @@ def load_city_ids(cities_csv_path):
                 city_mapping[city_name] = city_id
                 
                 # También mapear una versión limpia (sin paréntesis)
-                city_name_clean = re.sub(r'\s*\(.*?\)', '', city_name).strip()
+                city_name_clean = strip_parenthetical(city_name)
                 city_mapping[city_name_clean] = city_id
                 
                 # Si contiene "/", mapear cada parte individualmente
@@ -78,88 +94,162 @@ def load_city_ids(cities_csv_path):
         print(f"Error al cargar el archivo de ciudades: {str(e)}")
         sys.exit(1)
 
-def clean_city_name(city_name):
-    """Limpia el nombre de la ciudad eliminando texto entre paréntesis y estado"""
-    # Primero eliminar texto entre paréntesis
-    clean = re.sub(r'\s*\(.*?\)', '', city_name).strip()
-    
-    # Si tiene coma, tomar solo la parte antes de la coma (quitar el estado)
-    if ',' in clean:
-        clean = clean.split(',')[0].strip()
-    
-    return clean
+def convert_airline_rows(rows, carrier_lg_idx, carrier_low_idx, columns_to_keep, carrier_mapping):
+    """
+    Reemplaza los códigos de aerolíneas por sus IDs en un rango de filas (se ejecuta en un
+    proceso del recorrido). Devuelve el fragmento CSV de salida, las filas procesadas y las
+    aerolíneas no encontradas.
+    """
+    fragment = io.StringIO()
+    writer = csv.writer(fragment, delimiter=';')  # Mantener el mismo delimitador
+    not_found_carriers = set()
+    rows_processed = 0
+    for row in rows:
+        if not row:  # Saltar filas vacías
+            continue
+            
+        # Procesar aerolíneas
+        carrier_lg = row[carrier_lg_idx].strip()
+        carrier_low = row[carrier_low_idx].strip()
+        
+        carrier_lg_id = carrier_mapping.get(carrier_lg)
+        carrier_low_id = carrier_mapping.get(carrier_low)
+        
+        # Registrar aerolíneas no encontradas
+        if not carrier_lg_id and carrier_lg:
+            not_found_carriers.add(carrier_lg)
+        if not carrier_low_id and carrier_low:
+            not_found_carriers.add(carrier_low)
+        
+        # Crear nueva fila reemplazando los códigos de aerolíneas con IDs
+        new_row = []
+        for idx in columns_to_keep:
+            if idx == carrier_lg_idx:
+                new_row.append(carrier_lg_id if carrier_lg_id else 'NULL')
+            elif idx == carrier_low_idx:
+                new_row.append(carrier_low_id if carrier_low_id else 'NULL')
+            else:
+                new_row.append(row[idx])
+        
+        writer.writerow(new_row)
+        rows_processed += 1
+    return fragment.getvalue().encode('utf-8'), rows_processed, not_found_carriers
+
+def _arrow_carrier_ids(codes, carrier_mapping, not_found_carriers):
+    """
+    Columna de IDs de aerolíneas ('NULL' si no se encuentra) para una columna de códigos.
+    Los códigos se codifican como diccionario: el mapeo se aplica una vez por código
+    distinto y la columna se arma con take sobre los índices.
+    """
+    encoded = pc.dictionary_encode(codes)
+    ids = []
+    for code in encoded.dictionary.to_pylist():
+        code = code.strip()
+        carrier_id = carrier_mapping.get(code)
+        # Registrar aerolíneas no encontradas
+        if not carrier_id and code:
+            not_found_carriers.add(code)
+        ids.append(carrier_id if carrier_id else 'NULL')
+    return pc.take(pa.array(ids, pa.string()), encoded.indices)
+
+def _arrow_csv_field(column):
+    """Entrecomilla los valores de la columna como lo hace csv.writer"""
+    # Revisión rápida sobre el buffer de datos; casi ninguna columna necesita comillas
+    data = column.buffers()[2]
+    if data is None or not any(char in data.to_pybytes() for char in ARROW_QUOTE_BYTES):
+        return column
+    needs_quotes = pc.match_substring_regex(column, ARROW_QUOTE_PATTERN)
+    if not pc.any(needs_quotes).as_py():
+        return column
+    quoted = pc.binary_join_element_wise('"', pc.replace_substring(column, '"', '""'), '"', '')
+    return pc.if_else(needs_quotes, quoted, column)
+
+def convert_airline_batches(input_csv_path, header, carrier_lg_idx, carrier_low_idx, carrier_mapping):
+    """
+    Versión columnar de convert_airline_rows: lee el archivo en bloques de pyarrow y
+    devuelve, por bloque, las líneas de salida ya unidas (los mismos bytes que escribe
+    csv.writer), las filas procesadas y las aerolíneas no encontradas.
+    """
+    reader = pa_csv.open_csv(
+        input_csv_path,
+        read_options=pa_csv.ReadOptions(block_size=ARROW_BLOCK_BYTES),
+        parse_options=pa_csv.ParseOptions(delimiter=';'),
+        # Todas las columnas como texto, sin nulos: los valores se copian tal cual
+        convert_options=pa_csv.ConvertOptions(column_types={col: pa.string() for col in header},
+                                              strings_can_be_null=False,
+                                              quoted_strings_can_be_null=False))
+    for batch in reader:
+        if batch.num_rows == 0:
+            continue
+        not_found_carriers = set()
+        columns = []
+        for idx, column in enumerate(batch.columns):
+            if idx in (carrier_lg_idx, carrier_low_idx):
+                columns.append(_arrow_carrier_ids(column, carrier_mapping, not_found_carriers))
+            else:
+                columns.append(_arrow_csv_field(column))
 
-def process_airlines_data(input_csv_path, airport_mapping, carrier_mapping, city_mapping):
-    """Procesa el archivo de aerolíneas y crea una nueva versión con IDs de ciudades, aerolíneas y sin nombres de aeropuertos"""
+        # Cada fila termina en '\r\n', como con csv.writer; las líneas quedan contiguas en el buffer de datos
+        columns[-1] = pc.binary_join_element_wise(columns[-1], '\r\n', '')
+        lines = pc.binary_join_element_wise(*columns, ';')
+        offsets = memoryview(lines.buffers()[1]).cast('i')
+        start, end = offsets[lines.offset], offsets[lines.offset + len(lines)]
+        yield lines.buffers()[2][start:end], batch.num_rows, not_found_carriers
+
+def process_airlines_data(input_csv_path, airport_mapping, carrier_mapping, city_mapping, workers=None, use_arrow=None):
+    """
+    Procesa el archivo de aerolíneas y crea una nueva versión con IDs de ciudades, aerolíneas y sin nombres de aeropuertos.
+    Con pyarrow instalado el archivo se convierte por columnas (use_arrow=False fuerza el recorrido con csv.reader).
+    """
+    if use_arrow is None:
+        use_arrow = pa is not None
     output_csv_path = os.path.join('archive', 'US_Airlines_Final_Normalized.csv')
     not_found_cities = set()
     not_found_carriers = set()
     
     try:
-        # Leer el archivo de entrada y crear el archivo de salida
-        with open(input_csv_path, 'r', encoding='utf-8') as infile, \
-             open(output_csv_path, 'w', newline='', encoding='utf-8') as outfile:
-            
-            reader = csv.reader(infile, delimiter=';')  # El CSV usa ';' como delimitador
-            writer = csv.writer(outfile, delimiter=';')  # Mantener el mismo delimitador
-            
-            # Leer la cabecera
-            header = next(reader)
-            
-            # Índices para las columnas que necesitamos
-            city1_idx = header.index('city1_id')
-            city2_idx = header.index('city2_id')
-            carrier_lg_idx = header.index('carrier_lg')
-            carrier_low_idx = header.index('carrier_low')
-            
-            # Crear nueva cabecera reemplazando las columnas de aerolíneas
-            new_header = []
-            columns_to_keep = []
-            
-            for idx, col in enumerate(header):
-                new_header.append(col)
-                columns_to_keep.append(idx)
-                if col == 'carrier_lg':
-                    new_header[-1] = 'carrier_lg_id'  # Cambiar nombre a carrier_lg_id
-                elif col == 'carrier_low':
-                    new_header[-1] = 'carrier_low_id'  # Cambiar nombre a carrier_low_id
-            
-            writer.writerow(new_header)
+        # Leer la cabecera del archivo de entrada (el CSV usa ';' como delimitador)
+        header = read_header(input_csv_path, delimiter=';')
+        
+        # Índices para las columnas que necesitamos
+        city1_idx = header.index('city1_id')
+        city2_idx = header.index('city2_id')
+        carrier_lg_idx = header.index('carrier_lg')
+        carrier_low_idx = header.index('carrier_low')
+        
+        # Crear nueva cabecera reemplazando las columnas de aerolíneas
+        new_header = []
+        columns_to_keep = []
+        
+        for idx, col in enumerate(header):
+            new_header.append(col)
+            columns_to_keep.append(idx)
+            if col == 'carrier_lg':
+                new_header[-1] = 'carrier_lg_id'  # Cambiar nombre a carrier_lg_id
+            elif col == 'carrier_low':
+                new_header[-1] = 'carrier_low_id'  # Cambiar nombre a carrier_low_id
+        
+        header_line = io.StringIO()
+        csv.writer(header_line, delimiter=';').writerow(new_header)  # Mantener el mismo delimitador
+
+        if use_arrow:
+            # Bloques de pyarrow convertidos por columnas
+            fragments = convert_airline_batches(input_csv_path, header, carrier_lg_idx, carrier_low_idx,
+                                                carrier_mapping)
+        else:
+            # Procesar el archivo por rangos en paralelo; los fragmentos se escriben en el orden del archivo
+            args = (carrier_lg_idx, carrier_low_idx, columns_to_keep, carrier_mapping)
+            fragments = scan_shards(input_csv_path, convert_airline_rows, args, delimiter=';', workers=workers)
+
+        with open(output_csv_path, 'wb') as outfile:
+            outfile.write(header_line.getvalue().encode('utf-8'))
             
-            # Procesar cada fila
             rows_processed = 0
-            for row in reader:
-                if not row:  # Saltar filas vacías
-                    continue
-                    
-                # Procesar aerolíneas
-                carrier_lg = row[carrier_lg_idx].strip()
-                carrier_low = row[carrier_low_idx].strip()
-                
-                carrier_lg_id = carrier_mapping.get(carrier_lg)
-                carrier_low_id = carrier_mapping.get(carrier_low)
-                
-                # Registrar aerolíneas no encontradas
-                if not carrier_lg_id and carrier_lg:
-                    not_found_carriers.add(carrier_lg)
-                if not carrier_low_id and carrier_low:
-                    not_found_carriers.add(carrier_low)
-                
-                # Crear nueva fila reemplazando los códigos de aerolíneas con IDs
-                new_row = []
-                for idx in columns_to_keep:
-                    if idx == carrier_lg_idx:
-                        new_row.append(carrier_lg_id if carrier_lg_id else 'NULL')
-                    elif idx == carrier_low_idx:
-                        new_row.append(carrier_low_id if carrier_low_id else 'NULL')
-                    else:
-                        new_row.append(row[idx])
-                
-                writer.writerow(new_row)
-                
-                rows_processed += 1
-                if rows_processed % 10000 == 0:  # Mostrar progreso cada 10000 filas
-                    print(f"Procesadas {rows_processed} filas...")
+            for fragment, fragment_rows, fragment_not_found in fragments:
+                outfile.write(fragment)
+                not_found_carriers |= fragment_not_found
+                rows_processed += fragment_rows
+                print(f"Procesadas {rows_processed} filas...")
         
         # Mostrar resumen
         print(f"\nArchivo generado exitosamente: {output_csv_path}")
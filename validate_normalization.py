@@ -2,6 +2,8 @@ import csv
 import sys
 import os
 
+from sharded_scan import read_header, scan_shards
+
 def load_reference_tables():
     """Carga todas las tablas de referencia"""
     reference_data = {}
@@ -31,7 +33,60 @@ def load_reference_tables():
     
     return reference_data
 
-def validate_normalization():
+def validate_rows(rows, columns, ref_data):
+    """Errores de integridad referencial de un rango de filas (se ejecuta en un proceso del recorrido)"""
+    city1_idx, city2_idx, airportid1_idx, airportid2_idx, carrier_lg_idx, carrier_low_idx = columns
+    errors = {
+        'city_ids': set(),
+        'airport_ids': set(),
+        'carrier_ids': set(),
+        'missing_values': 0,
+        'total_rows': 0
+    }
+    
+    for row in rows:
+        if not row:
+            continue
+            
+        errors['total_rows'] += 1
+        
+        # Validar city_ids
+        city1_id = row[city1_idx].strip()
+        city2_id = row[city2_idx].strip()
+        
+        if city1_id and city1_id != 'NULL' and city1_id not in ref_data['cities']:
+            errors['city_ids'].add(city1_id)
+        if city2_id and city2_id != 'NULL' and city2_id not in ref_data['cities']:
+            errors['city_ids'].add(city2_id)
+            
+        # Validar airport_ids
+        airport1_id = row[airportid1_idx].strip()
+        airport2_id = row[airportid2_idx].strip()
+        
+        if airport1_id and airport1_id != 'NULL' and airport1_id not in ref_data['airports']:
+            errors['airport_ids'].add(airport1_id)
+        if airport2_id and airport2_id != 'NULL' and airport2_id not in ref_data['airports']:
+            errors['airport_ids'].add(airport2_id)
+            
+        # Validar carrier_ids
+        carrier_lg_id = row[carrier_lg_idx].strip()
+        carrier_low_id = row[carrier_low_idx].strip()
+        
+        if carrier_lg_id and carrier_lg_id != 'NULL' and carrier_lg_id not in ref_data['carriers']:
+            errors['carrier_ids'].add(carrier_lg_id)
+        if carrier_low_id and carrier_low_id != 'NULL' and carrier_low_id not in ref_data['carriers']:
+            errors['carrier_ids'].add(carrier_low_id)
+            
+        # Contar valores NULL/vacíos
+        if not city1_id or city1_id == 'NULL' or not city2_id or city2_id == 'NULL':
+            errors['missing_values'] += 1
+        if not airport1_id or airport1_id == 'NULL' or not airport2_id or airport2_id == 'NULL':
+            errors['missing_values'] += 1
+        if not carrier_lg_id or carrier_lg_id == 'NULL' or not carrier_low_id or carrier_low_id == 'NULL':
+            errors['missing_values'] += 1
+    return errors
+
+def validate_normalization(workers=None):
     """Valida la integridad referencial del archivo normalizado"""
     print("🔍 VALIDACIÓN DE NORMALIZACIÓN - US_Airlines_Final_Normalized.csv")
     print("=" * 70)
@@ -60,64 +115,25 @@ def validate_normalization():
     }
     
     try:
-        with open(normalized_file, 'r', encoding='utf-8') as file:
-            reader = csv.reader(file, delimiter=';')
-            header = next(reader)
-            
-            # Obtener índices de columnas
-            city1_idx = header.index('city1_id')
-            city2_idx = header.index('city2_id')
-            airportid1_idx = header.index('airportid_1')
-            airportid2_idx = header.index('airportid_2')
-            carrier_lg_idx = header.index('carrier_lg_id')
-            carrier_low_idx = header.index('carrier_low_id')
-            
-            print("🔍 Validando integridad referencial...")
-            
-            for row_num, row in enumerate(reader, 2):  # Start from row 2 (skip header)
-                if not row:
-                    continue
-                    
-                errors['total_rows'] += 1
-                
-                # Validar city_ids
-                city1_id = row[city1_idx].strip()
-                city2_id = row[city2_idx].strip()
-                
-                if city1_id and city1_id != 'NULL' and city1_id not in ref_data['cities']:
-                    errors['city_ids'].add(city1_id)
-                if city2_id and city2_id != 'NULL' and city2_id not in ref_data['cities']:
-                    errors['city_ids'].add(city2_id)
-                    
-                # Validar airport_ids
-                airport1_id = row[airportid1_idx].strip()
-                airport2_id = row[airportid2_idx].strip()
-                
-                if airport1_id and airport1_id != 'NULL' and airport1_id not in ref_data['airports']:
-                    errors['airport_ids'].add(airport1_id)
-                if airport2_id and airport2_id != 'NULL' and airport2_id not in ref_data['airports']:
-                    errors['airport_ids'].add(airport2_id)
-                    
-                # Validar carrier_ids
-                carrier_lg_id = row[carrier_lg_idx].strip()
-                carrier_low_id = row[carrier_low_idx].strip()
-                
-                if carrier_lg_id and carrier_lg_id != 'NULL' and carrier_lg_id not in ref_data['carriers']:
-                    errors['carrier_ids'].add(carrier_lg_id)
-                if carrier_low_id and carrier_low_id != 'NULL' and carrier_low_id not in ref_data['carriers']:
-                    errors['carrier_ids'].add(carrier_low_id)
-                    
-                # Contar valores NULL/vacíos
-                if not city1_id or city1_id == 'NULL' or not city2_id or city2_id == 'NULL':
-                    errors['missing_values'] += 1
-                if not airport1_id or airport1_id == 'NULL' or not airport2_id or airport2_id == 'NULL':
-                    errors['missing_values'] += 1
-                if not carrier_lg_id or carrier_lg_id == 'NULL' or not carrier_low_id or carrier_low_id == 'NULL':
-                    errors['missing_values'] += 1
-                    
-                # Mostrar progreso cada 1000 filas
-                if row_num % 1000 == 0:
-                    print(f"   Procesadas {row_num-1} filas...")
+        header = read_header(normalized_file, delimiter=';')
+        
+        # Obtener índices de columnas
+        columns = (
+            header.index('city1_id'), header.index('city2_id'),
+            header.index('airportid_1'), header.index('airportid_2'),
+            header.index('carrier_lg_id'), header.index('carrier_low_id'),
+        )
+        
+        print("🔍 Validando integridad referencial...")
+        
+        # Validar el archivo por rangos en paralelo y acumular los errores de cada rango
+        for partial in scan_shards(normalized_file, validate_rows, (columns, ref_data), delimiter=';',
+                                   workers=workers):
+            for key in ('city_ids', 'airport_ids', 'carrier_ids'):
+                errors[key] |= partial[key]
+            errors['missing_values'] += partial['missing_values']
+            errors['total_rows'] += partial['total_rows']
+            print(f"   Procesadas {errors['total_rows']} filas...")
     
     except Exception as e:
         print(f"❌ Error procesando archivo normalizado: {e}")